@@ -29,7 +29,10 @@ if config.config_file_name is not None:
 from app.core.database import Base  # noqa: E402
 from app.models import (  # noqa: E402, F401
     User, Property, Photo, Broker,
-    Contact, Favorite, Notification, ImportLog,
+    Contact, Favorite, Notification, ImportLog, Evaluation,
+    MarketIndex, RateLimitCounter, PropertyEvent,
+    NotificationCampaign, NotificationCounter, Job,
+    PropertyDuplicate, PropertyChange, AuditEvent,
 )
 
 target_metadata = Base.metadata
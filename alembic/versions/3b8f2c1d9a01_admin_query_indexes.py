@@ -0,0 +1,63 @@
+"""admin query indexes
+
+Indices compostos/parciais para as consultas de app/api/admin.py:
+- list_properties: is_active + created_at desc (e created_at desc sem filtro)
+- dashboard top_properties: view_count desc apenas dos ativos
+- list_contacts / recent_contacts: status + created_at desc e created_at desc
+
+Revision ID: 3b8f2c1d9a01
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8f2c1d9a01'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("ix_properties_active_created_at", "properties",
+     ["is_active", sa.text("created_at DESC")], {}),
+    ("ix_properties_created_at", "properties",
+     [sa.text("created_at DESC")], {}),
+    ("ix_properties_active_view_count", "properties",
+     [sa.text("view_count DESC")],
+     {"postgresql_where": sa.text("is_active"),
+      "sqlite_where": sa.text("is_active")}),
+    ("ix_contacts_status_created_at", "contacts",
+     ["status", sa.text("created_at DESC")], {}),
+    ("ix_contacts_created_at", "contacts",
+     [sa.text("created_at DESC")], {}),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY nao roda dentro de transacao
+    with op.get_context().autocommit_block():
+        for name, table, columns, kw in INDEXES:
+            op.create_index(
+                name, table, columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                **kw,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
@@ -0,0 +1,76 @@
+"""trigram search
+
+pg_trgm + unaccent para as buscas do admin. Cria a funcao IMMUTABLE
+salu_normalize(text) = lower(unaccent(text)) e indices GIN gin_trgm_ops
+sobre salu_normalize(coluna), a mesma expressao usada em
+app/services/search.py. So se aplica ao Postgres.
+
+Revision ID: 7c41e9b2d5f3
+Revises: 3b8f2c1d9a01
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c41e9b2d5f3'
+down_revision: Union[str, Sequence[str], None] = '3b8f2c1d9a01'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRIGRAM_INDEXES = [
+    ("ix_evaluations_city_trgm", "evaluations", "city"),
+    ("ix_evaluations_property_type_trgm", "evaluations", "property_type"),
+    ("ix_properties_title_trgm", "properties", "title"),
+    ("ix_properties_address_trgm", "properties", "address"),
+    ("ix_properties_neighborhood_trgm", "properties", "neighborhood"),
+    ("ix_properties_condominium_name_trgm", "properties", "condominium_name"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    # unaccent() e STABLE; com o dicionario explicito pode ser IMMUTABLE
+    # e entrar em indice de expressao
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION salu_normalize(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT AS
+        $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, $1)) $$
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        for name, table, column in TRIGRAM_INDEXES:
+            op.create_index(
+                name, table,
+                [sa.text(f"salu_normalize({column}) gin_trgm_ops")],
+                if_not_exists=True,
+                postgresql_using="gin",
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(TRIGRAM_INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
+    op.execute("DROP FUNCTION IF EXISTS salu_normalize(text)")
@@ -0,0 +1,81 @@
+"""property full text search
+
+Coluna gerada properties.search_vector (titulo com peso A, descricao com
+peso B) usando a configuracao salu_portuguese (portuguese + unaccent), e
+indice GIN. Por ser GENERATED ... STORED, o Postgres mantem o vetor em
+todo INSERT/UPDATE, inclusive os feitos pelo importador e pelo portal.
+So se aplica ao Postgres.
+
+Revision ID: 9e2d4a6b8c17
+Revises: 7c41e9b2d5f3
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e2d4a6b8c17'
+down_revision: Union[str, Sequence[str], None] = '7c41e9b2d5f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_ts_config WHERE cfgname = 'salu_portuguese'
+            ) THEN
+                CREATE TEXT SEARCH CONFIGURATION salu_portuguese
+                    (COPY = pg_catalog.portuguese);
+                ALTER TEXT SEARCH CONFIGURATION salu_portuguese
+                    ALTER MAPPING FOR hword, hword_part, word
+                    WITH unaccent, portuguese_stem;
+            END IF;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE properties ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('salu_portuguese'::regconfig, coalesce(title, '')), 'A')
+            || setweight(to_tsvector('salu_portuguese'::regconfig, coalesce(description, '')), 'B')
+        ) STORED
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_properties_search_vector", "properties",
+            ["search_vector"],
+            if_not_exists=True,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_properties_search_vector", table_name="properties",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+    op.execute("ALTER TABLE properties DROP COLUMN IF EXISTS search_vector")
+    op.execute("DROP TEXT SEARCH CONFIGURATION IF EXISTS salu_portuguese")
@@ -0,0 +1,55 @@
+"""data versions
+
+- data_versions: contador de versao por tabela (app/models/data_version.py);
+  os ETags do admin leem daqui em vez de count(*) + max() nas tabelas de
+  origem. Os triggers que incrementam vem em c3e5a7b9d1f4
+- remove ix_properties_counters_updated_at, que so servia ao max() do
+  ETag do dashboard e era reescrito a cada flush dos contadores
+
+Revision ID: a2c4e6f8b0d3
+Revises: f0b2d4e6a8c1
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2c4e6f8b0d3'
+down_revision: Union[str, Sequence[str], None] = 'f0b2d4e6a8c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    offline = op.get_context().as_sql
+    inspector = None if offline else sa.inspect(bind)
+
+    # init_db (create_all) pode ter criado a tabela antes da migracao
+    if offline or not inspector.has_table("data_versions"):
+        op.create_table(
+            "data_versions",
+            sa.Column("name", sa.String(), primary_key=True),
+            sa.Column("version", sa.BigInteger(), nullable=False),
+        )
+
+    if offline or "ix_properties_counters_updated_at" in {
+        index["name"] for index in inspector.get_indexes("properties")
+    }:
+        op.drop_index(
+            "ix_properties_counters_updated_at", table_name="properties",
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        "ix_properties_counters_updated_at", "properties",
+        ["counters_updated_at"],
+    )
+    op.drop_table("data_versions")
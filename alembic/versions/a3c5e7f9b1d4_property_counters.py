@@ -0,0 +1,71 @@
+"""property counters
+
+- Tabela append-only property_events: o portal registra
+  visualizacoes/contatos/favoritos e app/services/counters.py aplica os
+  deltas agregados em lote
+- properties.counters_updated_at (+ indice): momento do ultimo flush,
+  usado no ETag do dashboard sem alterar updated_at
+
+Revision ID: a3c5e7f9b1d4
+Revises: f1b3d5e7a9c2
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c5e7f9b1d4'
+down_revision: Union[str, Sequence[str], None] = 'f1b3d5e7a9c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    offline = op.get_context().as_sql
+    inspector = None if offline else sa.inspect(bind)
+
+    # init_db (create_all) pode ter criado a tabela antes da migracao
+    if offline or not inspector.has_table("property_events"):
+        op.create_table(
+            "property_events",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("property_id", sa.String(), nullable=False),
+            sa.Column("kind", sa.String(), nullable=False),
+            sa.Column("delta", sa.Integer(), nullable=False, server_default="1"),
+            sa.Column("created_at", sa.DateTime(), nullable=False,
+                      server_default=sa.func.now()),
+        )
+
+    if offline or "counters_updated_at" not in {
+        c["name"] for c in inspector.get_columns("properties")
+    }:
+        op.add_column(
+            "properties",
+            sa.Column("counters_updated_at", sa.DateTime(), nullable=True),
+        )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_properties_counters_updated_at", "properties",
+            ["counters_updated_at"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_properties_counters_updated_at", table_name="properties",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+    op.drop_column("properties", "counters_updated_at")
+    op.drop_table("property_events")
@@ -0,0 +1,71 @@
+"""lead routing indexes
+
+- contacts (created_at) WHERE broker_id IS NULL: lote de contatos sem
+  corretor, mais antigos primeiro
+- Postgres: extensoes cube/earthdistance e indice GiST em
+  ll_to_earth(latitude, longitude) dos corretores ativos, usado pela busca
+  KNN de app/services/lead_routing.py
+
+Revision ID: b5a7c9d1e3f2
+Revises: 9e2d4a6b8c17
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5a7c9d1e3f2'
+down_revision: Union[str, Sequence[str], None] = '9e2d4a6b8c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+    if is_postgres:
+        op.execute("CREATE EXTENSION IF NOT EXISTS cube")
+        op.execute("CREATE EXTENSION IF NOT EXISTS earthdistance")
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_contacts_unassigned_created_at", "contacts",
+            ["created_at"],
+            if_not_exists=True,
+            postgresql_where=sa.text("broker_id IS NULL"),
+            sqlite_where=sa.text("broker_id IS NULL"),
+            postgresql_concurrently=True,
+        )
+        if is_postgres:
+            op.create_index(
+                "ix_brokers_active_earth", "brokers",
+                [sa.text("ll_to_earth(latitude, longitude)")],
+                if_not_exists=True,
+                postgresql_using="gist",
+                postgresql_where=sa.text(
+                    "is_active AND latitude IS NOT NULL "
+                    "AND longitude IS NOT NULL"
+                ),
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        if is_postgres:
+            op.drop_index(
+                "ix_brokers_active_earth", table_name="brokers",
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
+        op.drop_index(
+            "ix_contacts_unassigned_created_at", table_name="contacts",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,93 @@
+"""notification campaigns
+
+- notification_campaigns: disparos em massa de notificacoes
+  (app/services/notifications.py), gerados com INSERT ... SELECT
+- notification_counters: nao lidas por usuario, mantido junto com o
+  fan-out em vez de COUNT(*) WHERE is_read = false
+- notifications.campaign_id: campanha que gerou a notificacao
+
+Revision ID: b7d9f1a3c5e8
+Revises: a3c5e7f9b1d4
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d9f1a3c5e8'
+down_revision: Union[str, Sequence[str], None] = 'a3c5e7f9b1d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    offline = op.get_context().as_sql
+    inspector = None if offline else sa.inspect(bind)
+
+    # init_db (create_all) pode ter criado as tabelas antes da migracao
+    if offline or not inspector.has_table("notification_campaigns"):
+        op.create_table(
+            "notification_campaigns",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("type", sa.String(), nullable=False),
+            sa.Column("audience", sa.String(), nullable=False),
+            sa.Column("params", sa.Text(), nullable=True),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("message", sa.Text(), nullable=False),
+            sa.Column("link", sa.String(), nullable=True),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("recipients", sa.Integer(), nullable=False),
+            sa.Column("error_message", sa.Text(), nullable=True),
+            sa.Column("created_by", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("started_at", sa.DateTime(), nullable=True),
+            sa.Column("completed_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index(
+            "ix_notification_campaigns_created_at", "notification_campaigns",
+            ["created_at"],
+        )
+
+    if offline or not inspector.has_table("notification_counters"):
+        op.create_table(
+            "notification_counters",
+            sa.Column(
+                "user_id", sa.String(),
+                sa.ForeignKey("users.id", ondelete="CASCADE"),
+                primary_key=True,
+            ),
+            sa.Column("unread", sa.Integer(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+        # Estado inicial a partir das notificacoes ja existentes
+        op.execute(
+            "INSERT INTO notification_counters (user_id, unread, updated_at) "
+            "SELECT user_id, count(*), CURRENT_TIMESTAMP FROM notifications "
+            "WHERE is_read = false GROUP BY user_id"
+        )
+
+    # Em tabela particionada o ADD COLUMN propaga para as particoes
+    if offline or "campaign_id" not in {
+        c["name"] for c in inspector.get_columns("notifications")
+    }:
+        op.add_column(
+            "notifications",
+            sa.Column("campaign_id", sa.String(), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("notifications", "campaign_id")
+    op.drop_table("notification_counters")
+    op.drop_index(
+        "ix_notification_campaigns_created_at",
+        table_name="notification_campaigns",
+    )
+    op.drop_table("notification_campaigns")
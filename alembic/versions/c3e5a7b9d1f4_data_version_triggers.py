@@ -0,0 +1,84 @@
+"""data version triggers
+
+- triggers AFTER INSERT/UPDATE/DELETE nas tabelas versionadas que
+  incrementam data_versions (ver app/models/data_version.py). Com eles
+  o ETag muda tambem quando quem escreve e o portal, o importador
+  externo ou SQL manual, e nao so a Session desta app
+- Postgres: funcao bump_data_version() e um trigger por statement em
+  cada tabela; SQLite: um trigger por linha para cada operacao
+
+Revision ID: c3e5a7b9d1f4
+Revises: a2c4e6f8b0d3
+Create Date: 2026-10-20 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e5a7b9d1f4'
+down_revision: Union[str, Sequence[str], None] = 'a2c4e6f8b0d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = (
+    "properties",
+    "contacts",
+    "users",
+    "brokers",
+    "evaluations",
+    "property_duplicates",
+    "market_index",
+)
+SQLITE_OPS = ("INSERT", "UPDATE", "DELETE")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            """
+            CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO data_versions (name, version) VALUES (TG_TABLE_NAME, 1)
+                ON CONFLICT (name) DO UPDATE SET version = data_versions.version + 1;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            """
+        )
+        for table in TABLES:
+            op.execute(f"DROP TRIGGER IF EXISTS data_version_{table} ON {table}")
+            op.execute(
+                f"CREATE TRIGGER data_version_{table} "
+                f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()"
+            )
+        return
+
+    for table in TABLES:
+        for operation in SQLITE_OPS:
+            op.execute(
+                f"CREATE TRIGGER IF NOT EXISTS "
+                f"data_version_{table}_{operation.lower()} "
+                f"AFTER {operation} ON {table} BEGIN "
+                f"INSERT INTO data_versions (name, version) VALUES ('{table}', 1) "
+                f"ON CONFLICT (name) DO UPDATE SET version = version + 1; END"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        for table in TABLES:
+            op.execute(f"DROP TRIGGER IF EXISTS data_version_{table} ON {table}")
+        op.execute("DROP FUNCTION IF EXISTS bump_data_version()")
+        return
+
+    for table in TABLES:
+        for operation in SQLITE_OPS:
+            op.execute(
+                f"DROP TRIGGER IF EXISTS data_version_{table}_{operation.lower()}"
+            )
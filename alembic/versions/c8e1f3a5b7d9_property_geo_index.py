@@ -0,0 +1,53 @@
+"""property geo index
+
+Postgres: indice GiST em point(longitude, latitude) dos imoveis com
+coordenadas, usado pelo filtro de area (<@ box) de
+app/services/geo.py:property_clusters.
+
+Revision ID: c8e1f3a5b7d9
+Revises: b5a7c9d1e3f2
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e1f3a5b7d9'
+down_revision: Union[str, Sequence[str], None] = 'b5a7c9d1e3f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_properties_geo_point", "properties",
+            [sa.text("point(longitude, latitude)")],
+            if_not_exists=True,
+            postgresql_using="gist",
+            postgresql_where=sa.text(
+                "latitude IS NOT NULL AND longitude IS NOT NULL"
+            ),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_properties_geo_point", table_name="properties",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
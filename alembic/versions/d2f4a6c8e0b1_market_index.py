@@ -0,0 +1,83 @@
+"""market index
+
+Tabela market_index (preco/m2 agregado por cidade/bairro/tipo/finalidade,
+mantida por app/services/market_index.py) e indices usados na reconstrucao
+incremental:
+- properties (updated_at): imoveis alterados desde a ultima reconstrucao
+- Postgres: properties (salu_normalize(city)) para recalcular por cidade
+
+Revision ID: d2f4a6c8e0b1
+Revises: c8e1f3a5b7d9
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f4a6c8e0b1'
+down_revision: Union[str, Sequence[str], None] = 'c8e1f3a5b7d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    # init_db (create_all) pode ter criado a tabela antes da migracao
+    if op.get_context().as_sql or not sa.inspect(bind).has_table("market_index"):
+        op.create_table(
+            "market_index",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("city", sa.String(), nullable=False),
+            sa.Column("neighborhood", sa.String(), nullable=False),
+            sa.Column("property_type", sa.String(), nullable=False),
+            sa.Column("purpose", sa.String(), nullable=False),
+            sa.Column("city_name", sa.String(), nullable=True),
+            sa.Column("neighborhood_name", sa.String(), nullable=True),
+            sa.Column("listing_count", sa.Integer(), nullable=False),
+            sa.Column("priced_count", sa.Integer(), nullable=False),
+            sa.Column("p25_price_per_sqm", sa.Float(), nullable=True),
+            sa.Column("median_price_per_sqm", sa.Float(), nullable=True),
+            sa.Column("p75_price_per_sqm", sa.Float(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_market_index_id", "market_index", ["id"])
+        op.create_index(
+            "ux_market_index_key", "market_index",
+            ["city", "neighborhood", "property_type", "purpose"],
+            unique=True,
+        )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_properties_updated_at", "properties", ["updated_at"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        if bind.dialect.name == "postgresql":
+            op.create_index(
+                "ix_properties_city_normalized", "properties",
+                [sa.text("salu_normalize(city)")],
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_properties_city_normalized", table_name="properties",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_properties_updated_at", table_name="properties",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
+    op.drop_table("market_index")
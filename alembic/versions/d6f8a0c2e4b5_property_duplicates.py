@@ -0,0 +1,54 @@
+"""property duplicates
+
+- property_duplicates: grupos de anuncios da mesma unidade em feeds
+  diferentes (app/services/dedup.py); cluster_id e o imovel canonico
+
+Revision ID: d6f8a0c2e4b5
+Revises: c4e6a8b0d2f3
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6f8a0c2e4b5'
+down_revision: Union[str, Sequence[str], None] = 'c4e6a8b0d2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    offline = op.get_context().as_sql
+    inspector = None if offline else sa.inspect(bind)
+
+    # init_db (create_all) pode ter criado a tabela antes da migracao
+    if offline or not inspector.has_table("property_duplicates"):
+        op.create_table(
+            "property_duplicates",
+            sa.Column(
+                "property_id", sa.String(),
+                sa.ForeignKey("properties.id", ondelete="CASCADE"),
+                primary_key=True,
+            ),
+            sa.Column("cluster_id", sa.String(), nullable=False),
+            sa.Column("score", sa.Float(), nullable=False),
+            sa.Column("detected_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index(
+            "ix_property_duplicates_cluster_id", "property_duplicates",
+            ["cluster_id"],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_property_duplicates_cluster_id", table_name="property_duplicates"
+    )
+    op.drop_table("property_duplicates")
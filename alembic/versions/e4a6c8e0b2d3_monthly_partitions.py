@@ -0,0 +1,203 @@
+"""monthly partitions
+
+Postgres: converte evaluations, notifications (created_at) e import_logs
+(started_at) em tabelas particionadas por mes (PARTITION BY RANGE), com
+particao DEFAULT para linhas fora das particoes criadas. Consultas com
+filtro de data passam a ler so as particoes do periodo.
+
+Para cada tabela: renomeia a original, cria a particionada com as mesmas
+colunas/defaults, cria as particoes do mes mais antigo ate
+MONTHS_AHEAD meses a frente, copia os dados, apaga a original e recria
+indices e foreign keys com os mesmos nomes. Sequences de colunas SERIAL
+(OWNED BY a coluna da original, e usadas no default copiado pelo LIKE)
+passam a pertencer a nova tabela antes do DROP. A chave primaria passa a ser
+(id, coluna de particao), exigencia do Postgres para tabelas
+particionadas.
+
+A migracao trava as tabelas durante a copia: rodar em janela de
+manutencao. As particoes futuras e a retencao ficam a cargo de
+app/services/partitions.py (POST /api/admin/cron/partitions).
+
+Revision ID: e4a6c8e0b2d3
+Revises: d2f4a6c8e0b1
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a6c8e0b2d3'
+down_revision: Union[str, Sequence[str], None] = 'd2f4a6c8e0b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PARTITIONED_TABLES = (
+    ("evaluations", "created_at"),
+    ("notifications", "created_at"),
+    ("import_logs", "started_at"),
+)
+MONTHS_AHEAD = 3
+
+# Sequences SERIAL pertencem (OWNED BY) a coluna da tabela antiga: sem
+# transferir, o DROP falha porque o default da nova tabela usa a sequence
+MOVE_OWNED_SEQUENCES = """
+    FOR seq, col IN
+        SELECT s.relname, a.attname
+        FROM pg_depend d
+        JOIN pg_class s ON s.oid = d.objid AND s.relkind = 'S'
+        JOIN pg_attribute a
+          ON a.attrelid = d.refobjid AND a.attnum = d.refobjsubid
+        WHERE d.classid = 'pg_class'::regclass
+          AND d.refobjid = '{source}'::regclass
+          AND d.deptype = 'a'
+    LOOP
+        EXECUTE format('ALTER SEQUENCE %I OWNED BY {table}.%I', seq, col);
+    END LOOP;
+"""
+
+# Indices (menos a PK) e FKs sao recriados depois de apagar a tabela
+# original, para manter os nomes. Em tabela particionada o indice e criado
+# no pai e propagado para todas as particoes.
+PARTITION_TABLE = """
+DO $$
+DECLARE
+    index_defs text[];
+    fk_defs text[];
+    def text;
+    seq name;
+    col name;
+    month date;
+BEGIN
+    SELECT coalesce(
+        array_agg(replace(indexdef, ' ON ONLY ', ' ON ')), '{{}}'
+    ) INTO index_defs
+    FROM pg_indexes
+    WHERE schemaname = current_schema()
+      AND tablename = '{table}'
+      AND indexname <> '{table}_pkey';
+
+    SELECT coalesce(array_agg(
+        format('ALTER TABLE {table} ADD CONSTRAINT %I %s',
+               conname, pg_get_constraintdef(oid))
+    ), '{{}}') INTO fk_defs
+    FROM pg_constraint
+    WHERE conrelid = '{table}'::regclass AND contype = 'f';
+
+    ALTER TABLE {table} RENAME TO {table}_legacy;
+    ALTER TABLE {table}_legacy
+        RENAME CONSTRAINT {table}_pkey TO {table}_legacy_pkey;
+
+    CREATE TABLE {table} (
+        LIKE {table}_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+    ) PARTITION BY RANGE ({column});
+    ALTER TABLE {table}
+        ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, {column});
+    CREATE TABLE {table}_default PARTITION OF {table} DEFAULT;
+
+    FOR month IN
+        SELECT generate_series(
+            date_trunc('month', coalesce(
+                (SELECT min({column}) FROM {table}_legacy), now()
+            )),
+            date_trunc('month', now()) + interval '{months_ahead} months',
+            interval '1 month'
+        )::date
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+            '{table}_p' || to_char(month, 'YYYY_MM'),
+            month,
+            (month + interval '1 month')::date
+        );
+    END LOOP;
+
+    INSERT INTO {table} SELECT * FROM {table}_legacy;
+{move_legacy_sequences}
+    DROP TABLE {table}_legacy;
+
+    FOREACH def IN ARRAY index_defs LOOP
+        EXECUTE def;
+    END LOOP;
+    FOREACH def IN ARRAY fk_defs LOOP
+        EXECUTE def;
+    END LOOP;
+END $$
+"""
+
+UNPARTITION_TABLE = """
+DO $$
+DECLARE
+    index_defs text[];
+    fk_defs text[];
+    def text;
+    seq name;
+    col name;
+BEGIN
+    SELECT coalesce(
+        array_agg(replace(indexdef, ' ON ONLY ', ' ON ')), '{{}}'
+    ) INTO index_defs
+    FROM pg_indexes
+    WHERE schemaname = current_schema()
+      AND tablename = '{table}'
+      AND indexname <> '{table}_pkey';
+
+    SELECT coalesce(array_agg(
+        format('ALTER TABLE {table} ADD CONSTRAINT %I %s',
+               conname, pg_get_constraintdef(oid))
+    ), '{{}}') INTO fk_defs
+    FROM pg_constraint
+    WHERE conrelid = '{table}'::regclass AND contype = 'f';
+
+    ALTER TABLE {table} RENAME TO {table}_partitioned;
+    ALTER TABLE {table}_partitioned
+        RENAME CONSTRAINT {table}_pkey TO {table}_partitioned_pkey;
+
+    CREATE TABLE {table} (
+        LIKE {table}_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+    );
+    ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id);
+
+    INSERT INTO {table} SELECT * FROM {table}_partitioned;
+{move_partitioned_sequences}
+    DROP TABLE {table}_partitioned CASCADE;
+
+    FOREACH def IN ARRAY index_defs LOOP
+        EXECUTE def;
+    END LOOP;
+    FOREACH def IN ARRAY fk_defs LOOP
+        EXECUTE def;
+    END LOOP;
+END $$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for table, column in PARTITIONED_TABLES:
+        op.execute(PARTITION_TABLE.format(
+            table=table, column=column, months_ahead=MONTHS_AHEAD,
+            move_legacy_sequences=MOVE_OWNED_SEQUENCES.format(
+                source=f"{table}_legacy", table=table,
+            ),
+        ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for table, _ in PARTITIONED_TABLES:
+        op.execute(UNPARTITION_TABLE.format(
+            table=table,
+            move_partitioned_sequences=MOVE_OWNED_SEQUENCES.format(
+                source=f"{table}_partitioned", table=table,
+            ),
+        ))
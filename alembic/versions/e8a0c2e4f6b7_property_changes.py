@@ -0,0 +1,76 @@
+"""property changes
+
+- property_changes: historico append-only das alteracoes dos imoveis em
+  cada importacao, so com os campos alterados (JSON compacto)
+- import_logs.changes_count: imoveis alterados na importacao
+
+Revision ID: e8a0c2e4f6b7
+Revises: d6f8a0c2e4b5
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a0c2e4f6b7'
+down_revision: Union[str, Sequence[str], None] = 'd6f8a0c2e4b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    offline = op.get_context().as_sql
+    inspector = None if offline else sa.inspect(bind)
+
+    # init_db (create_all) pode ter criado a tabela antes da migracao
+    if offline or not inspector.has_table("property_changes"):
+        op.create_table(
+            "property_changes",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column(
+                "property_id", sa.String(),
+                sa.ForeignKey("properties.id", ondelete="CASCADE"),
+                nullable=False,
+            ),
+            sa.Column("import_log_id", sa.String(), nullable=True),
+            sa.Column("changed_at", sa.DateTime(), nullable=False),
+            sa.Column("changes", sa.Text(), nullable=False),
+        )
+        op.create_index(
+            "ix_property_changes_import_log_id", "property_changes",
+            ["import_log_id"],
+        )
+        op.create_index(
+            "ix_property_changes_property_changed_at", "property_changes",
+            ["property_id", "changed_at"],
+        )
+
+    # Em tabela particionada o ADD COLUMN propaga para as particoes
+    if offline or "changes_count" not in {
+        c["name"] for c in inspector.get_columns("import_logs")
+    }:
+        op.add_column(
+            "import_logs",
+            sa.Column(
+                "changes_count", sa.Integer(), nullable=False,
+                server_default="0",
+            ),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("import_logs", "changes_count")
+    op.drop_index(
+        "ix_property_changes_property_changed_at", table_name="property_changes"
+    )
+    op.drop_index(
+        "ix_property_changes_import_log_id", table_name="property_changes"
+    )
+    op.drop_table("property_changes")
@@ -0,0 +1,62 @@
+"""audit events
+
+- audit_events: trilha de auditoria das acoes do admin, gravada em lote
+  por app/services/audit.py
+
+Revision ID: f0b2d4e6a8c1
+Revises: e8a0c2e4f6b7
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f0b2d4e6a8c1'
+down_revision: Union[str, Sequence[str], None] = 'e8a0c2e4f6b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    offline = op.get_context().as_sql
+    inspector = None if offline else sa.inspect(bind)
+
+    # init_db (create_all) pode ter criado a tabela antes da migracao
+    if offline or not inspector.has_table("audit_events"):
+        op.create_table(
+            "audit_events",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("actor_id", sa.String(), nullable=True),
+            sa.Column("actor_email", sa.String(), nullable=True),
+            sa.Column("action", sa.String(), nullable=False),
+            sa.Column("entity_type", sa.String(), nullable=True),
+            sa.Column("entity_id", sa.String(), nullable=True),
+            sa.Column("details", sa.Text(), nullable=True),
+        )
+        op.create_index(
+            "ix_audit_events_created_at_id", "audit_events",
+            ["created_at", "id"],
+        )
+        op.create_index(
+            "ix_audit_events_actor_created_at", "audit_events",
+            ["actor_id", "created_at"],
+        )
+        op.create_index(
+            "ix_audit_events_entity", "audit_events",
+            ["entity_type", "entity_id"],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_audit_events_entity", table_name="audit_events")
+    op.drop_index("ix_audit_events_actor_created_at", table_name="audit_events")
+    op.drop_index("ix_audit_events_created_at_id", table_name="audit_events")
+    op.drop_table("audit_events")
@@ -0,0 +1,48 @@
+"""rate limit counters
+
+Tabela rate_limit_counters do backend database de app/core/rate_limit.py
+(RATE_LIMIT_BACKEND=database). No Postgres fica UNLOGGED: contadores sao
+descartaveis e nao precisam passar pelo WAL.
+
+Revision ID: f1b3d5e7a9c2
+Revises: e4a6c8e0b2d3
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b3d5e7a9c2'
+down_revision: Union[str, Sequence[str], None] = 'e4a6c8e0b2d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    # init_db (create_all) pode ter criado a tabela antes da migracao
+    if op.get_context().as_sql or not sa.inspect(bind).has_table("rate_limit_counters"):
+        op.create_table(
+            "rate_limit_counters",
+            sa.Column("key", sa.String(), primary_key=True),
+            sa.Column("window_start", sa.Integer(), nullable=False),
+            sa.Column("previous", sa.Integer(), nullable=False),
+            sa.Column("current", sa.Integer(), nullable=False),
+        )
+        op.create_index(
+            "ix_rate_limit_counters_window_start", "rate_limit_counters",
+            ["window_start"],
+        )
+
+    if bind.dialect.name == "postgresql":
+        op.execute("ALTER TABLE rate_limit_counters SET UNLOGGED")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("rate_limit_counters")
@@ -1,27 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.core.database import get_db
-from app.core.security import get_current_admin
+from sqlalchemy import func, select
+from app.core.database import get_db, get_long_db
+from app.core.replicas import get_long_read_db, get_read_db
+from app.core.security import USER_BY_ID, get_current_admin
 from app.models.user import User, UserRole
 from app.models.property import Property, Photo
 from app.models.contact import Contact, ContactStatus
 from app.models.broker import Broker
 from app.models.import_log import ImportLog
-from app.models.favorites import Favorite
-from app.models.notification import Notification, NotificationType
+from app.models.notification import NotificationCampaign, NotificationType
 from app.models.evaluation import Evaluation
+from app.models.market_index import MarketIndex
+from app.models.job import Job
+from app.models.property_duplicate import PropertyDuplicate
 from app.schemas import (
     UserResponse, UserListResponse,
-    PropertyResponse, PropertyListResponse,
+    PropertyResponse, PropertyListResponse, PropertySearchResponse,
+    GeoClusterResponse,
     ContactResponse, ContactListResponse,
     BrokerResponse, BrokerListResponse,
-    ImportLogResponse, DashboardResponse,
+    LeadAssignResponse,
+    ImportLogResponse, ImportLogListResponse, ImportLogAnalyticsResponse,
+    DashboardResponse,
     ContactStatusUpdate,
+    PropertyBulkUpdate, BrokerBulkUpdate, ContactBulkUpdate, BulkUpdateResponse,
     EvaluationResponse, EvaluationListResponse,
+    EvaluationRecomputeRequest, EvaluationRecomputeResponse,
+    EvaluationAnalyticsResponse,
+    MarketIndexResponse, MarketIndexListResponse, MarketIndexRebuildResponse,
+    NotificationCampaignCreate, NotificationCampaignDetail,
+    NotificationCampaignListResponse, NotificationCampaignResponse,
+    JobCreate, JobDetail, JobListResponse, JobResponse,
+    DuplicateDetectionResponse, DuplicateClusterListResponse,
+    PropertyHistoryResponse, ImportChangeSummary,
+    AuditEventListResponse,
 )
 from app.core.config import settings
-import uuid
+from app.core.http_cache import data_version_etag, not_modified
+from app.services.analytics import evaluation_analytics
+from app.services.audit import list_audit_events, record_event
+from app.services.bulk import bulk_update
+from app.services.counters import reconcile_counters
+from app.services.dedup import collapse_filter, detect_duplicates, list_clusters
+from app.services.geo import bounding_box, property_clusters
+from app.services.imports import (
+    IMPORT_STATUSES, import_change_summary, import_log_analytics,
+    property_history,
+)
+from app.services.jobs import STATUSES as JOB_STATUSES
+from app.services.jobs import cancel_job, enqueue, retry_job
+from app.services.lead_routing import assign_unassigned_contacts, count_unassigned
+from app.services.listing import list_response
+from app.services.notifications import (
+    create_campaign, dispatch_campaign, fan_out, read_count,
+    reconcile_unread_counters,
+)
+from app.services.partitions import maintain_partitions
+from app.services.market_index import (
+    normalize_key, rebuild_market_index, refresh_after_import,
+)
+from app.services.search import contains, contains_any, search_properties
+from app.services.valuation import recompute_evaluations
 from datetime import datetime
 from typing import Optional
 
@@ -29,60 +69,121 @@ router = APIRouter()
 
 MAX_PAGE_LIMIT = 200
 
+# Colunas cobertas pelo parametro q de list_properties
+PROPERTY_SEARCH_COLUMNS = (
+    Property.title,
+    Property.address,
+    Property.neighborhood,
+    Property.condominium_name,
+)
+
+
+def _contact_status(value: str) -> str:
+    """Status validado contra o enum (400 se invalido)"""
+    valid_statuses = [s.value for s in ContactStatus]
+    if value.upper() not in valid_statuses:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid status. Valid values: {valid_statuses}"
+        )
+    return value.upper()
+
+
+def _run_bulk_update(db: Session, model, payload, values: dict, filters: list,
+                     returning: tuple, current_user: User, entity_type: str) -> dict:
+    if (payload.ids is None) == (payload.filter is None):
+        raise HTTPException(
+            status_code=400, detail="Provide either ids or filter"
+        )
+    # Filtro vazio ({} ou so campos em branco) atualizaria a tabela inteira
+    if payload.filter is not None and not filters:
+        raise HTTPException(
+            status_code=400, detail="Filter must have at least one condition"
+        )
+    if not values:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    try:
+        result = bulk_update(
+            db, model, values,
+            ids=payload.ids, filters=filters, returning=returning,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    record_event(current_user, f"{entity_type}.bulk_update", entity_type, details={
+        "values": values,
+        "ids": payload.ids,
+        "filter": payload.filter.model_dump(exclude_none=True) if payload.filter else None,
+        "updated": result["updated"],
+    })
+    return result
+
+
+def _count(model, *filters):
+    return (
+        select(func.count()).select_from(model).where(*filters)
+        .scalar_subquery()
+    )
+
+
+# Consultas do dashboard montadas uma vez: sem reconstruir o select a cada
+# requisicao, e a chave do cache de compilacao do SQLAlchemy sai sempre igual
+DASHBOARD_TOTALS = select(
+    _count(Property).label("total_properties"),
+    _count(Property, Property.is_active == True).label("active_properties"),  # noqa: E712
+    _count(Contact).label("total_contacts"),
+    _count(User).label("total_users"),
+    _count(Broker).label("total_brokers"),
+    _count(Evaluation).label("total_evaluations"),
+    _count(
+        PropertyDuplicate,
+        PropertyDuplicate.cluster_id != PropertyDuplicate.property_id,
+    ).label("duplicate_properties"),
+)
+PROPERTIES_BY_TYPE = select(
+    Property.property_type, func.count(Property.id)
+).group_by(Property.property_type)
+PROPERTIES_BY_PURPOSE = select(
+    Property.purpose, func.count(Property.id)
+).group_by(Property.purpose)
+CONTACTS_BY_STATUS = select(
+    Contact.status, func.count(Contact.id)
+).group_by(Contact.status)
+RECENT_CONTACTS = select(Contact).order_by(Contact.created_at.desc()).limit(10)
+TOP_PROPERTIES = (
+    select(Property)
+    .where(Property.is_active == True)  # noqa: E712
+    .order_by(Property.view_count.desc())
+    .limit(5)
+)
+
 
 @router.get("/dashboard", response_model=DashboardResponse)
 async def get_dashboard_stats(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_admin)
 ):
     """Get dashboard statistics (Admin only)"""
-
-    total_properties = db.query(Property).count()
-    active_properties = db.query(Property).filter(Property.is_active == True).count()
-    total_contacts = db.query(Contact).count()
-    total_users = db.query(User).count()
-    total_brokers = db.query(Broker).count()
-    total_evaluations = db.query(Evaluation).count()
-
-    # Properties by type
-    properties_by_type = db.query(
-        Property.property_type,
-        func.count(Property.id).label('count')
-    ).group_by(Property.property_type).all()
-
-    # Properties by purpose
-    properties_by_purpose = db.query(
-        Property.purpose,
-        func.count(Property.id).label('count')
-    ).group_by(Property.purpose).all()
-
-    # Contacts by status
-    contacts_by_status = db.query(
-        Contact.status,
-        func.count(Contact.id).label('count')
-    ).group_by(Contact.status).all()
-
-    # Recent contacts
-    recent_contacts = db.query(Contact).order_by(
-        Contact.created_at.desc()
-    ).limit(10).all()
-
-    # Top properties
-    top_properties = db.query(Property).filter(
-        Property.is_active == True
-    ).order_by(
-        Property.view_count.desc()
-    ).limit(5).all()
+    etag = data_version_etag(
+        db, request,
+        "properties", "contacts", "users", "brokers",
+        "evaluations", "property_duplicates",
+    )
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    response.headers["ETag"] = etag
+
+    overview = db.execute(DASHBOARD_TOTALS).one()._asdict()
+    properties_by_type = db.execute(PROPERTIES_BY_TYPE).all()
+    properties_by_purpose = db.execute(PROPERTIES_BY_PURPOSE).all()
+    contacts_by_status = db.execute(CONTACTS_BY_STATUS).all()
+    recent_contacts = db.scalars(RECENT_CONTACTS).all()
+    top_properties = db.scalars(TOP_PROPERTIES).all()
 
     return {
-        "overview": {
-            "total_properties": total_properties,
-            "active_properties": active_properties,
-            "total_contacts": total_contacts,
-            "total_users": total_users,
-            "total_brokers": total_brokers,
-            "total_evaluations": total_evaluations
-        },
+        "overview": overview,
         "properties_by_type": [
             {"type": t, "count": c} for t, c in properties_by_type
         ],
@@ -103,60 +204,98 @@ def notify_users_of_removed_properties(db: Session, removed_property_ids: list):
     if not removed_property_ids:
         return 0
 
-    notifications_created = 0
+    # Uma notificacao por favorito, gerada com INSERT ... SELECT (sem commit)
+    campaign = create_campaign(
+        db,
+        type=NotificationType.PROPERTY_REMOVED.value,
+        audience="favorites",
+        property_ids=removed_property_ids,
+        title="Imovel nao esta mais disponivel",
+        message=(
+            "O imovel '{title}' em {neighborhood}, {city} que voce "
+            "favoritou nao esta mais disponivel."
+        ),
+        link="/buscar?city={city}&type={property_type}",
+        created_by="system",
+    )
+    campaign.recipients = fan_out(db, campaign)
+    campaign.status = "completed"
+    return campaign.recipients
+
+
+@router.get("/import-logs", response_model=ImportLogListResponse)
+async def get_import_logs(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=MAX_PAGE_LIMIT),
+    source: Optional[str] = None,
+    status: Optional[str] = None,
+):
+    """Get import logs, newest first (Admin only)"""
+    filters = []
+    if source:
+        filters.append(ImportLog.source == source)
+    if status:
+        if status not in IMPORT_STATUSES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid status. Valid values: {list(IMPORT_STATUSES)}",
+            )
+        filters.append(ImportLog.status == status)
+    return list_response(
+        db, ImportLog, ImportLogResponse, "logs",
+        filters=filters, order_by=ImportLog.started_at.desc(),
+        skip=skip, limit=limit,
+    )
 
-    # Buscar favoritos dos imoveis removidos
-    favorites = db.query(Favorite).filter(
-        Favorite.property_id.in_(removed_property_ids)
-    ).all()
 
-    for favorite in favorites:
-        # Buscar informacoes do imovel
-        property = db.query(Property).filter(Property.id == favorite.property_id).first()
-        if not property:
-            continue
-
-        # Criar notificacao
-        notification = Notification(
-            id=str(uuid.uuid4()),
-            user_id=favorite.user_id,
-            title="Imovel nao esta mais disponivel",
-            message=f"O imovel '{property.title or property.property_type}' em {property.neighborhood}, {property.city} que voce favoritou nao esta mais disponivel.",
-            type=NotificationType.PROPERTY_REMOVED,
-            link=f"/buscar?city={property.city}&type={property.property_type}"
+@router.get("/import-logs/analytics", response_model=ImportLogAnalyticsResponse)
+async def get_import_log_analytics(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+    windows: Optional[str] = Query(default=None, description="Dias, ex.: 1,7,30"),
+    source: Optional[str] = None,
+):
+    """Per-source import duration, throughput and success rate (Admin only)"""
+    try:
+        days = (
+            [int(value) for value in windows.split(",") if value.strip()]
+            if windows else None
         )
-        db.add(notification)
-        notifications_created += 1
-
-    return notifications_created
+        return import_log_analytics(db, windows=days, source=source)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/import-logs")
-async def get_import_logs(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+@router.get("/import-logs/{log_id}/changes", response_model=ImportChangeSummary)
+async def get_import_changes(
+    log_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
 ):
-    """Get import logs (Admin only)"""
-
-    logs = db.query(ImportLog).order_by(
-        ImportLog.started_at.desc()
-    ).limit(20).all()
-
-    return {"logs": [ImportLogResponse.model_validate(log) for log in logs]}
+    """Summary of the property changes made by an import (Admin only)"""
+    log = db.query(ImportLog).filter(ImportLog.id == log_id).first()
+    if not log:
+        raise HTTPException(status_code=404, detail="Import log not found")
+    summary = import_change_summary(db, log_id)
+    summary.pop("import_log_id")
+    return {"import_log": ImportLogResponse.model_validate(log), **summary}
 
 
 # ===== USERS MANAGEMENT =====
 
 @router.get("/users", response_model=UserListResponse)
 async def list_users(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_admin),
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=50, ge=1, le=MAX_PAGE_LIMIT),
     role: Optional[str] = None
 ):
     """List all users (Admin only)"""
-    query = db.query(User)
+    filters = []
 
     if role:
         # Validar role contra enum
@@ -166,25 +305,29 @@ async def list_users(
                 status_code=400,
                 detail=f"Invalid role. Valid values: {valid_roles}"
             )
-        query = query.filter(User.role == role.upper())
+        filters.append(User.role == role.upper())
 
-    total = query.count()
-    users = query.offset(skip).limit(limit).all()
+    etag = data_version_etag(db, request, "users")
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
 
-    return {
-        "total": total,
-        "users": users
-    }
+    response = list_response(
+        db, User, UserResponse, "users",
+        filters=filters, skip=skip, limit=limit,
+    )
+    response.headers["ETag"] = etag
+    return response
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_admin)
 ):
     """Get user details (Admin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.execute(USER_BY_ID, {"user_id": user_id}).scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -197,15 +340,17 @@ async def delete_user(
     current_user: User = Depends(get_current_admin)
 ):
     """Delete user (Admin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.execute(USER_BY_ID, {"user_id": user_id}).scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     if user.id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
 
+    details = {"email": user.email, "role": user.role.value}
     db.delete(user)
     db.commit()
+    record_event(current_user, "user.delete", "user", user_id, details)
 
     return {"message": "User deleted successfully"}
 
@@ -214,25 +359,137 @@ async def delete_user(
 
 @router.get("/properties", response_model=PropertyListResponse)
 async def list_properties(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_admin),
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=50, ge=1, le=MAX_PAGE_LIMIT),
-    is_active: Optional[bool] = None
+    is_active: Optional[bool] = None,
+    q: Optional[str] = Query(default=None, max_length=100),
+    collapse_duplicates: bool = False,
 ):
-    """List all properties (Admin only)"""
-    query = db.query(Property)
+    """
+    List all properties; collapse_duplicates=true shows only the
+    canonical listing of each cross-feed duplicate group (Admin only)
+    """
+    filters = []
+    versions = ["properties"]
 
     if is_active is not None:
-        query = query.filter(Property.is_active == is_active)
+        filters.append(Property.is_active == is_active)
+    if q and q.strip():
+        # Busca sem acentos em titulo, endereco, bairro e condominio
+        filters.append(contains_any(PROPERTY_SEARCH_COLUMNS, q))
+    if collapse_duplicates:
+        filters.append(collapse_filter())
+        versions.append("property_duplicates")
+
+    etag = data_version_etag(db, request, *versions)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    response = list_response(
+        db, Property, PropertyResponse, "properties",
+        filters=filters, order_by=Property.created_at.desc(),
+        skip=skip, limit=limit,
+    )
+    response.headers["ETag"] = etag
+    return response
+
+
+@router.get("/properties/duplicates", response_model=DuplicateClusterListResponse)
+async def list_duplicate_properties(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=MAX_PAGE_LIMIT),
+):
+    """List cross-feed duplicate listing groups (Admin only)"""
+    return list_clusters(db, skip=skip, limit=limit)
 
-    total = query.count()
-    properties = query.order_by(Property.created_at.desc()).offset(skip).limit(limit).all()
 
-    return {
-        "total": total,
-        "properties": properties
-    }
+@router.post("/properties/duplicates/detect", response_model=DuplicateDetectionResponse)
+async def detect_duplicate_properties(
+    db: Session = Depends(get_long_db),
+    current_user: User = Depends(get_current_admin),
+    dry_run: bool = False,
+):
+    """Recompute cross-feed duplicate groups of active listings (Admin only)"""
+    return detect_duplicates(db, dry_run=dry_run)
+
+
+@router.get("/properties/search", response_model=PropertySearchResponse)
+async def search_properties_text(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+    q: str = Query(min_length=2, max_length=200),
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=MAX_PAGE_LIMIT),
+    is_active: Optional[bool] = None,
+):
+    """Full-text search over property title/description (Admin only)"""
+    return search_properties(
+        db, q, skip=skip, limit=limit, is_active=is_active
+    )
+
+
+@router.get("/properties/geo", response_model=GeoClusterResponse)
+async def properties_geo(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+    min_lat: Optional[float] = Query(default=None, ge=-90, le=90),
+    min_lon: Optional[float] = Query(default=None, ge=-180, le=180),
+    max_lat: Optional[float] = Query(default=None, ge=-90, le=90),
+    max_lon: Optional[float] = Query(default=None, ge=-180, le=180),
+    lat: Optional[float] = Query(default=None, ge=-90, le=90),
+    lon: Optional[float] = Query(default=None, ge=-180, le=180),
+    radius_km: Optional[float] = Query(default=None, gt=0, le=500),
+    zoom: int = Query(default=12, ge=0, le=20),
+    is_active: Optional[bool] = True,
+):
+    """
+    Property markers for the map, clustered per zoom level (Admin only).
+    Accepts a bounding box (min_lat, min_lon, max_lat, max_lon) or a
+    radius search (lat, lon, radius_km).
+    """
+    bbox = (min_lat, min_lon, max_lat, max_lon)
+    center = None
+    if lat is not None and lon is not None and radius_km is not None:
+        center = (lat, lon)
+        bbox = bounding_box(lat, lon, radius_km)
+    elif None in bbox:
+        raise HTTPException(
+            status_code=400,
+            detail="Provide min_lat, min_lon, max_lat, max_lon or lat, lon, radius_km"
+        )
+    elif min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="Invalid bounding box")
+
+    return property_clusters(
+        db, *bbox, zoom=zoom,
+        center=center, radius_km=radius_km, is_active=is_active,
+    )
+
+
+@router.get("/properties/{property_id}/history", response_model=PropertyHistoryResponse)
+async def get_property_history(
+    property_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+    field: Optional[str] = None,
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=MAX_PAGE_LIMIT),
+):
+    """Get the import change history of a property (Admin only)"""
+    if db.get(Property, property_id) is None:
+        raise HTTPException(status_code=404, detail="Property not found")
+    try:
+        return property_history(
+            db, property_id, field=field, skip=skip, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.patch("/properties/{property_id}/toggle-active")
@@ -248,6 +505,10 @@ async def toggle_property_active(
 
     property.is_active = not property.is_active
     db.commit()
+    record_event(
+        current_user, "property.toggle_active", "property", property_id,
+        {"is_active": property.is_active},
+    )
 
     return {"message": f"Property {'activated' if property.is_active else 'deactivated'}", "is_active": property.is_active}
 
@@ -265,40 +526,76 @@ async def toggle_property_featured(
 
     property.is_featured = not property.is_featured
     db.commit()
+    record_event(
+        current_user, "property.toggle_featured", "property", property_id,
+        {"is_featured": property.is_featured},
+    )
 
     return {"message": f"Property {'featured' if property.is_featured else 'unfeatured'}", "is_featured": property.is_featured}
 
 
+@router.patch("/properties/bulk", response_model=BulkUpdateResponse)
+async def bulk_update_properties(
+    body: PropertyBulkUpdate,
+    db: Session = Depends(get_long_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """Set is_active/is_featured on many properties by ids or filter (Admin only)"""
+    values = {
+        name: getattr(body, name)
+        for name in ("is_active", "is_featured")
+        if getattr(body, name) is not None
+    }
+
+    filters = []
+    if body.filter:
+        f = body.filter
+        if f.city:
+            filters.append(contains(Property.city, f.city))
+        if f.property_type:
+            filters.append(Property.property_type == f.property_type)
+        if f.purpose:
+            filters.append(Property.purpose == f.purpose)
+        if f.is_active is not None:
+            filters.append(Property.is_active == f.is_active)
+        if f.is_featured is not None:
+            filters.append(Property.is_featured == f.is_featured)
+
+    return _run_bulk_update(
+        db, Property, body, values, filters, ("is_active", "is_featured"),
+        current_user, "property",
+    )
+
+
 # ===== CONTACTS MANAGEMENT =====
 
 @router.get("/contacts", response_model=ContactListResponse)
 async def list_contacts(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_admin),
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=50, ge=1, le=MAX_PAGE_LIMIT),
     status: Optional[str] = None
 ):
     """List all contacts (Admin only)"""
-    query = db.query(Contact)
+    filters = []
 
     if status:
-        # Validar status contra enum
-        valid_statuses = [s.value for s in ContactStatus]
-        if status.upper() not in valid_statuses:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid status. Valid values: {valid_statuses}"
-            )
-        query = query.filter(Contact.status == status.upper())
+        filters.append(Contact.status == _contact_status(status))
 
-    total = query.count()
-    contacts = query.order_by(Contact.created_at.desc()).offset(skip).limit(limit).all()
+    etag = data_version_etag(db, request, "contacts")
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
 
-    return {
-        "total": total,
-        "contacts": contacts
-    }
+    response = list_response(
+        db, Contact, ContactResponse, "contacts",
+        filters=filters, order_by=Contact.created_at.desc(),
+        skip=skip, limit=limit,
+    )
+    response.headers["ETag"] = etag
+    return response
 
 
 @router.patch("/contacts/{contact_id}/status")
@@ -309,43 +606,71 @@ async def update_contact_status(
     current_user: User = Depends(get_current_admin)
 ):
     """Update contact status (Admin only)"""
-    # Validar status contra enum
-    valid_statuses = [s.value for s in ContactStatus]
-    if body.status.upper() not in valid_statuses:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid status. Valid values: {valid_statuses}"
-        )
+    status = _contact_status(body.status)
 
     contact = db.query(Contact).filter(Contact.id == contact_id).first()
     if not contact:
         raise HTTPException(status_code=404, detail="Contact not found")
 
-    contact.status = body.status.upper()
+    previous = contact.status.value
+    contact.status = status
     db.commit()
+    record_event(
+        current_user, "contact.update_status", "contact", contact_id,
+        {"from": previous, "to": status},
+    )
+
+    return {"message": "Contact status updated", "status": status}
 
-    return {"message": "Contact status updated", "status": body.status.upper()}
+
+@router.patch("/contacts/bulk", response_model=BulkUpdateResponse)
+async def bulk_update_contacts(
+    body: ContactBulkUpdate,
+    db: Session = Depends(get_long_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """Set the status of many contacts by ids or filter (Admin only)"""
+    status = _contact_status(body.status)
+
+    filters = []
+    if body.filter:
+        f = body.filter
+        if f.status:
+            filters.append(Contact.status == _contact_status(f.status))
+        if f.broker_id:
+            filters.append(Contact.broker_id == f.broker_id)
+        if f.property_id:
+            filters.append(Contact.property_id == f.property_id)
+        if f.created_before:
+            filters.append(Contact.created_at < f.created_before)
+
+    return _run_bulk_update(
+        db, Contact, body, {"status": status}, filters, ("status",),
+        current_user, "contact",
+    )
 
 
 # ===== BROKERS MANAGEMENT =====
 
 @router.get("/brokers", response_model=BrokerListResponse)
 async def list_brokers(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_admin),
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=50, ge=1, le=MAX_PAGE_LIMIT)
 ):
     """List all brokers (Admin only)"""
-    query = db.query(Broker)
+    etag = data_version_etag(db, request, "brokers")
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
 
-    total = query.count()
-    brokers = query.offset(skip).limit(limit).all()
-
-    return {
-        "total": total,
-        "brokers": brokers
-    }
+    response = list_response(
+        db, Broker, BrokerResponse, "brokers", skip=skip, limit=limit
+    )
+    response.headers["ETag"] = etag
+    return response
 
 
 @router.patch("/brokers/{broker_id}/toggle-active")
@@ -361,15 +686,58 @@ async def toggle_broker_active(
 
     broker.is_active = not broker.is_active
     db.commit()
+    record_event(
+        current_user, "broker.toggle_active", "broker", broker_id,
+        {"is_active": broker.is_active},
+    )
 
     return {"message": f"Broker {'activated' if broker.is_active else 'deactivated'}", "is_active": broker.is_active}
 
 
+@router.patch("/brokers/bulk", response_model=BulkUpdateResponse)
+async def bulk_update_brokers(
+    body: BrokerBulkUpdate,
+    db: Session = Depends(get_long_db),
+    current_user: User = Depends(get_current_admin)
+):
+    """Activate/deactivate many brokers by ids or filter (Admin only)"""
+    filters = []
+    if body.filter:
+        if body.filter.city:
+            filters.append(contains(Broker.city, body.filter.city))
+        if body.filter.is_active is not None:
+            filters.append(Broker.is_active == body.filter.is_active)
+
+    return _run_bulk_update(
+        db, Broker, body, {"is_active": body.is_active}, filters,
+        ("is_active",), current_user, "broker",
+    )
+
+
+# ===== LEADS (Distribuicao de contatos) =====
+
+@router.post("/leads/assign", response_model=LeadAssignResponse)
+async def assign_leads(
+    db: Session = Depends(get_long_db),
+    current_user: User = Depends(get_current_admin),
+    batch_size: int = Query(default=100, ge=1, le=1000),
+):
+    """Assign unassigned contacts to the nearest active brokers (Admin only)"""
+    assignments = assign_unassigned_contacts(db, batch_size=batch_size)
+
+    return {
+        "assigned": len(assignments),
+        "remaining": count_unassigned(db),
+        "assignments": [vars(a) for a in assignments],
+    }
+
+
 # ===== EVALUATIONS (Avaliacoes de Imoveis) =====
 
 @router.get("/evaluations", response_model=EvaluationListResponse)
 async def list_evaluations(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_admin),
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=50, ge=1, le=MAX_PAGE_LIMIT),
@@ -377,29 +745,48 @@ async def list_evaluations(
     property_type: Optional[str] = None,
 ):
     """List all property evaluations (Admin only)"""
-    query = db.query(Evaluation)
+    filters = []
 
     if city:
-        query = query.filter(Evaluation.city.ilike(f"%{city}%"))
+        filters.append(contains(Evaluation.city, city))
     if property_type:
-        query = query.filter(
-            Evaluation.property_type.ilike(f"%{property_type}%")
-        )
-
-    total = query.count()
-    evaluations = query.order_by(
-        Evaluation.created_at.desc()
-    ).offset(skip).limit(limit).all()
-
-    return {
-        "total": total,
-        "evaluations": evaluations
-    }
+        filters.append(contains(Evaluation.property_type, property_type))
+
+    # A reavaliacao (UPDATE) tambem muda a versao: o trigger nao depende
+    # de coluna updated_at
+    etag = data_version_etag(db, request, "evaluations")
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    response = list_response(
+        db, Evaluation, EvaluationResponse, "evaluations",
+        filters=filters, order_by=Evaluation.created_at.desc(),
+        skip=skip, limit=limit,
+    )
+    response.headers["ETag"] = etag
+    return response
+
+
+@router.post("/evaluations/recompute", response_model=EvaluationRecomputeResponse)
+async def recompute_evaluations_endpoint(
+    payload: EvaluationRecomputeRequest,
+    db: Session = Depends(get_long_db),
+    current_user: User = Depends(get_current_admin),
+):
+    """Recompute evaluations from current comparables (Admin only)"""
+    return recompute_evaluations(
+        db,
+        ids=payload.ids,
+        city=payload.city,
+        limit=payload.limit,
+        dry_run=payload.dry_run,
+    )
 
 
 @router.get("/evaluations/stats")
 async def evaluation_stats(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_long_read_db),
     current_user: User = Depends(get_current_admin),
 ):
     """Get evaluation statistics (Admin only)"""
@@ -445,17 +832,269 @@ async def evaluation_stats(
     }
 
 
-# ===== CRON ENDPOINT (para Railway/schedulers externos) =====
+@router.get("/evaluations/analytics", response_model=EvaluationAnalyticsResponse)
+async def get_evaluation_analytics(
+    db: Session = Depends(get_long_read_db),
+    current_user: User = Depends(get_current_admin),
+    interval: str = Query(default="day", pattern="^(day|week)$"),
+    days: int = Query(default=90, ge=1, le=730),
+    city: Optional[str] = None,
+):
+    """Evaluation volumes, price percentiles and confidence breakdown (Admin only)"""
+    return evaluation_analytics(db, interval=interval, days=days, city=city)
 
-@router.get("/cron/status")
-async def cron_status(
-    db: Session = Depends(get_db),
-    x_cron_secret: Optional[str] = Header(None, alias="X-Cron-Secret")
+
+# ===== MARKET INDEX (preco/m2 por cidade/bairro/tipo/finalidade) =====
+
+@router.get("/market-index", response_model=MarketIndexListResponse)
+async def list_market_index(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=MAX_PAGE_LIMIT),
+    city: Optional[str] = None,
+    neighborhood: Optional[str] = None,
+    property_type: Optional[str] = None,
+    purpose: Optional[str] = None,
+):
+    """List precomputed price per m2 aggregates (Admin only)"""
+    filters = []
+
+    # Chaves gravadas normalizadas: igualdade direta no indice unico
+    for column, value in (
+        (MarketIndex.city, city),
+        (MarketIndex.neighborhood, neighborhood),
+        (MarketIndex.property_type, property_type),
+        (MarketIndex.purpose, purpose),
+    ):
+        if value is not None:
+            filters.append(column == normalize_key(value))
+
+    etag = data_version_etag(db, request, "market_index")
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    response = list_response(
+        db, MarketIndex, MarketIndexResponse, "market_index",
+        filters=filters, order_by=MarketIndex.listing_count.desc(),
+        skip=skip, limit=limit,
+    )
+    response.headers["ETag"] = etag
+    return response
+
+
+@router.post("/market-index/rebuild", response_model=MarketIndexRebuildResponse)
+async def rebuild_market_index_endpoint(
+    db: Session = Depends(get_long_db),
+    current_user: User = Depends(get_current_admin),
+    full: bool = False,
+):
+    """Rebuild the market index, incrementally unless full=true (Admin only)"""
+    return rebuild_market_index(db, full=full)
+
+
+# ===== NOTIFICATION CAMPAIGNS =====
+
+def _campaign_detail(db: Session, campaign: NotificationCampaign) -> dict:
+    return {
+        **NotificationCampaignResponse.model_validate(campaign).model_dump(),
+        "read_count": read_count(db, campaign),
+    }
+
+
+@router.post("/notifications/campaigns", response_model=NotificationCampaignDetail)
+async def create_notification_campaign(
+    payload: NotificationCampaignCreate,
+    db: Session = Depends(get_long_db),
+    current_user: User = Depends(get_current_admin),
+    background: bool = False,
 ):
     """
-    Verifica o status da ultima sincronizacao.
-    Requer X-Cron-Secret header quando CRON_SECRET esta configurado.
+    Create and dispatch a notification fan-out campaign; with
+    background=true it is dispatched by a worker job (Admin only)
     """
+    try:
+        campaign = create_campaign(
+            db,
+            type=payload.type,
+            audience=payload.audience,
+            title=payload.title,
+            message=payload.message,
+            link=payload.link,
+            property_ids=payload.property_ids,
+            user_ids=payload.user_ids,
+            created_by=current_user.id,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if background:
+        enqueue(
+            db, "notification_campaign", {"campaign_id": campaign.id},
+            created_by=current_user.id,
+        )
+        db.commit()
+    else:
+        dispatch_campaign(db, campaign)
+    return _campaign_detail(db, campaign)
+
+
+@router.get("/notifications/campaigns", response_model=NotificationCampaignListResponse)
+async def list_notification_campaigns(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=MAX_PAGE_LIMIT),
+    status: Optional[str] = None,
+):
+    """List notification campaigns (Admin only)"""
+    filters = []
+    if status:
+        filters.append(NotificationCampaign.status == status)
+    return list_response(
+        db, NotificationCampaign, NotificationCampaignResponse, "campaigns",
+        filters=filters, order_by=NotificationCampaign.created_at.desc(),
+        skip=skip, limit=limit,
+    )
+
+
+@router.get(
+    "/notifications/campaigns/{campaign_id}",
+    response_model=NotificationCampaignDetail,
+)
+async def get_notification_campaign(
+    campaign_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+):
+    """Get campaign status, recipients and read count (Admin only)"""
+    campaign = db.get(NotificationCampaign, campaign_id)
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return _campaign_detail(db, campaign)
+
+
+# ===== JOBS =====
+
+@router.post("/jobs", response_model=JobDetail)
+async def create_job(
+    payload: JobCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin),
+):
+    """Enqueue a background job for the workers (Admin only)"""
+    try:
+        job = enqueue(
+            db, payload.type, payload.payload, created_by=current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return JobDetail.model_validate(job)
+
+
+@router.get("/jobs", response_model=JobListResponse)
+async def list_jobs(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=MAX_PAGE_LIMIT),
+    status: Optional[str] = None,
+    type: Optional[str] = None,
+):
+    """List background jobs (Admin only)"""
+    filters = []
+    if status:
+        if status not in JOB_STATUSES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid status. Valid values: {list(JOB_STATUSES)}",
+            )
+        filters.append(Job.status == status)
+    if type:
+        filters.append(Job.type == type)
+    return list_response(
+        db, Job, JobResponse, "jobs",
+        filters=filters, order_by=Job.created_at.desc(),
+        skip=skip, limit=limit,
+    )
+
+
+def _get_job(db: Session, job_id: str) -> Job:
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=JobDetail)
+async def get_job(
+    job_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+):
+    """Get job status, progress and result (Admin only)"""
+    return JobDetail.model_validate(_get_job(db, job_id))
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobDetail)
+async def cancel_job_endpoint(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin),
+):
+    """Cancel a queued job (Admin only)"""
+    try:
+        job = cancel_job(db, _get_job(db, job_id))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JobDetail.model_validate(job)
+
+
+@router.post("/jobs/{job_id}/retry", response_model=JobDetail)
+async def retry_job_endpoint(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin),
+):
+    """Requeue a failed or cancelled job (Admin only)"""
+    try:
+        job = retry_job(db, _get_job(db, job_id))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JobDetail.model_validate(job)
+
+
+# ===== AUDIT =====
+
+@router.get("/audit", response_model=AuditEventListResponse)
+async def list_audit(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin),
+    limit: int = Query(default=50, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    actor_id: Optional[str] = None,
+    action: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """List admin audit events, newest first, by cursor (Admin only)"""
+    try:
+        return list_audit_events(
+            db, actor_id=actor_id, action=action, entity_type=entity_type,
+            entity_id=entity_id, since=since, until=until,
+            cursor=cursor, limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ===== CRON ENDPOINT (para Railway/schedulers externos) =====
+
+def _check_cron_secret(x_cron_secret: Optional[str]) -> None:
     if not settings.CRON_SECRET:
         raise HTTPException(
             status_code=503,
@@ -465,6 +1104,76 @@ async def cron_status(
     if x_cron_secret != settings.CRON_SECRET:
         raise HTTPException(status_code=401, detail="Invalid cron secret")
 
+
+@router.post("/cron/market-index")
+async def cron_market_index(
+    db: Session = Depends(get_long_db),
+    x_cron_secret: Optional[str] = Header(None, alias="X-Cron-Secret")
+):
+    """
+    Atualiza o indice de mercado apos uma importacao concluida.
+    Requer X-Cron-Secret header quando CRON_SECRET esta configurado.
+    """
+    _check_cron_secret(x_cron_secret)
+
+    result = refresh_after_import(db)
+    if result is None:
+        return {"status": "up_to_date"}
+    return {"status": "rebuilt", **result}
+
+
+@router.post("/cron/partitions")
+async def cron_partitions(
+    db: Session = Depends(get_long_db),
+    x_cron_secret: Optional[str] = Header(None, alias="X-Cron-Secret")
+):
+    """
+    Cria as particoes mensais futuras e aplica a retencao (Postgres).
+    Requer X-Cron-Secret header quando CRON_SECRET esta configurado.
+    """
+    _check_cron_secret(x_cron_secret)
+
+    return maintain_partitions(db)
+
+
+@router.post("/cron/counters/reconcile")
+async def cron_reconcile_counters(
+    db: Session = Depends(get_long_db),
+    x_cron_secret: Optional[str] = Header(None, alias="X-Cron-Secret")
+):
+    """
+    Recalcula favorite_count/contact_count dos imoveis.
+    Requer X-Cron-Secret header quando CRON_SECRET esta configurado.
+    """
+    _check_cron_secret(x_cron_secret)
+
+    return reconcile_counters(db)
+
+
+@router.post("/cron/notifications/reconcile-unread")
+async def cron_reconcile_unread(
+    db: Session = Depends(get_long_db),
+    x_cron_secret: Optional[str] = Header(None, alias="X-Cron-Secret")
+):
+    """
+    Recalcula os contadores de notificacoes nao lidas a partir de
+    notifications. Requer X-Cron-Secret header.
+    """
+    _check_cron_secret(x_cron_secret)
+    return reconcile_unread_counters(db)
+
+
+@router.get("/cron/status")
+async def cron_status(
+    db: Session = Depends(get_db),
+    x_cron_secret: Optional[str] = Header(None, alias="X-Cron-Secret")
+):
+    """
+    Verifica o status da ultima sincronizacao.
+    Requer X-Cron-Secret header quando CRON_SECRET esta configurado.
+    """
+    _check_cron_secret(x_cron_secret)
+
     last_log = db.query(ImportLog).order_by(
         ImportLog.started_at.desc()
     ).first()
@@ -1,8 +1,8 @@
-import time
-from collections import defaultdict
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.rate_limit import RateLimiter, build_backend
 from app.core.security import (
     verify_password,
     create_access_token,
@@ -13,25 +13,34 @@ from app.schemas import LoginRequest, TokenResponse, MeResponse
 
 router = APIRouter()
 
-# Simple in-memory rate limiter for login
-_login_attempts: dict[str, list[float]] = defaultdict(list)
-MAX_LOGIN_ATTEMPTS = 5
-LOGIN_WINDOW_SECONDS = 300  # 5 minutes
+# Rate limiter do login: por IP e por email, backend em memoria ou no banco
+rate_limit_backend = build_backend()
+login_ip_limiter = RateLimiter(
+    rate_limit_backend,
+    limit=settings.LOGIN_MAX_ATTEMPTS_PER_IP,
+    window_seconds=settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+    prefix="login:ip",
+)
+login_email_limiter = RateLimiter(
+    rate_limit_backend,
+    limit=settings.LOGIN_MAX_ATTEMPTS_PER_EMAIL,
+    window_seconds=settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+    prefix="login:email",
+)
 
 
-def _check_rate_limit(ip: str):
-    now = time.time()
-    # Clean old attempts
-    _login_attempts[ip] = [
-        t for t in _login_attempts[ip]
-        if now - t < LOGIN_WINDOW_SECONDS
-    ]
-    if len(_login_attempts[ip]) >= MAX_LOGIN_ATTEMPTS:
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Too many login attempts. Try again later."
-        )
-    _login_attempts[ip].append(now)
+def _check_rate_limit(ip: str, email: str):
+    for limiter, key in (
+        (login_ip_limiter, ip),
+        (login_email_limiter, email.lower()),
+    ):
+        result = limiter.hit(key)
+        if not result.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts. Try again later.",
+                headers={"Retry-After": str(result.retry_after)},
+            )
 
 
 @router.post("/login", response_model=TokenResponse)
@@ -42,7 +51,7 @@ async def login(
 ):
     """Login admin user"""
     client_ip = request.client.host if request.client else "unknown"
-    _check_rate_limit(client_ip)
+    _check_rate_limit(client_ip, request_body.email)
 
     user = db.query(User).filter(
         User.email == request_body.email
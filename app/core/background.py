@@ -0,0 +1,45 @@
+"""
+Tarefas periodicas em background dentro do processo da API (asyncio).
+A funcao e sincrona (usa Session) e roda em thread com asyncio.to_thread
+para nao bloquear o event loop.
+"""
+import asyncio
+import logging
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    def __init__(self, name: str, interval: float, func: Callable[[], object]):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+    async def run_once(self) -> None:
+        try:
+            await asyncio.to_thread(self.func)
+        except Exception:
+            logger.exception("Periodic task %s failed", self.name)
+
+    async def stop(self, final_run: bool = True) -> None:
+        """Cancela o loop; com final_run executa uma ultima vez"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if final_run:
+            await self.run_once()
@@ -0,0 +1,132 @@
+"""
+Compressao das respostas HTTP (brotli quando disponivel, senao gzip).
+"""
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli e opcional; sem ele fica so gzip
+    brotli = None
+
+
+def _accepts(accept_encoding: str, coding: str) -> bool:
+    """Verifica se o Accept-Encoding aceita a codificacao (q > 0)"""
+    for item in accept_encoding.split(","):
+        name, *params = item.split(";")
+        if name.strip().lower() != coding:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        return quality > 0
+    return False
+
+
+class CompressionMiddleware:
+    """
+    Comprime respostas maiores que minimum_size.
+    Prefere brotli (br) quando o cliente aceita e o pacote esta instalado.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            accept_encoding = Headers(scope=scope).get("Accept-Encoding", "")
+            if brotli is not None and _accepts(accept_encoding, "br"):
+                responder = BrotliResponder(
+                    self.app, self.minimum_size, quality=self.brotli_quality
+                )
+                await responder(scope, receive, send)
+                return
+            if _accepts(accept_encoding, "gzip"):
+                responder = GZipResponder(
+                    self.app, self.minimum_size, compresslevel=self.gzip_level
+                )
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class BrotliResponder:
+    """Mesmo fluxo do GZipResponder do Starlette, usando brotli"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int = 4) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.send: Send = _unattached_send
+        self.initial_message: Message = {}
+        self.started = False
+        self.content_encoding_set = False
+        self.compressor = brotli.Compressor(quality=quality)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_with_brotli)
+
+    async def send_with_brotli(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Segura o inicio ate saber se o corpo sera comprimido
+            self.initial_message = message
+            headers = Headers(raw=self.initial_message["headers"])
+            self.content_encoding_set = "content-encoding" in headers
+        elif message_type == "http.response.body" and self.content_encoding_set:
+            if not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+        elif message_type == "http.response.body" and not self.started:
+            self.started = True
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if len(body) < self.minimum_size and not more_body:
+                # Respostas pequenas vao sem compressao
+                await self.send(self.initial_message)
+                await self.send(message)
+                return
+
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = "br"
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body:
+                body = self.compressor.process(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+            else:
+                # Inicio de uma resposta em streaming
+                del headers["Content-Length"]
+                body = self.compressor.process(body) + self.compressor.flush()
+            message["body"] = body
+
+            await self.send(self.initial_message)
+            await self.send(message)
+        elif message_type == "http.response.body":
+            # Restante de uma resposta em streaming
+            body = self.compressor.process(message.get("body", b""))
+            if message.get("more_body", False):
+                body += self.compressor.flush()
+            else:
+                body += self.compressor.finish()
+            message["body"] = body
+            await self.send(message)
+
+
+async def _unattached_send(message: Message):
+    raise RuntimeError("send awaitable not set")  # pragma: no cover
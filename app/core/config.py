@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 import os
 from dotenv import load_dotenv
 
@@ -19,6 +19,51 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
 
+    # Replicas de leitura (URLs separadas por virgula). Replica com atraso
+    # acima de REPLICA_MAX_LAG_SECONDS sai do rodizio; a saude de cada uma
+    # e verificada em background a cada REPLICA_CHECK_SECONDS, com timeout
+    # de conexao de REPLICA_CONNECT_TIMEOUT_SECONDS
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 10.0
+    REPLICA_CHECK_SECONDS: float = 5.0
+    REPLICA_CONNECT_TIMEOUT_SECONDS: int = 3
+
+    # Pool de conexoes por processo. Sem DB_POOL_SIZE/DB_MAX_OVERFLOW o
+    # orcamento DB_MAX_CONNECTIONS (por servidor) e dividido entre os
+    # WEB_CONCURRENCY workers (mesma variavel que o uvicorn usa) e os
+    # WORKER_PROCESSES da fila de jobs; nas replicas, so entre os
+    # WEB_CONCURRENCY. Web e worker precisam dos mesmos valores das duas
+    # variaveis. Sem pre-ping, conexoes sao recicladas apos
+    # DB_POOL_RECYCLE_SECONDS e conexoes caidas sao descartadas no
+    # primeiro erro
+    WEB_CONCURRENCY: int = 1
+    DB_MAX_CONNECTIONS: int = 30
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: Optional[int] = None
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_TIMEOUT_SECONDS: int = 10
+    DB_POOL_PRE_PING: bool = False
+
+    # Cache de SQL compilado do SQLAlchemy (entradas por engine). Com o
+    # driver psycopg 3 (postgresql+psycopg://) uma consulta vira prepared
+    # statement no servidor apos DB_PREPARE_THRESHOLD execucoes na mesma
+    # conexao (0 desliga; necessario com PgBouncer em modo transaction)
+    DB_QUERY_CACHE_SIZE: int = 1200
+    DB_PREPARE_THRESHOLD: int = 5
+
+    # statement_timeout (ms, Postgres): padrao das conexoes (listagens e
+    # leituras) e das sessoes longas (lote, manutencao, cron); 0 desliga
+    DB_STATEMENT_TIMEOUT_MS: int = 15_000
+    DB_LONG_STATEMENT_TIMEOUT_MS: int = 300_000
+
+    def get_replica_urls(self) -> List[str]:
+        """Retorna lista de URLs das replicas de leitura"""
+        return [
+            url.strip()
+            for url in self.DATABASE_REPLICA_URLS.split(',')
+            if url.strip()
+        ]
+
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
@@ -49,6 +94,97 @@ class Settings(BaseSettings):
         "http://localhost:5173",
     ]
 
+    # Rate limit do login (tentativas por janela, por IP e por email).
+    # O limite por IP segue o antigo (5 a cada 5 minutos); redes com
+    # muitos admins atras do mesmo IP (NAT do escritorio) podem subir
+    # LOGIN_MAX_ATTEMPTS_PER_IP. RATE_LIMIT_BACKEND: memory (por processo)
+    # ou database (compartilhado entre workers, tabela rate_limit_counters)
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: int = 300
+    LOGIN_MAX_ATTEMPTS_PER_IP: int = 5
+    LOGIN_MAX_ATTEMPTS_PER_EMAIL: int = 5
+
+    # Distribuicao de leads
+    LEAD_ROUTING_MAX_DISTANCE_KM: float = 50.0
+    LEAD_ROUTING_CANDIDATES: int = 5
+
+    # Compressao de respostas (bytes minimos para comprimir)
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+
+    # Contadores dos imoveis (view/contact/favorite): intervalo do flush
+    # em lote e maximo de eventos de property_events por flush
+    COUNTER_FLUSH_SECONDS: float = 5.0
+    COUNTER_EVENTS_BATCH: int = 10_000
+
+    # Auditoria das acoes do admin: intervalo do flush em lote, linhas por
+    # INSERT e limite de eventos pendentes em memoria (acima dele os
+    # eventos novos sao descartados e contados em dropped)
+    AUDIT_FLUSH_SECONDS: float = 2.0
+    AUDIT_FLUSH_BATCH: int = 500
+    AUDIT_BUFFER_MAX: int = 10_000
+
+    # Particoes mensais (Postgres): meses criados a frente e retencao em
+    # meses por tabela (0 = manter tudo). Sem PARTITION_RETENTION_DROP as
+    # particoes antigas sao so desanexadas (DETACH), nao apagadas
+    PARTITION_MONTHS_AHEAD: int = 3
+    EVALUATIONS_RETENTION_MONTHS: int = 24
+    NOTIFICATIONS_RETENTION_MONTHS: int = 12
+    IMPORT_LOGS_RETENTION_MONTHS: int = 12
+    PARTITION_RETENTION_DROP: bool = False
+
+    # Startup do banco em cada worker: "check" avisa se o schema nao
+    # esta no head do Alembic, "strict" falha, "create_all" cria as
+    # tabelas (desenvolvimento local) e "off" nao faz nada.
+    # DB_POOL_WARMUP abre as conexoes do pool em paralelo no startup
+    DB_STARTUP_MODE: str = "check"
+    DB_POOL_WARMUP: bool = True
+
+    # Queda de preco na importacao: reducao minima (%) de sale_price ou
+    # rental_price para notificar quem favoritou o imovel
+    PRICE_DROP_MIN_PERCENT: float = 5.0
+
+    # Fila de jobs (python -m app.worker): processos por worker, intervalo
+    # de polling, backoff das novas tentativas (base * 2^(tentativa-1),
+    # ate o maximo) e heartbeat; jobs running sem heartbeat ha mais de
+    # JOB_STALE_SECONDS voltam para a fila. JOB_CONCURRENCY sobrescreve o
+    # limite de jobs simultaneos por tipo ("tipo=n,tipo=n")
+    WORKER_PROCESSES: int = 1
+    JOB_POLL_SECONDS: float = 2.0
+    JOB_RETRY_BASE_SECONDS: float = 30.0
+    JOB_RETRY_MAX_SECONDS: float = 3600.0
+    JOB_HEARTBEAT_SECONDS: float = 30.0
+    JOB_STALE_SECONDS: float = 300.0
+    JOB_CONCURRENCY: str = ""
+
+    def get_job_concurrency(self) -> Dict[str, int]:
+        """Retorna os limites de concorrencia por tipo de job"""
+        limits = {}
+        for item in self.JOB_CONCURRENCY.split(','):
+            name, _, value = item.partition('=')
+            if name.strip() and value.strip():
+                limits[name.strip()] = int(value)
+        return limits
+
+    # Duplicados entre feeds: largura da faixa de area (m2) e precisao do
+    # geohash nas chaves de bloqueio, similaridade minima (0-1) para dois
+    # anuncios serem a mesma unidade e tamanho maximo de um bloco (blocos
+    # maiores sao ignorados para nao virar comparacao O(n^2))
+    DEDUP_AREA_STEP_M2: float = 5.0
+    DEDUP_GEOHASH_PRECISION: int = 7
+    DEDUP_MIN_SCORE: float = 0.8
+    DEDUP_MAX_BLOCK: int = 200
+
+    # Analytics dos logs de importacao: janelas padrao em dias ("1,7,30")
+    IMPORT_ANALYTICS_WINDOWS: str = "1,7,30"
+
+    def get_import_analytics_windows(self) -> List[int]:
+        """Retorna as janelas (dias) do analytics de importacao"""
+        return [
+            int(days) for days in self.IMPORT_ANALYTICS_WINDOWS.split(',')
+            if days.strip()
+        ]
+
     # Server
     HOST: str = "0.0.0.0"
     PORT: int = 8000
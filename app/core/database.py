@@ -1,23 +1,81 @@
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
-from typing import Generator
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from typing import Generator, Optional
+import logging
 import os
 from dotenv import load_dotenv
+from app.core.config import settings
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "alembic.ini"
+)
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
+# Chave em Session.info com o statement_timeout (ms) da sessao
+STATEMENT_TIMEOUT_KEY = "statement_timeout_ms"
+
+
+def pool_options(processes: Optional[int] = None) -> dict:
+    """
+    Parametros do pool por processo. Sem DB_POOL_SIZE/DB_MAX_OVERFLOW, o
+    orcamento DB_MAX_CONNECTIONS de cada servidor e dividido entre os
+    processes que se conectam a ele, cada um com pool proprio: no
+    primario os WEB_CONCURRENCY workers do uvicorn mais os
+    WORKER_PROCESSES da fila de jobs (padrao); nas replicas so os do
+    uvicorn. 1/3 fica fixo no pool e o resto como overflow.
+    """
+    if processes is None:
+        processes = settings.WEB_CONCURRENCY + settings.WORKER_PROCESSES
+    per_process = max(2, settings.DB_MAX_CONNECTIONS // max(1, processes))
+    pool_size = settings.DB_POOL_SIZE or max(1, per_process // 3)
+    max_overflow = (
+        settings.DB_MAX_OVERFLOW
+        if settings.DB_MAX_OVERFLOW is not None
+        else max(0, per_process - pool_size)
+    )
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def engine_options(url: str, processes: Optional[int] = None) -> dict:
+    """
+    Opcoes do create_engine (primario e replicas). No Postgres o
+    statement_timeout padrao vai nas opcoes de conexao, sem custo por
+    requisicao; sessoes longas sobem o limite com SET LOCAL. Com psycopg 3
+    as consultas repetidas viram prepared statements no servidor
+    (psycopg2 nao suporta).
+    """
+    options = pool_options(processes)
+    options["query_cache_size"] = settings.DB_QUERY_CACHE_SIZE
+    connect_args = {}
+    if url.startswith("postgres") and settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = (
+            f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+        )
+    if url.startswith("postgresql+psycopg:"):
+        connect_args["prepare_threshold"] = settings.DB_PREPARE_THRESHOLD or None
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
 # Create engine
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -28,6 +86,17 @@ class Base(DeclarativeBase):
     pass
 
 
+@event.listens_for(Session, "after_begin")
+def _apply_statement_timeout(session, transaction, connection):
+    timeout = session.info.get(STATEMENT_TIMEOUT_KEY)
+    if timeout is not None and connection.dialect.name == "postgresql":
+        # is_local=true: vale so ate o fim da transacao
+        connection.execute(
+            text("SELECT set_config('statement_timeout', :timeout, true)"),
+            {"timeout": str(int(timeout))},
+        )
+
+
 def get_db() -> Generator:
     """
     Dependency to get database session
@@ -39,6 +108,20 @@ def get_db() -> Generator:
         db.close()
 
 
+def get_long_db() -> Generator:
+    """
+    Sessao no primario com DB_LONG_STATEMENT_TIMEOUT_MS, para endpoints
+    de manutencao e operacoes em lote
+    """
+    db = SessionLocal(
+        info={STATEMENT_TIMEOUT_KEY: settings.DB_LONG_STATEMENT_TIMEOUT_MS}
+    )
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def check_db_connection() -> bool:
     """
     Check if database connection is healthy
@@ -51,9 +134,86 @@ def check_db_connection() -> bool:
         return False
 
 
+def schema_revision_status(bind: Optional[Engine] = None) -> dict:
+    """
+    Compara a revisao do banco (tabela alembic_version) com os heads das
+    migracoes. So le uma tabela, sem refletir o schema inteiro.
+    """
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    bind = bind or engine
+    expected = set(ScriptDirectory.from_config(Config(ALEMBIC_INI)).get_heads())
+    with bind.connect() as conn:
+        current = set(MigrationContext.configure(conn).get_current_heads())
+    return {
+        "current": sorted(current),
+        "expected": sorted(expected),
+        "up_to_date": current == expected,
+    }
+
+
+def check_schema_revision(strict: bool = False) -> bool:
+    """
+    Verificacao de startup: avisa (ou, com strict, falha) se o banco nao
+    esta no head das migracoes. As migracoes rodam no pre-deploy
+    (alembic upgrade head), nao no boot de cada worker.
+    """
+    try:
+        status = schema_revision_status()
+    except Exception:
+        if strict:
+            raise
+        logger.exception("Could not check database schema revision")
+        return False
+    if status["up_to_date"]:
+        return True
+    message = (
+        f"Database schema revision {status['current']} does not match "
+        f"migration heads {status['expected']}; run 'alembic upgrade head'"
+    )
+    if strict:
+        raise RuntimeError(message)
+    logger.warning(message)
+    return False
+
+
+def warm_pool(bind: Optional[Engine] = None, size: Optional[int] = None) -> int:
+    """
+    Abre ate size conexoes do pool em paralelo (SELECT 1 em cada) e as
+    devolve ao pool, para que as primeiras requisicoes nao paguem o
+    connect. Retorna quantas conexoes foram abertas.
+    """
+    bind = bind or engine
+    if size is None:
+        size = bind.pool.size() if hasattr(bind.pool, "size") else 1
+    if size <= 0:
+        return 0
+
+    def _open():
+        conn = bind.connect()
+        conn.execute(text("SELECT 1"))
+        return conn
+
+    connections = []
+    with ThreadPoolExecutor(max_workers=size) as executor:
+        futures = [executor.submit(_open) for _ in range(size)]
+        for future in futures:
+            try:
+                connections.append(future.result())
+            except Exception:
+                logger.exception("Connection pool warm-up failed")
+    # So devolve depois que todas abriram, senao o pool reaproveita a mesma
+    for conn in connections:
+        conn.close()
+    return len(connections)
+
+
 def init_db():
     """
-    Initialize database - create all tables
+    Initialize database - create all tables (so para desenvolvimento
+    local; em producao o schema vem das migracoes do Alembic)
     """
     from app.models import (
         User,
@@ -63,8 +223,18 @@ def init_db():
         Contact,
         Favorite,
         Notification,
+        NotificationCampaign,
+        NotificationCounter,
         ImportLog,
         Evaluation,
+        MarketIndex,
+        RateLimitCounter,
+        PropertyEvent,
+        Job,
+        PropertyDuplicate,
+        PropertyChange,
+        AuditEvent,
+        DataVersion,
     )
 
     Base.metadata.create_all(bind=engine)
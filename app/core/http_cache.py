@@ -0,0 +1,121 @@
+"""
+ETag / If-None-Match para os GETs do admin.
+
+Dois caminhos:
+- ETagMiddleware calcula um ETag forte a partir do corpo de qualquer
+  resposta 200 de GET que ainda nao tenha ETag, e responde 304 se bater.
+- data_version_etag/not_modified permitem que um endpoint responda 304
+  antes de consultar e serializar, usando os contadores de versao das
+  tabelas de origem (app/models/data_version.py).
+"""
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.models.data_version import DataVersion
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparacao fraca do If-None-Match (RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _make_etag(data: bytes) -> str:
+    return '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+
+
+def data_version_etag(db: Session, request: Request, *names: str) -> str:
+    """
+    ETag a partir da versao dos dados: o contador de cada tabela (ex.:
+    "properties") mais o path, a query string e a versao da app. Uma
+    leitura pela chave primaria de data_versions.
+    """
+    versions = dict(db.execute(
+        select(DataVersion.name, DataVersion.version)
+        .where(DataVersion.name.in_(names))
+    ).all())
+
+    parts = [settings.APP_VERSION, request.url.path, str(request.query_params)]
+    parts.extend(f"{name}={versions.get(name, 0)}" for name in names)
+    return _make_etag("|".join(parts).encode())
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Resposta 304 se o If-None-Match do cliente bater com o ETag"""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
+class ETagMiddleware:
+    """
+    Adiciona ETag forte (hash do corpo) em respostas 200 de GET
+    e devolve 304 quando o If-None-Match bate. Respostas em streaming
+    e respostas que ja trazem ETag passam direto.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_with_etag(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if message["status"] != 200 or "etag" in headers:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False):
+                # Streaming: nao da para calcular o hash sem bufferizar tudo
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            etag = _make_etag(body)
+            if etag_matches(if_none_match, etag):
+                await send({
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(b"etag", etag.encode())],
+                })
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["ETag"] = etag
+            await send(start_message)
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
@@ -0,0 +1,157 @@
+"""
+Rate limiter com janela deslizante aproximada (sliding window counter).
+
+Cada chave guarda so tres inteiros: inicio da janela fixa atual, contagem
+da janela anterior e contagem da atual. A estimativa de eventos nos
+ultimos window segundos e
+
+    anterior * (1 - decorrido / window) + atual
+
+entao cada verificacao e O(1) em tempo e memoria, sem lista de timestamps.
+
+Backends:
+- MemoryBackend: por processo, limitado a max_keys chaves com descarte
+  LRU (OrderedDict), entao muitos IPs distintos nao crescem a memoria.
+- DatabaseBackend: tabela rate_limit_counters, um unico
+  INSERT ... ON CONFLICT DO UPDATE ... RETURNING por verificacao;
+  compartilhado entre workers (Postgres ou SQLite).
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+from sqlalchemy import case, delete
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.rate_limit import RateLimitCounter
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    estimated: float
+    retry_after: int  # segundos
+
+
+class MemoryBackend:
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._counters: OrderedDict[str, tuple[int, int, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def hit(self, key: str, window_start: int, window: int) -> tuple[int, int]:
+        """Conta um evento; retorna (anterior, atual)"""
+        with self._lock:
+            start, previous, current = self._counters.get(key, (window_start, 0, 0))
+            if start != window_start:
+                previous = current if start == window_start - window else 0
+                current = 0
+            current += 1
+            self._counters[key] = (window_start, previous, current)
+            self._counters.move_to_end(key)
+            if len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        return previous, current
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+class DatabaseBackend:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        prune_every: int = 1000,
+    ):
+        self.session_factory = session_factory
+        self.prune_every = prune_every
+        self._hits = 0
+
+    def hit(self, key: str, window_start: int, window: int) -> tuple[int, int]:
+        table = RateLimitCounter.__table__
+        c = table.c
+        db = self.session_factory()
+        try:
+            insert = (
+                postgresql_insert
+                if db.get_bind().dialect.name == "postgresql"
+                else sqlite_insert
+            )
+            stmt = insert(table).values(
+                key=key, window_start=window_start, previous=0, current=1
+            )
+            # Do lado direito do SET, c.* sao os valores antes do update
+            same = c.window_start == stmt.excluded.window_start
+            adjacent = c.window_start == stmt.excluded.window_start - window
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[c.key],
+                set_={
+                    "previous": case(
+                        (same, c.previous), (adjacent, c.current), else_=0
+                    ),
+                    "current": case((same, c.current + 1), else_=1),
+                    "window_start": stmt.excluded.window_start,
+                },
+            ).returning(c.previous, c.current)
+            previous, current = db.execute(stmt).one()
+
+            self._hits += 1
+            if self._hits % self.prune_every == 0:
+                db.execute(delete(table).where(
+                    c.window_start < window_start - window
+                ))
+            db.commit()
+        finally:
+            db.close()
+        return previous, current
+
+    def reset(self) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(delete(RateLimitCounter.__table__))
+            db.commit()
+        finally:
+            db.close()
+
+
+class RateLimiter:
+    def __init__(self, backend, limit: int, window_seconds: int, prefix: str):
+        self.backend = backend
+        self.limit = limit
+        self.window = window_seconds
+        self.prefix = prefix
+
+    def hit(self, key: str, now: Optional[float] = None) -> RateLimitResult:
+        """Conta uma tentativa e diz se ela esta dentro do limite"""
+        now = time.time() if now is None else now
+        window_start = int(now // self.window) * self.window
+        previous, current = self.backend.hit(
+            f"{self.prefix}:{key}", window_start, self.window
+        )
+
+        elapsed = now - window_start
+        estimated = previous * (1 - elapsed / self.window) + current
+        return RateLimitResult(
+            allowed=estimated <= self.limit,
+            estimated=estimated,
+            retry_after=max(1, math.ceil(self.window - elapsed)),
+        )
+
+
+def build_backend():
+    if settings.RATE_LIMIT_BACKEND == "database":
+        from app.core.database import SessionLocal
+        return DatabaseBackend(SessionLocal)
+    if settings.RATE_LIMIT_BACKEND == "memory":
+        return MemoryBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    raise ValueError(
+        f"Unknown RATE_LIMIT_BACKEND: {settings.RATE_LIMIT_BACKEND}"
+    )
@@ -0,0 +1,271 @@
+"""
+Roteamento de leitura para replicas do banco.
+
+Com DATABASE_REPLICA_URLS configurado, os GETs do admin usam get_read_db,
+que escolhe uma replica em rodizio (round-robin). A saude das replicas e
+verificada fora das requisicoes, por uma tarefa em background do lifespan
+(check_replicas a cada REPLICA_CHECK_SECONDS, conexao limitada a
+REPLICA_CONNECT_TIMEOUT_SECONDS): se a conexao falha ou o atraso de
+replicacao passa de REPLICA_MAX_LAG_SECONDS ela sai do rodizio ate a
+proxima verificacao. pick so le o resultado em cache; replica nunca
+verificada, ou com verificacao antiga (tarefa parada), tambem fica de
+fora. Sem replica disponivel a leitura vai para o primario.
+
+Leitura apos escrita: ReadAfterWriteMiddleware responde as escritas com
+sucesso (POST/PUT/PATCH/DELETE) com o header X-Read-Primary-Until (e o
+cookie de mesmo nome, para clientes da mesma origem). O painel e um
+cliente cross-origin com token Bearer, que nao devolve o cookie: ele
+guarda o valor do header e o reenvia nas leituras seguintes. Ate esse
+instante (REPLICA_MAX_LAG_SECONDS apos a escrita) as leituras do cliente
+vao para o primario, entao ele ve o que acabou de gravar.
+
+Sem replicas configuradas get_read_db usa o primario (SessionLocal).
+"""
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Generator, Optional
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import sessionmaker
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.database import STATEMENT_TIMEOUT_KEY, SessionLocal, engine_options
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_COOKIE = "salu_read_primary_until"
+PRIMARY_HEADER = "X-Read-Primary-Until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+# Verificacao mais antiga que STALE_CHECKS intervalos nao vale mais
+STALE_CHECKS = 3
+
+# Atraso de uma replica Postgres em segundos; 0 quando ja aplicou todo o
+# WAL recebido (sem escritas no primario o replay_timestamp envelhece)
+POSTGRES_LAG = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """
+)
+
+
+def replication_lag_seconds(conn: Connection) -> float:
+    if conn.dialect.name == "postgresql":
+        return float(conn.execute(POSTGRES_LAG).scalar_one())
+    conn.execute(text("SELECT 1"))
+    return 0.0
+
+
+@dataclass
+class Replica:
+    engine: Engine
+    session_factory: sessionmaker
+    healthy: bool = False
+    lag: Optional[float] = None
+    checked_at: Optional[float] = None
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        urls: list[str],
+        max_lag_seconds: float,
+        check_seconds: float,
+        engine_factory: Callable[[str], Engine] = create_engine,
+    ):
+        self.max_lag_seconds = max_lag_seconds
+        self.check_seconds = check_seconds
+        self.replicas = []
+        for url in urls:
+            engine = engine_factory(url)
+            self.replicas.append(Replica(
+                engine=engine,
+                session_factory=sessionmaker(
+                    autocommit=False, autoflush=False, bind=engine
+                ),
+            ))
+        self._next = itertools.count()
+
+    def check(self, replica: Replica, now: Optional[float] = None) -> bool:
+        """Atualiza saude e atraso da replica"""
+        now = time.monotonic() if now is None else now
+        try:
+            with replica.engine.connect() as conn:
+                replica.lag = replication_lag_seconds(conn)
+            replica.healthy = replica.lag <= self.max_lag_seconds
+        except Exception:
+            if replica.healthy:
+                logger.warning("Read replica %s is unavailable", replica.engine.url)
+            replica.lag = None
+            replica.healthy = False
+        replica.checked_at = now
+        return replica.healthy
+
+    def check_all(self, now: Optional[float] = None) -> None:
+        """Verifica todas as replicas (tarefa em background, nao a requisicao)"""
+        for replica in self.replicas:
+            self.check(replica, now)
+
+    def _usable(self, replica: Replica, now: float) -> bool:
+        return (
+            replica.healthy
+            and replica.checked_at is not None
+            and now - replica.checked_at < self.check_seconds * STALE_CHECKS
+        )
+
+    def pick(self, now: Optional[float] = None) -> Optional[Replica]:
+        """Proxima replica saudavel do rodizio, ou None (usar o primario)"""
+        now = time.monotonic() if now is None else now
+        count = len(self.replicas)
+        start = next(self._next)
+        for offset in range(count):
+            replica = self.replicas[(start + offset) % count]
+            if self._usable(replica, now):
+                return replica
+        return None
+
+    def status(self) -> list[dict]:
+        return [
+            {
+                "url": replica.engine.url.render_as_string(hide_password=True),
+                "healthy": replica.healthy,
+                "lag_seconds": replica.lag,
+            }
+            for replica in self.replicas
+        ]
+
+
+_router: Optional[ReplicaRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_replica_router() -> Optional[ReplicaRouter]:
+    """Router criado no primeiro uso (engines das replicas sao lazy)"""
+    global _router
+    urls = settings.get_replica_urls()
+    if not urls:
+        return None
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ReplicaRouter(
+                    urls,
+                    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+                    check_seconds=settings.REPLICA_CHECK_SECONDS,
+                    engine_factory=lambda url: create_engine(
+                        url, **replica_engine_options(url)
+                    ),
+                )
+    return _router
+
+
+def replica_engine_options(url: str) -> dict:
+    """
+    engine_options com timeout de conexao (replica fora do ar falha
+    rapido). O pool divide o orcamento so entre os processos web: o
+    worker da fila nao le das replicas
+    """
+    options = engine_options(url, processes=settings.WEB_CONCURRENCY)
+    if url.startswith("postgres"):
+        options["connect_args"] = {
+            **options.get("connect_args", {}),
+            "connect_timeout": settings.REPLICA_CONNECT_TIMEOUT_SECONDS,
+        }
+    return options
+
+
+def check_replicas() -> None:
+    """Tarefa periodica do lifespan: atualiza a saude das replicas"""
+    router = get_replica_router()
+    if router is not None:
+        router.check_all()
+
+
+def reads_from_primary(request: Request, now: Optional[float] = None) -> bool:
+    """Cliente escreveu ha pouco (header ou cookie de leitura apos escrita)"""
+    now = time.time() if now is None else now
+    for value in (
+        request.headers.get(PRIMARY_HEADER),
+        request.cookies.get(PRIMARY_COOKIE),
+    ):
+        try:
+            if value and float(value) > now:
+                return True
+        except ValueError:
+            continue
+    return False
+
+
+def _read_session(request: Request, info: Optional[dict] = None) -> Generator:
+    session_factory = SessionLocal
+    router = get_replica_router()
+    if router is not None and not reads_from_primary(request):
+        replica = router.pick()
+        if replica is not None:
+            session_factory = replica.session_factory
+    db = session_factory(info=info or {})
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db(request: Request) -> Generator:
+    """
+    Dependency para endpoints so de leitura: sessao em uma replica
+    saudavel ou, sem replica/apos escrita recente, no primario
+    """
+    yield from _read_session(request)
+
+
+def get_long_read_db(request: Request) -> Generator:
+    """get_read_db com DB_LONG_STATEMENT_TIMEOUT_MS (relatorios/analytics)"""
+    yield from _read_session(
+        request,
+        {STATEMENT_TIMEOUT_KEY: settings.DB_LONG_STATEMENT_TIMEOUT_MS},
+    )
+
+
+class ReadAfterWriteMiddleware:
+    """
+    Em escritas com sucesso, responde com PRIMARY_HEADER e o cookie
+    PRIMARY_COOKIE valendo REPLICA_MAX_LAG_SECONDS. So age quando ha
+    replicas configuradas.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] in SAFE_METHODS
+            or not settings.get_replica_urls()
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                seconds = max(1, int(settings.REPLICA_MAX_LAG_SECONDS))
+                until = f"{time.time() + seconds:.0f}"
+                headers = MutableHeaders(scope=message)
+                headers[PRIMARY_HEADER] = until
+                headers.append(
+                    "Set-Cookie",
+                    f"{PRIMARY_COOKIE}={until}; "
+                    f"Max-Age={seconds}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -4,6 +4,7 @@ from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.core.database import get_db
@@ -11,6 +12,10 @@ from app.models.user import User
 
 security = HTTPBearer()
 
+# Executado em toda requisicao autenticada: montado uma vez, com o id
+# como parametro
+USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
@@ -68,7 +73,7 @@ async def get_current_user(
     if user_id is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.execute(USER_BY_ID, {"user_id": user_id}).scalar_one_or_none()
     if user is None:
         raise credentials_exception
 
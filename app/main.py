@@ -1,17 +1,68 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.background import PeriodicTask
 from app.core.config import settings
-from app.core.database import init_db, check_db_connection
+from app.core.compression import CompressionMiddleware
+from app.core.http_cache import ETagMiddleware
+from app.core.replicas import (
+    PRIMARY_HEADER, ReadAfterWriteMiddleware, check_replicas,
+)
+from app.core.database import (
+    check_db_connection,
+    check_schema_revision,
+    init_db,
+    warm_pool,
+)
 from app.api import admin, auth
+from app.services.audit import flush_audit_job
+from app.services.counters import flush_counters_job
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: initialize database tables
-    init_db()
+    # Startup: as migracoes rodam no pre-deploy (alembic upgrade head);
+    # aqui so conferimos a revisao. create_all fica para desenvolvimento
+    # local. O aviso do modo "check" e o aquecimento do pool rodam em
+    # segundo plano, sem atrasar o startup
+    mode = settings.DB_STARTUP_MODE
+    startup_tasks = []
+    if mode == "create_all":
+        init_db()
+    elif mode == "strict":
+        check_schema_revision(strict=True)
+    elif mode == "check":
+        startup_tasks.append(asyncio.to_thread(check_schema_revision))
+    elif mode != "off":
+        raise ValueError(f"Unknown DB_STARTUP_MODE: {mode}")
+    if settings.DB_POOL_WARMUP:
+        startup_tasks.append(asyncio.to_thread(warm_pool))
+    background = [asyncio.create_task(task) for task in startup_tasks]
+    counter_flusher = PeriodicTask(
+        "counter-flush", settings.COUNTER_FLUSH_SECONDS, flush_counters_job
+    )
+    counter_flusher.start()
+    audit_flusher = PeriodicTask(
+        "audit-flush", settings.AUDIT_FLUSH_SECONDS, flush_audit_job
+    )
+    audit_flusher.start()
+    # Saude das replicas verificada fora das requisicoes (a primeira ja no
+    # startup, em segundo plano; ate la as leituras vao para o primario)
+    replica_checker = None
+    if settings.get_replica_urls():
+        background.append(asyncio.create_task(asyncio.to_thread(check_replicas)))
+        replica_checker = PeriodicTask(
+            "replica-health", settings.REPLICA_CHECK_SECONDS, check_replicas
+        )
+        replica_checker.start()
     yield
-    # Shutdown: cleanup if needed
+    # Shutdown: aplica os contadores e grava a auditoria pendentes
+    await asyncio.gather(*background, return_exceptions=True)
+    await counter_flusher.stop()
+    await audit_flusher.stop()
+    if replica_checker is not None:
+        await replica_checker.stop(final_run=False)
 
 
 app = FastAPI(
@@ -28,6 +79,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", PRIMARY_HEADER],
+)
+
+# Leituras logo apos uma escrita vao para o primario (replicas de leitura)
+app.add_middleware(ReadAfterWriteMiddleware)
+
+# ETag/304 e compressao (gzip/brotli) das respostas
+app.add_middleware(ETagMiddleware)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
 )
 
 # Routes
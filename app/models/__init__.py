@@ -5,8 +5,21 @@ from app.models.contact import Contact, ContactType, ContactStatus
 from app.models.broker import Broker
 from app.models.import_log import ImportLog
 from app.models.favorites import Favorite
-from app.models.notification import Notification, NotificationType
+from app.models.notification import (
+    Notification,
+    NotificationCampaign,
+    NotificationCounter,
+    NotificationType,
+)
 from app.models.evaluation import Evaluation
+from app.models.market_index import MarketIndex
+from app.models.rate_limit import RateLimitCounter
+from app.models.property_event import PropertyEvent
+from app.models.job import Job
+from app.models.property_duplicate import PropertyDuplicate
+from app.models.property_change import PropertyChange
+from app.models.audit_event import AuditEvent
+from app.models.data_version import DataVersion
 
 __all__ = [
     "User",
@@ -21,5 +34,15 @@ __all__ = [
     "Favorite",
     "Notification",
     "NotificationType",
+    "NotificationCampaign",
+    "NotificationCounter",
     "Evaluation",
+    "MarketIndex",
+    "RateLimitCounter",
+    "PropertyEvent",
+    "Job",
+    "PropertyDuplicate",
+    "PropertyChange",
+    "AuditEvent",
+    "DataVersion",
 ]
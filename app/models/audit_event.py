@@ -0,0 +1,30 @@
+"""
+AuditEvent model - Trilha de auditoria das acoes do admin
+"""
+from sqlalchemy import Column, String, DateTime, Text, Integer, Index
+from app.core.database import Base
+
+
+class AuditEvent(Base):
+    """
+    Acao de um admin (quem fez o que em qual registro). Append-only: os
+    endpoints enfileiram o evento em memoria e app/services/audit.py grava
+    em lote, fora da requisicao.
+    """
+    __tablename__ = "audit_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Momento da acao (UTC), nao o da gravacao em lote
+    created_at = Column(DateTime, nullable=False)
+    actor_id = Column(String, nullable=True)  # sem FK: o admin pode ser removido
+    actor_email = Column(String, nullable=True)
+    action = Column(String, nullable=False)  # ex.: user.delete, property.toggle_active
+    entity_type = Column(String, nullable=True)  # user, property, contact, broker
+    entity_id = Column(String, nullable=True)  # None nas acoes em lote
+    details = Column(Text, nullable=True)  # JSON compacto
+
+
+# Listagem por cursor: ORDER BY created_at DESC, id DESC (com ou sem filtro)
+Index("ix_audit_events_created_at_id", AuditEvent.created_at, AuditEvent.id)
+Index("ix_audit_events_actor_created_at", AuditEvent.actor_id, AuditEvent.created_at)
+Index("ix_audit_events_entity", AuditEvent.entity_type, AuditEvent.entity_id)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Index, text, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import enum
@@ -52,3 +52,17 @@ class Contact(Base):
     user = relationship("User", back_populates="contacts")
     property = relationship("Property", back_populates="contacts")
     broker = relationship("Broker", back_populates="contacts")
+
+
+# Indices das consultas do admin (ver alembic/versions)
+# list_contacts: filtro por status + ordenacao por created_at desc
+Index("ix_contacts_status_created_at", Contact.status, Contact.created_at.desc())
+# list_contacts sem filtro e contatos recentes do dashboard
+Index("ix_contacts_created_at", Contact.created_at.desc())
+# Distribuicao de leads: contatos ainda sem corretor, mais antigos primeiro
+Index(
+    "ix_contacts_unassigned_created_at",
+    Contact.created_at,
+    postgresql_where=text("broker_id IS NULL"),
+    sqlite_where=text("broker_id IS NULL"),
+)
@@ -0,0 +1,82 @@
+"""
+Versao dos dados por tabela, usada nos ETags do admin
+(app/core/http_cache.py).
+
+Quem incrementa a versao e o proprio banco: triggers AFTER INSERT/UPDATE/
+DELETE em cada tabela versionada fazem upsert em data_versions. Assim
+escritas de fora desta app (portal, importador externo, SQL manual)
+tambem mudam o ETag, e ele sai de uma leitura pela chave primaria, sem
+count(*) nem max() nas tabelas de origem.
+
+No Postgres o trigger e por statement (um upsert por comando, nao por
+linha) e o incremento fica na transacao de quem escreveu: a linha da
+versao fica travada ate o commit, entao escritas concorrentes na mesma
+tabela esperam umas pelas outras so nesse upsert. No SQLite (testes e
+desenvolvimento local) o trigger e por linha.
+
+As migracoes criam os triggers (alembic/versions); create_all (init_db,
+testes) cria pelo listener after_create abaixo.
+"""
+from sqlalchemy import BigInteger, Column, String, event, text
+from app.core.database import Base
+
+# Tabelas com versao (as que aparecem em data_version_etag)
+VERSIONED_TABLES = (
+    "properties",
+    "contacts",
+    "users",
+    "brokers",
+    "evaluations",
+    "property_duplicates",
+    "market_index",
+)
+
+POSTGRES_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO data_versions (name, version) VALUES (TG_TABLE_NAME, 1)
+    ON CONFLICT (name) DO UPDATE SET version = data_versions.version + 1;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+class DataVersion(Base):
+    """Contador de versao por tabela, mantido pelos triggers"""
+    __tablename__ = "data_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, default=0, nullable=False)
+
+
+def version_trigger_ddl(dialect: str, table: str) -> list[str]:
+    """Comandos que criam os triggers de versao de uma tabela"""
+    if dialect == "postgresql":
+        return [
+            f"DROP TRIGGER IF EXISTS data_version_{table} ON {table}",
+            f"CREATE TRIGGER data_version_{table} "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()",
+        ]
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS data_version_{table}_{op.lower()} "
+        f"AFTER {op} ON {table} BEGIN "
+        f"INSERT INTO data_versions (name, version) VALUES ('{table}', 1) "
+        f"ON CONFLICT (name) DO UPDATE SET version = version + 1; END"
+        for op in ("INSERT", "UPDATE", "DELETE")
+    ]
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_version_triggers(target, connection, tables=(), **kw):
+    created = {table.name for table in tables}
+    if "data_versions" not in created:
+        return
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        connection.execute(text(POSTGRES_FUNCTION))
+    for table in VERSIONED_TABLES:
+        if table in created:
+            for ddl in version_trigger_ddl(dialect, table):
+                connection.execute(text(ddl))
@@ -5,6 +5,8 @@ from app.core.database import Base
 
 class Evaluation(Base):
     __tablename__ = "evaluations"
+    # Postgres: particionada por mes em created_at, PK (id, created_at)
+    # (migracao e4a6c8e0b2d3, manutencao em app/services/partitions.py)
 
     id = Column(String, primary_key=True, index=True)
 
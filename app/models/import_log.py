@@ -9,6 +9,8 @@ def _utcnow():
 
 class ImportLog(Base):
     __tablename__ = "import_logs"
+    # Postgres: particionada por mes em started_at, PK (id, started_at)
+    # (migracao e4a6c8e0b2d3, manutencao em app/services/partitions.py)
 
     id = Column(String, primary_key=True, index=True)
     started_at = Column(DateTime, default=_utcnow, nullable=False, index=True)
@@ -16,4 +18,6 @@ class ImportLog(Base):
     status = Column(String, nullable=False)  # success, error, running
     source = Column(String, nullable=True)  # ValueGaia, ChavesNaMao, etc
     properties_count = Column(Integer, default=0, nullable=False)
+    # Imoveis alterados (linhas de property_changes desta importacao)
+    changes_count = Column(Integer, default=0, nullable=False)
     error_message = Column(Text, nullable=True)
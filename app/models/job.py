@@ -0,0 +1,42 @@
+"""
+Job model - Fila de tarefas em background (app/services/jobs.py)
+"""
+from sqlalchemy import Column, String, DateTime, Text, Integer, Index
+from datetime import datetime, timezone
+import uuid
+from app.core.database import Base
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+class Job(Base):
+    """
+    Tarefa pesada do admin executada pelos workers (python -m app.worker)
+    em vez de dentro da requisicao HTTP
+    """
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    type = Column(String, nullable=False)  # chave de JOB_TYPES
+    status = Column(String, default="queued", nullable=False)  # queued, running, succeeded, failed, cancelled
+    payload = Column(Text, nullable=True)  # JSON: parametros do handler
+    result = Column(Text, nullable=True)  # JSON: retorno do handler
+    progress = Column(Integer, default=0, nullable=False)  # 0-100
+    progress_message = Column(String, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    # Proxima execucao (agendamento e backoff das novas tentativas)
+    run_at = Column(DateTime, default=_utcnow, nullable=False)
+    locked_by = Column(String, nullable=True)  # worker que esta executando
+    heartbeat_at = Column(DateTime, nullable=True)
+    error_message = Column(Text, nullable=True)
+    created_by = Column(String, nullable=True)
+    created_at = Column(DateTime, default=_utcnow, nullable=False, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+# Busca do proximo job: status = 'queued' AND run_at <= now ORDER BY run_at
+Index("ix_jobs_status_run_at", Job.status, Job.run_at)
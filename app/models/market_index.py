@@ -0,0 +1,48 @@
+from sqlalchemy import Column, String, DateTime, Float, Integer, Index
+from datetime import datetime, timezone
+from app.core.database import Base
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+class MarketIndex(Base):
+    """
+    Preco/m2 agregado dos imoveis ativos por cidade/bairro/tipo/finalidade.
+    As colunas de chave guardam o valor normalizado (salu_normalize, bairro
+    vazio quando desconhecido); city_name/neighborhood_name guardam a grafia
+    original para exibicao. Mantido por app/services/market_index.py.
+    """
+    __tablename__ = "market_index"
+
+    id = Column(String, primary_key=True, index=True)
+
+    # Chave (normalizada)
+    city = Column(String, nullable=False)
+    neighborhood = Column(String, nullable=False, default="")
+    property_type = Column(String, nullable=False)
+    purpose = Column(String, nullable=False)
+
+    # Exibicao
+    city_name = Column(String, nullable=True)
+    neighborhood_name = Column(String, nullable=True)
+
+    # Agregados
+    listing_count = Column(Integer, default=0, nullable=False)
+    priced_count = Column(Integer, default=0, nullable=False)
+    p25_price_per_sqm = Column(Float, nullable=True)
+    median_price_per_sqm = Column(Float, nullable=True)
+    p75_price_per_sqm = Column(Float, nullable=True)
+
+    updated_at = Column(DateTime, default=_utcnow, nullable=False)
+
+
+Index(
+    "ux_market_index_key",
+    MarketIndex.city,
+    MarketIndex.neighborhood,
+    MarketIndex.property_type,
+    MarketIndex.purpose,
+    unique=True,
+)
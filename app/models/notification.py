@@ -1,7 +1,7 @@
 """
 Notification model - Sistema de notificacoes do app
 """
-from sqlalchemy import Column, String, DateTime, Text, Boolean, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Text, Boolean, ForeignKey, Integer, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import enum
@@ -48,6 +48,8 @@ class NotificationType(enum.Enum):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    # Postgres: particionada por mes em created_at, PK (id, created_at)
+    # (migracao e4a6c8e0b2d3, manutencao em app/services/partitions.py)
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -62,6 +64,40 @@ class Notification(Base):
     proposal_id = Column(String, nullable=True)
     document_id = Column(String, nullable=True)
     property_id = Column(String, nullable=True)
+    # Campanha (fan-out) que gerou a notificacao
+    campaign_id = Column(String, nullable=True)
 
     # Relationships
     user = relationship("User", back_populates="notifications")
+
+
+class NotificationCampaign(Base):
+    """
+    Disparo em massa (fan-out) de notificacoes: as linhas de notifications
+    sao geradas com um unico INSERT ... SELECT (app/services/notifications.py)
+    """
+    __tablename__ = "notification_campaigns"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    type = Column(String, nullable=False)  # valor de NotificationType
+    audience = Column(String, nullable=False)  # favorites, users, all
+    params = Column(Text, nullable=True)  # JSON: property_ids, user_ids
+    title = Column(String, nullable=False)
+    message = Column(Text, nullable=False)
+    link = Column(String, nullable=True)
+    status = Column(String, default="pending", nullable=False)  # pending, running, completed, failed
+    recipients = Column(Integer, default=0, nullable=False)
+    error_message = Column(Text, nullable=True)
+    created_by = Column(String, nullable=True)
+    created_at = Column(DateTime, default=_utcnow, nullable=False, index=True)
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+
+
+class NotificationCounter(Base):
+    """Notificacoes nao lidas por usuario, mantido junto com os inserts"""
+    __tablename__ = "notification_counters"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=_utcnow, onupdate=_utcnow, nullable=False)
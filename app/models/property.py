@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, Integer, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, Float, Integer, Boolean, DateTime, Text, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.core.database import Base
@@ -52,6 +52,8 @@ class Property(Base):
     # Descricao
     title = Column(String, nullable=True)
     description = Column(Text, nullable=True)
+    # No Postgres existe ainda search_vector (tsvector gerado a partir de
+    # title + description), criado pela migracao e nao mapeado aqui
 
     # Features
     has_bbq = Column(Boolean, default=False, nullable=False)
@@ -73,6 +75,9 @@ class Property(Base):
     view_count = Column(Integer, default=0, nullable=False)
     contact_count = Column(Integer, default=0, nullable=False)
     favorite_count = Column(Integer, default=0, nullable=False)
+    # Ultimo flush dos contadores (app/services/counters.py); o flush nao
+    # altera updated_at, que marca mudancas do anuncio
+    counters_updated_at = Column(DateTime, nullable=True)
 
     # URLs
     site_url = Column(String, nullable=True)
@@ -95,6 +100,21 @@ class Property(Base):
     contacts = relationship("Contact", back_populates="property", cascade="all, delete-orphan")
 
 
+# Indices das consultas do admin (ver alembic/versions)
+# list_properties: filtro por is_active + ordenacao por created_at desc
+Index("ix_properties_active_created_at", Property.is_active, Property.created_at.desc())
+Index("ix_properties_created_at", Property.created_at.desc())
+# dashboard: top imoveis ativos por visualizacoes
+Index(
+    "ix_properties_active_view_count",
+    Property.view_count.desc(),
+    postgresql_where=text("is_active"),
+    sqlite_where=text("is_active"),
+)
+# market index: imoveis alterados desde a ultima reconstrucao
+Index("ix_properties_updated_at", Property.updated_at)
+
+
 class Photo(Base):
     __tablename__ = "photos"
 
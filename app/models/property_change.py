@@ -0,0 +1,33 @@
+"""
+PropertyChange model - Historico de alteracoes dos imoveis nas importacoes
+"""
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Index
+from datetime import datetime, timezone
+import uuid
+from app.core.database import Base
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+class PropertyChange(Base):
+    """
+    Append-only: uma linha por imovel alterado em cada lote importado,
+    so com os campos que mudaram (app/services/imports.py)
+    """
+    __tablename__ = "property_changes"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    property_id = Column(String, ForeignKey("properties.id", ondelete="CASCADE"), nullable=False)
+    # Sem FK: import_logs e particionada no Postgres (PK id, started_at)
+    import_log_id = Column(String, nullable=True, index=True)
+    changed_at = Column(DateTime, default=_utcnow, nullable=False)
+    changes = Column(Text, nullable=False)  # JSON compacto: {"campo": [antigo, novo]}
+
+
+# Historico de um imovel em ordem cronologica
+Index(
+    "ix_property_changes_property_changed_at",
+    PropertyChange.property_id, PropertyChange.changed_at,
+)
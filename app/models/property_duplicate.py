@@ -0,0 +1,26 @@
+"""
+PropertyDuplicate model - Anuncios duplicados entre feeds
+"""
+from sqlalchemy import Column, String, DateTime, Float, ForeignKey
+from datetime import datetime, timezone
+from app.core.database import Base
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+class PropertyDuplicate(Base):
+    """
+    Imovel que faz parte de um grupo de anuncios da mesma unidade em
+    feeds diferentes (app/services/dedup.py). So imoveis em grupos com
+    dois ou mais membros tem linha aqui.
+    """
+    __tablename__ = "property_duplicates"
+
+    property_id = Column(String, ForeignKey("properties.id", ondelete="CASCADE"), primary_key=True)
+    # Imovel canonico do grupo (o anuncio mais antigo); o canonico tem
+    # cluster_id = property_id, os demais sao as copias
+    cluster_id = Column(String, nullable=False, index=True)
+    score = Column(Float, nullable=False)  # maior similaridade com outro membro
+    detected_at = Column(DateTime, default=_utcnow, nullable=False)
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, DateTime, Integer, func
+from datetime import datetime, timezone
+from app.core.database import Base
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+class PropertyEvent(Base):
+    """
+    Eventos de contadores dos imoveis (append-only). O portal insere uma
+    linha por visualizacao/contato/favorito em vez de incrementar a linha
+    do imovel; app/services/counters.py agrega e aplica os deltas em lote
+    e apaga os eventos consumidos.
+    """
+    __tablename__ = "property_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    property_id = Column(String, nullable=False)
+    kind = Column(String, nullable=False)  # view, contact, favorite
+    # server_default: o portal insere sem passar delta/created_at
+    delta = Column(Integer, default=1, server_default="1", nullable=False)
+    created_at = Column(
+        DateTime, default=_utcnow, server_default=func.now(), nullable=False
+    )
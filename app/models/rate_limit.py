@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Integer
+from app.core.database import Base
+
+
+class RateLimitCounter(Base):
+    """
+    Contadores da janela deslizante de app/core/rate_limit.py quando
+    RATE_LIMIT_BACKEND=database (compartilhados entre workers).
+    Postgres: tabela UNLOGGED, contadores sao descartaveis.
+    """
+    __tablename__ = "rate_limit_counters"
+
+    key = Column(String, primary_key=True)
+    window_start = Column(Integer, nullable=False, index=True)  # epoch (s)
+    previous = Column(Integer, default=0, nullable=False)
+    current = Column(Integer, default=0, nullable=False)
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
-from datetime import datetime
+from pydantic import BaseModel, EmailStr, Field, Json
+from typing import Any, Dict, Optional, List
+from datetime import date, datetime
 from enum import Enum
 
 
@@ -104,6 +104,43 @@ class PropertyListResponse(BaseModel):
     properties: List[PropertyResponse]
 
 
+class PropertySearchHit(BaseModel):
+    id: str
+    external_code: str
+    title: Optional[str] = None
+    city: Optional[str] = None
+    neighborhood: Optional[str] = None
+    property_type: str
+    purpose: str
+    sale_price: Optional[float] = None
+    rental_price: Optional[float] = None
+    is_active: bool
+    rank: float
+    snippet: Optional[str] = None
+
+
+class PropertySearchResponse(BaseModel):
+    total: int
+    results: List[PropertySearchHit]
+
+
+class GeoCluster(BaseModel):
+    latitude: float
+    longitude: float
+    count: int
+    property_id: Optional[str] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+
+
+class GeoClusterResponse(BaseModel):
+    zoom: int
+    cell_deg: float
+    total: int
+    truncated: bool
+    clusters: List[GeoCluster]
+
+
 # ===== Contact Schemas =====
 
 class ContactResponse(BaseModel):
@@ -167,6 +204,21 @@ class BrokerListResponse(BaseModel):
     brokers: List[BrokerResponse]
 
 
+# ===== Lead Routing Schemas =====
+
+class LeadAssignmentResponse(BaseModel):
+    contact_id: str
+    broker_id: str
+    distance_km: Optional[float] = None
+    strategy: str
+
+
+class LeadAssignResponse(BaseModel):
+    assigned: int
+    remaining: int
+    assignments: List[LeadAssignmentResponse]
+
+
 # ===== Import Log Schemas =====
 
 class ImportLogResponse(BaseModel):
@@ -176,11 +228,45 @@ class ImportLogResponse(BaseModel):
     status: str
     source: Optional[str] = None
     properties_count: int
+    changes_count: int = 0
     error_message: Optional[str] = None
 
     model_config = {"from_attributes": True}
 
 
+class ImportLogListResponse(BaseModel):
+    total: int
+    logs: List[ImportLogResponse]
+
+
+class ImportWindowStats(BaseModel):
+    days: int
+    runs: int
+    succeeded: int
+    failed: int
+    running: int
+    success_rate: Optional[float] = None  # succeeded / (succeeded + failed)
+    errors_per_day: float
+    avg_duration_seconds: Optional[float] = None
+    max_duration_seconds: Optional[float] = None
+    rows: int  # properties_count das importacoes com sucesso
+    rows_per_second: Optional[float] = None
+
+
+class ImportSourceAnalytics(BaseModel):
+    source: Optional[str] = None
+    last_started_at: Optional[datetime] = None
+    windows: List[ImportWindowStats]
+    # Duracao media da menor janela vs. a maior (positivo: mais lenta)
+    duration_change_percent: Optional[float] = None
+
+
+class ImportLogAnalyticsResponse(BaseModel):
+    generated_at: datetime
+    windows: List[int]
+    sources: List[ImportSourceAnalytics]
+
+
 # ===== Dashboard Schemas =====
 
 class DashboardOverview(BaseModel):
@@ -190,6 +276,7 @@ class DashboardOverview(BaseModel):
     total_users: int
     total_brokers: int
     total_evaluations: int = 0
+    duplicate_properties: int = 0
 
 
 class TypeCount(BaseModel):
@@ -250,6 +337,96 @@ class EvaluationListResponse(BaseModel):
     evaluations: List[EvaluationResponse]
 
 
+class EvaluationRecomputeRequest(BaseModel):
+    ids: Optional[List[str]] = Field(default=None, max_length=10000)
+    city: Optional[str] = None
+    limit: int = Field(default=1000, ge=1, le=50000)
+    dry_run: bool = False
+
+
+class EvaluationRecomputeResult(BaseModel):
+    id: str
+    previous_estimated_price: Optional[float] = None
+    previous_confidence: Optional[str] = None
+    previous_similar_count: Optional[int] = None
+    estimated_price: Optional[float] = None
+    price_per_sqm: Optional[float] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    confidence: Optional[str] = None
+    similar_count: int
+
+
+class EvaluationRecomputeResponse(BaseModel):
+    evaluated: int
+    estimated: int
+    groups: int
+    dry_run: bool
+    elapsed_ms: float
+    results: List[EvaluationRecomputeResult]
+
+
+class EvaluationVolumePoint(BaseModel):
+    period: date
+    count: int
+    median: Optional[float] = None
+
+
+class EvaluationPriceDistribution(BaseModel):
+    city: str
+    property_type: str
+    count: int
+    p25: Optional[float] = None
+    median: Optional[float] = None
+    p75: Optional[float] = None
+    avg: Optional[float] = None
+
+
+class ConfidenceCount(BaseModel):
+    confidence: Optional[str] = None
+    count: int
+
+
+class EvaluationAnalyticsResponse(BaseModel):
+    interval: str
+    since: datetime
+    total: int
+    volume: List[EvaluationVolumePoint]
+    prices: List[EvaluationPriceDistribution]
+    confidence: List[ConfidenceCount]
+
+
+# ===== Market Index Schemas =====
+
+class MarketIndexResponse(BaseModel):
+    city: str
+    neighborhood: str
+    property_type: str
+    purpose: str
+    city_name: Optional[str] = None
+    neighborhood_name: Optional[str] = None
+    listing_count: int
+    priced_count: int
+    p25_price_per_sqm: Optional[float] = None
+    median_price_per_sqm: Optional[float] = None
+    p75_price_per_sqm: Optional[float] = None
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class MarketIndexListResponse(BaseModel):
+    total: int
+    market_index: List[MarketIndexResponse]
+
+
+class MarketIndexRebuildResponse(BaseModel):
+    full: bool
+    keys: int
+    rows: int
+    elapsed_ms: float
+
+
 # ===== Auth Schemas =====
 
 class LoginRequest(BaseModel):
@@ -277,3 +454,209 @@ class MeResponse(BaseModel):
 
 class ContactStatusUpdate(BaseModel):
     status: str
+
+
+# ===== Bulk Action Schemas =====
+
+class PropertyBulkFilter(BaseModel):
+    city: Optional[str] = None
+    property_type: Optional[str] = None
+    purpose: Optional[str] = None
+    is_active: Optional[bool] = None
+    is_featured: Optional[bool] = None
+
+
+class PropertyBulkUpdate(BaseModel):
+    ids: Optional[List[str]] = Field(default=None, max_length=10000)
+    filter: Optional[PropertyBulkFilter] = None
+    is_active: Optional[bool] = None
+    is_featured: Optional[bool] = None
+
+
+class BrokerBulkFilter(BaseModel):
+    city: Optional[str] = None
+    is_active: Optional[bool] = None
+
+
+class BrokerBulkUpdate(BaseModel):
+    ids: Optional[List[str]] = Field(default=None, max_length=10000)
+    filter: Optional[BrokerBulkFilter] = None
+    is_active: bool
+
+
+class ContactBulkFilter(BaseModel):
+    status: Optional[str] = None
+    broker_id: Optional[str] = None
+    property_id: Optional[str] = None
+    created_before: Optional[datetime] = None
+
+
+class ContactBulkUpdate(BaseModel):
+    ids: Optional[List[str]] = Field(default=None, max_length=10000)
+    filter: Optional[ContactBulkFilter] = None
+    status: str
+
+
+class BulkItemResult(BaseModel):
+    id: str
+    status: str  # updated, not_found
+    values: Dict[str, Any] = {}
+
+
+class BulkUpdateResponse(BaseModel):
+    requested: int
+    updated: int
+    not_found: int
+    results: List[BulkItemResult]
+
+
+# ===== Notification Campaign Schemas =====
+
+class NotificationCampaignCreate(BaseModel):
+    type: str
+    audience: str = "favorites"  # favorites, users, all
+    title: str = Field(min_length=1, max_length=200)
+    message: str = Field(min_length=1, max_length=2000)
+    link: Optional[str] = Field(default=None, max_length=500)
+    property_ids: Optional[List[str]] = Field(default=None, max_length=10000)
+    user_ids: Optional[List[str]] = Field(default=None, max_length=10000)
+
+
+class NotificationCampaignResponse(BaseModel):
+    id: str
+    type: str
+    audience: str
+    title: str
+    message: str
+    link: Optional[str] = None
+    status: str  # pending, running, completed, failed
+    recipients: int
+    error_message: Optional[str] = None
+    created_by: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+
+class NotificationCampaignDetail(NotificationCampaignResponse):
+    read_count: int
+
+
+class NotificationCampaignListResponse(BaseModel):
+    total: int
+    campaigns: List[NotificationCampaignResponse]
+
+
+# ===== Job Schemas =====
+
+class JobCreate(BaseModel):
+    type: str
+    payload: Dict[str, Any] = Field(default_factory=dict)
+
+
+class JobResponse(BaseModel):
+    id: str
+    type: str
+    status: str  # queued, running, succeeded, failed, cancelled
+    progress: int
+    progress_message: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    error_message: Optional[str] = None
+    created_by: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+
+class JobDetail(JobResponse):
+    payload: Optional[Json[Dict[str, Any]]] = None
+    result: Optional[Json[Any]] = None
+
+
+class JobListResponse(BaseModel):
+    total: int
+    jobs: List[JobResponse]
+
+
+# ===== Duplicate Schemas =====
+
+class DuplicateDetectionResponse(BaseModel):
+    properties: int
+    candidate_pairs: int
+    matched_pairs: int
+    clusters: int
+    duplicates: int
+    skipped_blocks: int
+    dry_run: bool
+    elapsed_ms: float
+
+
+class DuplicateMember(BaseModel):
+    id: str
+    external_code: str
+    xml_source: Optional[str] = None
+    title: Optional[str] = None
+    city: Optional[str] = None
+    neighborhood: Optional[str] = None
+    sale_price: Optional[float] = None
+    rental_price: Optional[float] = None
+    score: float
+
+
+class DuplicateCluster(BaseModel):
+    cluster_id: str
+    properties: List[DuplicateMember]
+
+
+class DuplicateClusterListResponse(BaseModel):
+    total: int
+    clusters: List[DuplicateCluster]
+
+
+# ===== Property History Schemas =====
+
+class PropertyChangeResponse(BaseModel):
+    id: str
+    import_log_id: Optional[str] = None
+    changed_at: datetime
+    changes: Dict[str, List[Any]]  # campo -> [antigo, novo]
+
+
+class PropertyHistoryResponse(BaseModel):
+    property_id: str
+    total: int
+    changes: List[PropertyChangeResponse]
+
+
+class ImportChangeSummary(BaseModel):
+    import_log: ImportLogResponse
+    properties_changed: int
+    by_field: Dict[str, int]
+    price_drops: int
+    price_increases: int
+    deactivated: int
+    reactivated: int
+
+
+# ===== Audit Schemas =====
+
+class AuditEventResponse(BaseModel):
+    id: int
+    created_at: datetime
+    actor_id: Optional[str] = None
+    actor_email: Optional[str] = None
+    action: str
+    entity_type: Optional[str] = None
+    entity_id: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+
+
+class AuditEventListResponse(BaseModel):
+    events: List[AuditEventResponse]
+    next_cursor: Optional[str] = None  # None na ultima pagina
@@ -0,0 +1,188 @@
+"""
+Analytics das avaliacoes (Evaluation).
+
+Postgres: uma unica consulta com GROUPING SETS calcula o volume por
+periodo (date_trunc), a distribuicao de precos por cidade/tipo
+(percentile_cont) e a quebra por confianca.
+Demais bancos: as linhas sao lidas em streaming (yield_per) e agregadas em
+Python, guardando so os precos de cada grupo para os percentis.
+"""
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import func, literal_column, select, tuple_
+from sqlalchemy.orm import Session
+from app.models.evaluation import Evaluation
+from app.services.search import normalize_text, normalized
+
+INTERVALS = ("day", "week")
+PERCENTILES = (("p25", 0.25), ("median", 0.5), ("p75", 0.75))
+MAX_PRICE_GROUPS = 50
+
+
+def _filters(since: datetime, city: Optional[str]) -> list:
+    filters = [Evaluation.created_at >= since]
+    if city:
+        filters.append(normalized(Evaluation.city) == normalize_text(city))
+    return filters
+
+
+def _price_stats(prices) -> dict:
+    import numpy as np  # so neste caminho; nao pesa no import da aplicacao
+    if not len(prices):
+        return {**{name: None for name, _ in PERCENTILES}, "avg": None}
+    values = np.asarray(prices, dtype=np.float64)
+    stats = dict(zip(
+        (name for name, _ in PERCENTILES),
+        (float(v) for v in np.percentile(values, [q * 100 for _, q in PERCENTILES])),
+    ))
+    stats["avg"] = float(values.mean())
+    return stats
+
+
+def _round(stats: dict) -> dict:
+    return {
+        key: round(value, 2) if isinstance(value, float) else value
+        for key, value in stats.items()
+    }
+
+
+def evaluation_analytics(
+    db: Session,
+    interval: str = "day",
+    days: int = 90,
+    city: Optional[str] = None,
+) -> dict:
+    if interval not in INTERVALS:
+        raise ValueError(f"interval must be one of {INTERVALS}")
+    since = (
+        datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=days)
+    )
+    filters = _filters(since, city)
+
+    if db.get_bind().dialect.name == "postgresql":
+        volume, prices, confidence = _analytics_postgres(db, interval, filters)
+    else:
+        volume, prices, confidence = _analytics_streaming(db, interval, filters)
+
+    prices.sort(key=lambda item: item["count"], reverse=True)
+    return {
+        "interval": interval,
+        "since": since,
+        "total": sum(item["count"] for item in confidence),
+        "volume": sorted(volume, key=lambda item: item["period"]),
+        "prices": prices[:MAX_PRICE_GROUPS],
+        "confidence": sorted(
+            confidence, key=lambda item: item["count"], reverse=True
+        ),
+    }
+
+
+def _analytics_postgres(db: Session, interval: str, filters: list):
+    period = func.date_trunc(
+        literal_column(f"'{interval}'"), Evaluation.created_at
+    )
+    price = Evaluation.estimated_price
+    city, property_type = Evaluation.city, Evaluation.property_type
+    confidence = Evaluation.confidence
+
+    stmt = (
+        select(
+            func.grouping(period).label("g_period"),
+            func.grouping(city, property_type).label("g_price"),
+            period.label("period"),
+            city.label("city"),
+            property_type.label("property_type"),
+            confidence.label("confidence"),
+            func.count().label("n"),
+            *(
+                func.percentile_cont(q).within_group(price).label(name)
+                for name, q in PERCENTILES
+            ),
+            func.avg(price).label("avg"),
+        )
+        .where(*filters)
+        .group_by(func.grouping_sets(
+            tuple_(period),
+            tuple_(city, property_type),
+            tuple_(confidence),
+        ))
+    )
+
+    volume, prices, confidences = [], [], []
+    for row in db.execute(stmt):
+        stats = _round({
+            **{name: getattr(row, name) for name, _ in PERCENTILES},
+            "avg": float(row.avg) if row.avg is not None else None,
+        })
+        if row.g_period == 0:
+            volume.append({
+                "period": row.period.date(), "count": row.n,
+                "median": stats["median"],
+            })
+        elif row.g_price == 0:
+            prices.append({
+                "city": row.city, "property_type": row.property_type,
+                "count": row.n, **stats,
+            })
+        else:
+            confidences.append({"confidence": row.confidence, "count": row.n})
+    return volume, prices, confidences
+
+
+def _period_start(value: datetime, interval: str) -> date:
+    day = value.date()
+    if interval == "week":
+        # date_trunc('week') comeca na segunda-feira
+        day -= timedelta(days=day.weekday())
+    return day
+
+
+def _analytics_streaming(db: Session, interval: str, filters: list):
+    stmt = (
+        select(
+            Evaluation.created_at,
+            Evaluation.city,
+            Evaluation.property_type,
+            Evaluation.confidence,
+            Evaluation.estimated_price,
+        )
+        .where(*filters)
+        .execution_options(yield_per=2000)
+    )
+
+    by_period: dict[date, array] = {}
+    period_counts: dict[date, int] = {}
+    by_group: dict[tuple, array] = {}
+    group_counts: dict[tuple, int] = {}
+    by_confidence: dict[Optional[str], int] = {}
+
+    for created_at, city, property_type, confidence, price in db.execute(stmt):
+        period = _period_start(created_at, interval)
+        group = (city, property_type)
+        period_counts[period] = period_counts.get(period, 0) + 1
+        group_counts[group] = group_counts.get(group, 0) + 1
+        by_confidence[confidence] = by_confidence.get(confidence, 0) + 1
+        if price is not None:
+            by_period.setdefault(period, array("d")).append(price)
+            by_group.setdefault(group, array("d")).append(price)
+
+    volume = [
+        {
+            "period": period, "count": n,
+            "median": _round(_price_stats(by_period.get(period, ())))["median"],
+        }
+        for period, n in period_counts.items()
+    ]
+    prices = [
+        {
+            "city": city, "property_type": property_type, "count": n,
+            **_round(_price_stats(by_group.get((city, property_type), ()))),
+        }
+        for (city, property_type), n in group_counts.items()
+    ]
+    confidences = [
+        {"confidence": confidence, "count": n}
+        for confidence, n in by_confidence.items()
+    ]
+    return volume, prices, confidences
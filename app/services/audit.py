@@ -0,0 +1,202 @@
+"""
+Trilha de auditoria das acoes do admin com escrita em lote.
+
+Os endpoints nao inserem na hora: record_event so coloca o evento no
+AuditBuffer em memoria (depois do commit da alteracao), e a cada
+AUDIT_FLUSH_SECONDS a tarefa em background grava os pendentes em INSERTs
+de ate AUDIT_FLUSH_BATCH linhas. No shutdown o lifespan faz um ultimo
+flush.
+
+O buffer e limitado a AUDIT_BUFFER_MAX eventos: se o banco ficar fora do
+ar, os eventos novos acima do limite sao descartados (contados em
+dropped e no log) em vez de crescer a memoria do processo. Um flush que
+falha devolve o lote para o inicio do buffer.
+
+A listagem usa paginacao por cursor (created_at, id) em ordem
+decrescente, sem OFFSET nem count(*).
+"""
+import base64
+import json
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.audit_event import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> datetime:
+    # UTC sem timezone, como a coluna created_at
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class AuditBuffer:
+    """Eventos pendentes de gravacao, em ordem de chegada"""
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._events: deque[dict] = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def _limit(self) -> int:
+        return self.maxsize if self.maxsize is not None else settings.AUDIT_BUFFER_MAX
+
+    def add(self, event: dict) -> bool:
+        with self._lock:
+            if len(self._events) >= self._limit():
+                self.dropped += 1
+                dropped = self.dropped
+            else:
+                self._events.append(event)
+                return True
+        logger.warning(
+            "Audit buffer full, event %s dropped (%d so far)", event["action"], dropped
+        )
+        return False
+
+    def take(self, limit: int) -> list[dict]:
+        with self._lock:
+            return [self._events.popleft() for _ in range(min(limit, len(self._events)))]
+
+    def requeue(self, events: list[dict]) -> None:
+        """Devolve um lote que falhou para o inicio do buffer"""
+        with self._lock:
+            room = max(0, self._limit() - len(self._events))
+            self.dropped += max(0, len(events) - room)
+            # Mantem os mais antigos do lote, na ordem original
+            self._events.extendleft(reversed(events[:room]))
+
+
+audit_buffer = AuditBuffer()
+
+
+def record_event(
+    actor,
+    action: str,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[str] = None,
+    details: Optional[dict] = None,
+    buffer: AuditBuffer = audit_buffer,
+) -> bool:
+    """Enfileira um evento de auditoria (sem acessar o banco)"""
+    return buffer.add({
+        "created_at": _now(),
+        "actor_id": getattr(actor, "id", None),
+        "actor_email": getattr(actor, "email", None),
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "details": (
+            json.dumps(details, separators=(",", ":"), default=str)
+            if details else None
+        ),
+    })
+
+
+def flush_audit(db: Session, buffer: AuditBuffer = audit_buffer) -> int:
+    """Grava os eventos pendentes em lotes (com commit por lote)"""
+    written = 0
+    while True:
+        events = buffer.take(settings.AUDIT_FLUSH_BATCH)
+        if not events:
+            return written
+        try:
+            db.execute(insert(AuditEvent), events)
+            db.commit()
+        except Exception:
+            db.rollback()
+            buffer.requeue(events)
+            raise
+        written += len(events)
+
+
+def flush_audit_job() -> None:
+    from app.core.database import SessionLocal
+    db = SessionLocal()
+    try:
+        flush_audit(db)
+    finally:
+        db.close()
+
+
+# ===== Listagem =====
+
+def encode_cursor(created_at: datetime, event_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{event_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, event_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(event_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+def list_audit_events(
+    db: Session,
+    actor_id: Optional[str] = None,
+    action: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> dict:
+    """
+    Eventos do mais recente para o mais antigo. next_cursor (None na
+    ultima pagina) continua a partir do ultimo evento retornado.
+    """
+    filters = []
+    if actor_id:
+        filters.append(AuditEvent.actor_id == actor_id)
+    if action:
+        filters.append(AuditEvent.action == action)
+    if entity_type:
+        filters.append(AuditEvent.entity_type == entity_type)
+    if entity_id:
+        filters.append(AuditEvent.entity_id == entity_id)
+    if since:
+        filters.append(AuditEvent.created_at >= _naive_utc(since))
+    if until:
+        filters.append(AuditEvent.created_at < _naive_utc(until))
+    if cursor:
+        filters.append(
+            tuple_(AuditEvent.created_at, AuditEvent.id) < tuple_(*decode_cursor(cursor))
+        )
+
+    table = AuditEvent.__table__
+    rows = [
+        dict(row)
+        for row in db.execute(
+            select(table)
+            .where(*filters)
+            .order_by(table.c.created_at.desc(), table.c.id.desc())
+            .limit(limit + 1)
+        ).mappings()
+    ]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    for row in rows:
+        row["details"] = json.loads(row["details"]) if row["details"] else None
+    return {"events": rows, "next_cursor": next_cursor}
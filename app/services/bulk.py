@@ -0,0 +1,74 @@
+"""
+Acoes em lote do admin (ativar/destacar imoveis, ativar corretores,
+status de contatos).
+
+Cada bloco de ate BULK_CHUNK ids vira um unico
+UPDATE ... WHERE id IN (...) RETURNING, com commit por bloco para nao
+segurar locks de milhares de linhas. Com filtro em vez de ids, os ids
+sao selecionados antes (ate MAX_BULK_IDS) e seguem o mesmo caminho.
+"""
+import enum
+from typing import Iterable, Optional
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+BULK_CHUNK = 500
+MAX_BULK_IDS = 10_000
+
+
+def _plain(value):
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def bulk_update(
+    db: Session,
+    model,
+    values: dict,
+    ids: Optional[list[str]] = None,
+    filters: Optional[list] = None,
+    returning: Iterable[str] = (),
+) -> dict:
+    """
+    Aplica values nas linhas de ids (ou das que batem com filters) e
+    retorna o resultado por id: updated (com os valores de returning)
+    ou not_found.
+    """
+    table = model.__table__
+    returning = tuple(returning)
+
+    if ids is None:
+        ids = list(db.execute(
+            select(table.c.id)
+            .where(*(filters or []))
+            .order_by(table.c.id)
+            .limit(MAX_BULK_IDS + 1)
+        ).scalars())
+    else:
+        ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_BULK_IDS:
+        raise ValueError(f"Too many rows, limit is {MAX_BULK_IDS}")
+
+    updated: dict[str, dict] = {}
+    for start in range(0, len(ids), BULK_CHUNK):
+        chunk = ids[start:start + BULK_CHUNK]
+        rows = db.execute(
+            update(table)
+            .where(table.c.id.in_(chunk))
+            .values(**values)
+            .returning(table.c.id, *(table.c[name] for name in returning))
+        ).mappings()
+        for row in rows:
+            updated[row["id"]] = {name: _plain(row[name]) for name in returning}
+        db.commit()
+
+    return {
+        "requested": len(ids),
+        "updated": len(updated),
+        "not_found": len(ids) - len(updated),
+        "results": [
+            {"id": id_, "status": "updated", "values": updated[id_]}
+            if id_ in updated
+            else {"id": id_, "status": "not_found", "values": {}}
+            for id_ in ids
+        ],
+    }
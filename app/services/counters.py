@@ -0,0 +1,220 @@
+"""
+Contadores dos imoveis (view_count, contact_count, favorite_count) com
+escrita atrasada (write-behind).
+
+Incrementos nao tocam a linha do imovel na hora: o portal grava cada um
+na tabela append-only property_events. A cada COUNTER_FLUSH_SECONDS os
+eventos sao consumidos, agregados por imovel e aplicados em um unico
+UPDATE em lote, evitando contencao na linha de imoveis muito acessados.
+Nenhum incremento fica so na memoria de um processo.
+
+reconcile_counters recalcula favorite_count/contact_count a partir de
+favorites/contacts (GROUP BY) e corrige so as linhas divergentes.
+"""
+from datetime import datetime, timezone
+from sqlalchemy import bindparam, delete, func, select, text, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.contact import Contact
+from app.models.favorites import Favorite
+from app.models.property import Property
+from app.models.property_event import PropertyEvent
+
+KINDS = ("view", "contact", "favorite")
+# Chave do pg_advisory_xact_lock que serializa flush/reconciliacao
+COUNTERS_LOCK_KEY = 0x5A1C0057
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _try_lock(db: Session) -> bool:
+    if not _is_postgres(db):
+        return True
+    return db.execute(
+        text("SELECT pg_try_advisory_xact_lock(:key)"),
+        {"key": COUNTERS_LOCK_KEY},
+    ).scalar()
+
+
+def apply_deltas(db: Session, deltas: dict[str, dict[str, int]]) -> int:
+    """Soma os deltas nos contadores em um UPDATE em lote (sem commit)"""
+    rows = [
+        (property_id, *(counts.get(kind, 0) for kind in KINDS))
+        for property_id, counts in sorted(deltas.items())
+        if any(counts.values())
+    ]
+    if not rows:
+        return 0
+    now = _utcnow()
+
+    if _is_postgres(db):
+        db.execute(text(
+            """
+            UPDATE properties AS p
+            SET view_count = p.view_count + d.views,
+                contact_count = p.contact_count + d.contacts,
+                favorite_count = p.favorite_count + d.favorites,
+                counters_updated_at = :now
+            FROM unnest(
+                CAST(:ids AS text[]),
+                CAST(:views AS int[]),
+                CAST(:contacts AS int[]),
+                CAST(:favorites AS int[])
+            ) AS d(id, views, contacts, favorites)
+            WHERE p.id = d.id
+            """
+        ), {
+            "ids": [r[0] for r in rows],
+            "views": [r[1] for r in rows],
+            "contacts": [r[2] for r in rows],
+            "favorites": [r[3] for r in rows],
+            "now": now,
+        })
+        return len(rows)
+
+    table = Property.__table__
+    c = table.c
+    db.execute(
+        update(table)
+        .where(c.id == bindparam("p_id"))
+        .values(
+            view_count=c.view_count + bindparam("d_view"),
+            contact_count=c.contact_count + bindparam("d_contact"),
+            favorite_count=c.favorite_count + bindparam("d_favorite"),
+            counters_updated_at=bindparam("flushed_at"),
+            # Mantem updated_at: contador nao e alteracao do anuncio
+            updated_at=c.updated_at,
+        ),
+        [
+            {
+                "p_id": r[0], "d_view": r[1], "d_contact": r[2],
+                "d_favorite": r[3], "flushed_at": now,
+            }
+            for r in rows
+        ],
+    )
+    return len(rows)
+
+
+def _consume_events(db: Session, batch_size: int) -> int:
+    """Agrega e aplica ate batch_size eventos (sem commit)"""
+    last_id = db.execute(
+        select(PropertyEvent.id)
+        .order_by(PropertyEvent.id)
+        .offset(batch_size - 1)
+        .limit(1)
+    ).scalar()
+    if last_id is None:
+        last_id = db.execute(select(func.max(PropertyEvent.id))).scalar()
+    if last_id is None:
+        return 0
+
+    # DELETE ... RETURNING: agrega exatamente as linhas apagadas. Um evento
+    # com id menor que fizer commit depois da leitura de last_id nao e
+    # apagado sem ser contado (ficaria fora de um SELECT separado)
+    table = PropertyEvent.__table__
+    c = table.c
+    consumed = (
+        delete(table)
+        .where(c.id <= last_id)
+        .returning(c.property_id, c.kind, c.delta)
+    )
+    deltas: dict[str, dict[str, int]] = {}
+    total = 0
+    if _is_postgres(db):
+        rows = consumed.cte("consumed")
+        result = db.execute(
+            select(
+                rows.c.property_id, rows.c.kind,
+                func.sum(rows.c.delta), func.count(),
+            ).group_by(rows.c.property_id, rows.c.kind)
+        )
+        for property_id, kind, delta, count in result:
+            total += count
+            if kind in KINDS:
+                deltas.setdefault(property_id, {})[kind] = int(delta)
+    else:
+        for property_id, kind, delta in db.execute(consumed):
+            total += 1
+            if kind in KINDS:
+                counts = deltas.setdefault(property_id, {})
+                counts[kind] = counts.get(kind, 0) + delta
+
+    apply_deltas(db, deltas)
+    return total
+
+
+def flush_counters(db: Session) -> dict:
+    """Aplica um lote de property_events nos contadores"""
+    try:
+        events = (
+            _consume_events(db, settings.COUNTER_EVENTS_BATCH)
+            if _try_lock(db) else 0
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return {"events": events}
+
+
+def flush_counters_job() -> None:
+    from app.core.database import SessionLocal
+    db = SessionLocal()
+    try:
+        flush_counters(db)
+    finally:
+        db.close()
+
+
+def _set_counts(db: Session, column: str, counts: dict[str, int]) -> None:
+    table = Property.__table__
+    c = table.c
+    db.execute(
+        update(table)
+        .where(c.id == bindparam("p_id"))
+        .values({column: bindparam("n"), "updated_at": c.updated_at}),
+        [{"p_id": pid, "n": n} for pid, n in sorted(counts.items())],
+    )
+
+
+def reconcile_counters(db: Session) -> dict:
+    """
+    Recalcula favorite_count e contact_count pelos registros de origem.
+    Aplica antes os eventos pendentes para nao contar duas vezes.
+    """
+    if not _try_lock(db):
+        db.rollback()
+        return {"status": "locked"}
+    while _consume_events(db, settings.COUNTER_EVENTS_BATCH):
+        pass
+
+    fixed = {}
+    for column, source in (
+        ("favorite_count", Favorite.property_id),
+        ("contact_count", Contact.property_id),
+    ):
+        actual = dict(db.execute(
+            select(source, func.count()).group_by(source)
+        ).all())
+        stored_column = Property.__table__.c[column]
+        stored = dict(db.execute(
+            select(Property.id, stored_column).where(stored_column != 0)
+        ).all())
+        wrong = {
+            property_id: actual.get(property_id, 0)
+            for property_id in actual.keys() | stored.keys()
+            if actual.get(property_id, 0) != stored.get(property_id, 0)
+        }
+        if wrong:
+            _set_counts(db, column, wrong)
+        fixed[column] = len(wrong)
+
+    db.commit()
+    return {"status": "ok", "fixed": fixed}
@@ -0,0 +1,324 @@
+"""
+Deteccao de anuncios duplicados entre feeds.
+
+O mesmo imovel costuma vir de mais de um xml_source (ValueGaia,
+ChavesNaMao) com external_codes diferentes. Comparar todos os pares seria
+O(n^2), entao os imoveis ativos sao agrupados por chaves de bloqueio e so
+pares dentro do mesmo bloco viram candidatos:
+
+- cidade + tipo + finalidade + quartos + bairro;
+- cidade + tipo + finalidade + quartos + geohash (quando ha lat/lon).
+
+Nos dois casos a area e arredondada em faixas de DEDUP_AREA_STEP_M2 e
+cada faixa e comparada com ela mesma e com a seguinte, para que 72 m2 e
+73 m2 nao caiam em blocos separados. Pares do mesmo feed sao ignorados.
+
+Cada par recebe uma nota de 0 a 1: similaridade de preco (calculada para
+todos os candidatos de uma vez com numpy), de endereco (difflib) e das
+fotos (Jaccard dos nomes de arquivo das URLs). Endereco e fotos so sao
+calculados para os pares cujo preco ainda permite chegar a
+DEDUP_MIN_SCORE; sinais ausentes saem da media, mas o par precisa de
+pelo menos um sinal alem do preco (sem endereco nem fotos nao e
+duplicado). Os pares acima do minimo
+sao unidos em grupos (union-find) e gravados em property_duplicates, com
+o anuncio mais antigo como canonico.
+"""
+import re
+import time
+from datetime import datetime, timezone
+from difflib import SequenceMatcher
+from itertools import combinations, product
+from typing import Optional
+from urllib.parse import urlparse
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.property import Photo, Property
+from app.models.property_duplicate import PropertyDuplicate
+from app.services.geo import geohash
+from app.services.search import normalize_text
+from app.services.valuation import is_rental
+
+# Pesos dos sinais na nota do par
+WEIGHTS = {"price": 0.5, "address": 0.25, "photos": 0.25}
+PHOTO_CHUNK = 500
+
+PROPERTY_FIELDS = (
+    "id", "xml_source", "created_at", "city", "neighborhood",
+    "property_type", "purpose", "bedrooms", "usable_area", "total_area",
+    "latitude", "longitude", "address", "sale_price", "rental_price",
+)
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def _clean(value: Optional[str]) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", normalize_text(value or "")).strip()
+
+
+def _price(row) -> Optional[float]:
+    price = row.rental_price if is_rental(row.purpose) else row.sale_price
+    return price if price and price > 0 else None
+
+
+def _area(row) -> Optional[float]:
+    area = row.usable_area or row.total_area
+    return area if area and area > 0 else None
+
+
+def blocking_keys(row) -> list[tuple]:
+    """Chaves de bloqueio do imovel (sem a faixa de area)"""
+    if not row.city:
+        return []
+    base = (
+        _clean(row.city), _clean(row.property_type), _clean(row.purpose),
+        row.bedrooms or 0,
+    )
+    keys = []
+    if row.neighborhood:
+        keys.append(base + ("n", _clean(row.neighborhood)))
+    if row.latitude is not None and row.longitude is not None:
+        keys.append(base + (
+            "g", geohash(row.latitude, row.longitude, settings.DEDUP_GEOHASH_PRECISION),
+        ))
+    return keys
+
+
+def candidate_pairs(rows: list) -> tuple[set[tuple[int, int]], int]:
+    """
+    Pares (i, j) de indices em rows que dividem um bloco (e a faixa de
+    area ou a vizinha). Retorna os pares e quantos blocos foram ignorados
+    por passar de DEDUP_MAX_BLOCK.
+    """
+    step = settings.DEDUP_AREA_STEP_M2
+    blocks: dict[tuple, dict[int, list[int]]] = {}
+    for i, row in enumerate(rows):
+        area = _area(row)
+        if area is None or not row.xml_source:
+            continue
+        bucket = int(area // step)
+        for key in blocking_keys(row):
+            blocks.setdefault(key, {}).setdefault(bucket, []).append(i)
+
+    pairs = set()
+    skipped = 0
+    for buckets in blocks.values():
+        for bucket, members in buckets.items():
+            neighbors = buckets.get(bucket + 1, [])
+            if len(members) + len(neighbors) > settings.DEDUP_MAX_BLOCK:
+                skipped += 1
+                continue
+            for a, b in (*combinations(members, 2), *product(members, neighbors)):
+                if rows[a].xml_source != rows[b].xml_source:
+                    pairs.add((min(a, b), max(a, b)))
+    return pairs, skipped
+
+
+def price_similarity(left, right):
+    """1 - |a - b| / max(a, b), vetorizado; nan quando falta preco"""
+    import numpy as np
+
+    left = np.asarray(left, dtype=float)
+    right = np.asarray(right, dtype=float)
+    with np.errstate(invalid="ignore"):
+        return 1 - np.abs(left - right) / np.fmax(left, right)
+
+
+def address_similarity(left: Optional[str], right: Optional[str]) -> Optional[float]:
+    left, right = _clean(left), _clean(right)
+    if not left or not right:
+        return None
+    return SequenceMatcher(None, left, right).ratio()
+
+
+def photo_keys(urls) -> set[str]:
+    """Nomes de arquivo das fotos (sem dominio nem query string)"""
+    return {
+        name
+        for name in (
+            urlparse(url).path.rsplit("/", 1)[-1].lower() for url in urls if url
+        )
+        if name
+    }
+
+
+def photo_similarity(left: set, right: set) -> Optional[float]:
+    if not left or not right:
+        return None
+    return len(left & right) / len(left | right)
+
+
+def _load_photos(db: Session, ids: set[str]) -> dict[str, set[str]]:
+    urls: dict[str, list[str]] = {}
+    ids = sorted(ids)
+    for start in range(0, len(ids), PHOTO_CHUNK):
+        for property_id, url in db.execute(
+            select(Photo.property_id, Photo.url)
+            .where(Photo.property_id.in_(ids[start:start + PHOTO_CHUNK]))
+        ):
+            urls.setdefault(property_id, []).append(url)
+    return {property_id: photo_keys(items) for property_id, items in urls.items()}
+
+
+def score_pairs(db: Session, rows: list, pairs: set[tuple[int, int]]) -> list[tuple[int, int, float]]:
+    """Notas dos pares candidatos; retorna so os que chegam a DEDUP_MIN_SCORE"""
+    import numpy as np
+
+    if not pairs:
+        return []
+    pairs = sorted(pairs)
+    left = np.array([_price(rows[a]) for a, _ in pairs], dtype=float)
+    right = np.array([_price(rows[b]) for _, b in pairs], dtype=float)
+    price = price_similarity(left, right)
+    # Melhor nota possivel com endereco e fotos perfeitos
+    best = (
+        WEIGHTS["price"] * price + WEIGHTS["address"] + WEIGHTS["photos"]
+    ) / sum(WEIGHTS.values())
+    keep = np.flatnonzero(~np.isnan(price) & (best >= settings.DEDUP_MIN_SCORE))
+    if not len(keep):
+        return []
+
+    photos = _load_photos(
+        db, {rows[i].id for k in keep for i in pairs[k]}
+    )
+    matches = []
+    for k in keep:
+        a, b = pairs[k]
+        signals = {
+            "price": float(price[k]),
+            "address": address_similarity(rows[a].address, rows[b].address),
+            "photos": photo_similarity(
+                photos.get(rows[a].id, set()), photos.get(rows[b].id, set())
+            ),
+        }
+        available = {name: value for name, value in signals.items() if value is not None}
+        # So preco parecido nao basta: unidades diferentes do mesmo bloco
+        # (mesmos quartos, faixa de area e bairro) costumam ter precos proximos
+        if len(available) < 2:
+            continue
+        score = sum(WEIGHTS[name] * value for name, value in available.items()) / sum(
+            WEIGHTS[name] for name in available
+        )
+        if score >= settings.DEDUP_MIN_SCORE:
+            matches.append((a, b, round(score, 4)))
+    return matches
+
+
+def build_clusters(size: int, matches: list[tuple[int, int, float]]) -> dict[int, int]:
+    """Union-find: indice -> raiz do grupo, so para indices em algum par"""
+    parent = list(range(size))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b, _ in matches:
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+    members = {i for a, b, _ in matches for i in (a, b)}
+    return {i: find(i) for i in members}
+
+
+def detect_duplicates(db: Session, dry_run: bool = False) -> dict:
+    """
+    Recalcula os grupos de duplicados dos imoveis ativos e substitui o
+    conteudo de property_duplicates (com commit, exceto em dry_run)
+    """
+    started = time.perf_counter()
+    table = Property.__table__
+    rows = db.execute(
+        select(*(table.c[name] for name in PROPERTY_FIELDS))
+        .where(table.c.is_active == True)  # noqa: E712
+        .order_by(table.c.created_at, table.c.id)
+    ).all()
+
+    pairs, skipped = candidate_pairs(rows)
+    matches = score_pairs(db, rows, pairs)
+    roots = build_clusters(len(rows), matches)
+
+    best: dict[int, float] = {}
+    for a, b, score in matches:
+        for i in (a, b):
+            best[i] = max(best.get(i, 0.0), score)
+    # rows vem por created_at, id: a raiz (menor indice) e o mais antigo
+    now = _utcnow()
+    values = [
+        {
+            "property_id": rows[i].id,
+            "cluster_id": rows[root].id,
+            "score": best[i],
+            "detected_at": now,
+        }
+        for i, root in sorted(roots.items())
+    ]
+    if not dry_run:
+        db.execute(delete(PropertyDuplicate))
+        if values:
+            db.execute(insert(PropertyDuplicate), values)
+        db.commit()
+
+    clusters = len(set(roots.values()))
+    return {
+        "properties": len(rows),
+        "candidate_pairs": len(pairs),
+        "matched_pairs": len(matches),
+        "clusters": clusters,
+        "duplicates": len(values) - clusters,
+        "skipped_blocks": skipped,
+        "dry_run": dry_run,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def collapse_filter():
+    """Filtro que esconde as copias e mantem so o canonico de cada grupo"""
+    return ~(
+        select(PropertyDuplicate.property_id)
+        .where(
+            PropertyDuplicate.property_id == Property.id,
+            PropertyDuplicate.cluster_id != Property.id,
+        )
+        .exists()
+    )
+
+
+def list_clusters(db: Session, skip: int = 0, limit: int = 50) -> dict:
+    """Grupos de duplicados (maiores primeiro) com os dados dos anuncios"""
+    size = func.count().label("size")
+    total = db.execute(
+        select(func.count(func.distinct(PropertyDuplicate.cluster_id)))
+    ).scalar_one()
+    page = db.execute(
+        select(PropertyDuplicate.cluster_id, size)
+        .group_by(PropertyDuplicate.cluster_id)
+        .order_by(size.desc(), PropertyDuplicate.cluster_id)
+        .offset(skip).limit(limit)
+    ).all()
+    cluster_ids = [row.cluster_id for row in page]
+    members: dict[str, list[dict]] = {cluster_id: [] for cluster_id in cluster_ids}
+    if cluster_ids:
+        for row in db.execute(
+            select(
+                PropertyDuplicate.cluster_id, PropertyDuplicate.score,
+                Property.id, Property.external_code, Property.xml_source,
+                Property.title, Property.city, Property.neighborhood,
+                Property.sale_price, Property.rental_price,
+            )
+            .join(Property, Property.id == PropertyDuplicate.property_id)
+            .where(PropertyDuplicate.cluster_id.in_(cluster_ids))
+            .order_by(Property.created_at, Property.id)
+        ).mappings():
+            row = dict(row)
+            members[row.pop("cluster_id")].append(row)
+    return {
+        "total": total,
+        "clusters": [
+            {"cluster_id": cluster_id, "properties": members[cluster_id]}
+            for cluster_id in cluster_ids
+        ],
+    }
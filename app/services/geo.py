@@ -0,0 +1,263 @@
+"""
+Utilitarios geograficos: distancia haversine, indice em grade para
+vizinhos mais proximos em memoria e agrupamento (clusters) de imoveis por
+area para o mapa do admin.
+"""
+import math
+import sqlite3
+from typing import Hashable, Optional
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.models.property import Property
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Celulas de cluster por tile do mapa (tile = 360 / 2**zoom graus)
+CLUSTER_CELLS_PER_TILE = 8
+MAX_CLUSTERS = 1000
+
+
+@event.listens_for(Engine, "connect")
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    # Nem todo SQLite e compilado com as funcoes matematicas
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function(
+            "floor", 1,
+            lambda x: None if x is None else math.floor(x),
+            deterministic=True,
+        )
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distancia em km entre dois pontos (lat/lon em graus)"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def geohash(lat: float, lon: float, precision: int = 7) -> str:
+    """Geohash de lat/lon (precisao 7 ~ celula de 150 m)"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, lon) if even else (lat_range, lat)
+        mid = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= mid:
+            value |= 1
+            interval[0] = mid
+        else:
+            interval[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+class GridIndex:
+    """
+    Indice em grade lat/lon (celulas de cell_deg graus, como um geohash de
+    precisao fixa). A busca expande aneis de celulas em volta do ponto ate
+    garantir que nenhum ponto fora dos aneis visitados possa estar mais
+    perto que o k-esimo encontrado.
+    """
+
+    def __init__(self, cell_deg: float = 0.1):
+        self.cell_deg = cell_deg
+        self._cells: dict[tuple[int, int], list] = {}
+        self._bounds: Optional[list[int]] = None
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self._cells.values())
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return (
+            math.floor(lat / self.cell_deg),
+            math.floor(lon / self.cell_deg),
+        )
+
+    def add(self, key: Hashable, lat: float, lon: float) -> None:
+        i, j = self._cell(lat, lon)
+        self._cells.setdefault((i, j), []).append((key, lat, lon))
+        if self._bounds is None:
+            self._bounds = [i, i, j, j]
+        else:
+            b = self._bounds
+            b[0], b[1] = min(b[0], i), max(b[1], i)
+            b[2], b[3] = min(b[2], j), max(b[3], j)
+
+    def _ring(self, ci: int, cj: int, r: int):
+        if r == 0:
+            yield (ci, cj)
+            return
+        for j in range(cj - r, cj + r + 1):
+            yield (ci - r, j)
+            yield (ci + r, j)
+        for i in range(ci - r + 1, ci + r):
+            yield (i, cj - r)
+            yield (i, cj + r)
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int = 1,
+        max_km: Optional[float] = None,
+    ) -> list[tuple[float, Hashable]]:
+        """Ate k pares (distancia_km, key) ordenados por distancia"""
+        if self._bounds is None:
+            return []
+
+        ci, cj = self._cell(lat, lon)
+        b = self._bounds
+        max_ring = max(ci - b[0], b[1] - ci, cj - b[2], b[3] - cj, 0)
+        # Menor distancia possivel ate uma celula fora do anel r
+        ring_km = self.cell_deg * KM_PER_DEGREE * max(
+            math.cos(math.radians(lat)), 0.01
+        )
+
+        found: list[tuple[float, Hashable]] = []
+        for r in range(max_ring + 1):
+            for cell in self._ring(ci, cj, r):
+                for key, plat, plon in self._cells.get(cell, ()):
+                    found.append((haversine_km(lat, lon, plat, plon), key))
+            boundary_km = r * ring_km
+            if max_km is not None and boundary_km > max_km:
+                break
+            if len(found) >= k:
+                found.sort(key=lambda item: item[0])
+                if found[k - 1][0] <= boundary_km:
+                    break
+
+        found.sort(key=lambda item: item[0])
+        if max_km is not None:
+            found = [item for item in found if item[0] <= max_km]
+        return found[:k]
+
+
+def bounding_box(
+    lat: float, lon: float, radius_km: float
+) -> tuple[float, float, float, float]:
+    """(min_lat, min_lon, max_lat, max_lon) que contem o circulo"""
+    dlat = radius_km / KM_PER_DEGREE
+    dlon = radius_km / (
+        KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01)
+    )
+    return (
+        max(lat - dlat, -90.0),
+        max(lon - dlon, -180.0),
+        min(lat + dlat, 90.0),
+        min(lon + dlon, 180.0),
+    )
+
+
+def cluster_cell_deg(zoom: int) -> float:
+    """Tamanho (graus) da celula de cluster para o nivel de zoom"""
+    return 360.0 / (2 ** zoom) / CLUSTER_CELLS_PER_TILE
+
+
+def property_clusters(
+    db: Session,
+    min_lat: float,
+    min_lon: float,
+    max_lat: float,
+    max_lon: float,
+    zoom: int,
+    center: Optional[tuple[float, float]] = None,
+    radius_km: Optional[float] = None,
+    is_active: Optional[bool] = True,
+) -> dict:
+    """
+    Agrupa os imoveis da area em celulas de grade (GROUP BY no banco).
+    Com center/radius_km filtra tambem pela distancia (aproximacao
+    equiretangular, suficiente para raios de mapa).
+    """
+    lat, lon = Property.latitude, Property.longitude
+    filters = [
+        lat.isnot(None),
+        lon.isnot(None),
+        lat.between(min_lat, max_lat),
+        lon.between(min_lon, max_lon),
+    ]
+    if db.get_bind().dialect.name == "postgresql":
+        # Usa o indice GiST ix_properties_geo_point
+        filters.append(
+            func.point(lon, lat).op("<@")(func.box(
+                func.point(min_lon, min_lat), func.point(max_lon, max_lat)
+            ))
+        )
+    if center is not None and radius_km is not None:
+        c_lat, c_lon = center
+        dy = (lat - c_lat) * KM_PER_DEGREE
+        dx = (lon - c_lon) * (
+            KM_PER_DEGREE * math.cos(math.radians(c_lat))
+        )
+        filters.append(dx * dx + dy * dy <= radius_km * radius_km)
+    if is_active is not None:
+        filters.append(Property.is_active == is_active)
+
+    cell = cluster_cell_deg(zoom)
+    lat_cell = func.floor((lat + 90) / cell)
+    lon_cell = func.floor((lon + 180) / cell)
+    count = func.count()
+    stmt = (
+        select(
+            count.label("n"),
+            func.avg(lat).label("latitude"),
+            func.avg(lon).label("longitude"),
+            func.min(Property.id).label("property_id"),
+            func.min(Property.sale_price).label("min_price"),
+            func.max(Property.sale_price).label("max_price"),
+        )
+        .where(*filters)
+        .group_by(lat_cell, lon_cell)
+        .order_by(count.desc())
+        .limit(MAX_CLUSTERS + 1)
+    )
+
+    rows = db.execute(stmt).all()
+    truncated = len(rows) > MAX_CLUSTERS
+    rows = rows[:MAX_CLUSTERS]
+    if truncated:
+        # Os clusters cortados ficam fora da soma: conta a area inteira
+        total = db.execute(
+            select(func.count()).select_from(Property).where(*filters)
+        ).scalar()
+    else:
+        total = sum(row.n for row in rows)
+
+    clusters = []
+    for row in rows:
+        clusters.append({
+            "latitude": float(row.latitude),
+            "longitude": float(row.longitude),
+            "count": row.n,
+            "property_id": row.property_id if row.n == 1 else None,
+            "min_price": row.min_price,
+            "max_price": row.max_price,
+        })
+
+    return {
+        "zoom": zoom,
+        "cell_deg": cell,
+        "total": total,
+        "truncated": truncated,
+        "clusters": clusters,
+    }
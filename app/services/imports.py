@@ -0,0 +1,452 @@
+"""
+Ganchos do importador dos feeds XML, chamados a cada lote de imoveis.
+
+O importador (processo externo) le o feed, monta um lote de linhas com
+external_code e os campos do anuncio e grava com upsert em properties.
+Antes do upsert, na mesma transacao, chama process_batch(db, rows,
+import_log_id). Uma unica consulta traz os valores atuais dos
+external_codes do lote (current_values) e alimenta:
+
+- record_changes: historico append-only em property_changes, uma linha
+  por imovel alterado com so os campos que mudaram ({"campo": [antigo,
+  novo]}), inserido em lote; soma em import_logs.changes_count;
+- notify_price_drops: quedas de sale_price/rental_price calculadas de uma
+  vez com numpy, acima de PRICE_DROP_MIN_PERCENT, viram uma campanha
+  PRICE_DROP no publico favorites com o preco antigo e o novo de cada
+  imovel em details; o fan-out e um INSERT ... SELECT sobre favorites
+  (app/services/notifications.py).
+
+Imoveis novos (sem linha em properties) nao geram historico. Anuncios que
+sairam do feed entram no lote como {"external_code": ..., "is_active":
+False}. Precos ausentes ou zerados (anuncio "sob consulta") nao contam
+como queda.
+
+import_log_analytics agrega os proprios import_logs por source (duracao,
+linhas/s, taxa de sucesso) para acompanhar a saude de cada feed.
+"""
+from __future__ import annotations
+
+import json
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Mapping, Optional
+from sqlalchemy import and_, case, func, insert, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.import_log import ImportLog
+from app.models.property import Property
+from app.models.property_change import PropertyChange
+from app.services.notifications import create_campaign, fan_out
+
+# Campos vindos do feed que entram no historico
+TRACKED_FIELDS = (
+    "is_active", "property_type", "purpose", "title",
+    "city", "neighborhood", "address",
+    "usable_area", "total_area", "bedrooms", "suites", "bathrooms",
+    "parking_spaces", "sale_price", "rental_price", "iptu_price",
+    "condominium_price",
+)
+PRICE_FIELDS = ("sale_price", "rental_price")
+PRICE_LABELS = {"sale_price": "venda", "rental_price": "aluguel"}
+
+PRICE_DROP_TITLE = "Baixou o preco"
+PRICE_DROP_MESSAGE = (
+    "O imovel '{title}' em {neighborhood}, {city} que voce favoritou "
+    "baixou de preco"
+)
+PRICE_DROP_LINK = "/imovel/{property_id}"
+
+
+@dataclass
+class PriceDrop:
+    property_id: str
+    field: str  # sale_price | rental_price
+    old_price: float
+    new_price: float
+    percent: float
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def _brl(value: float) -> str:
+    return "R$ " + f"{value:,.0f}".replace(",", ".")
+
+
+def current_values(db: Session, rows: Iterable[Mapping]) -> dict:
+    """Valores gravados dos imoveis do lote, por external_code (uma consulta)"""
+    codes = list({row["external_code"] for row in rows})
+    if not codes:
+        return {}
+    table = Property.__table__
+    return {
+        row.external_code: row
+        for row in db.execute(
+            select(
+                table.c.id, table.c.external_code,
+                *(table.c[name] for name in TRACKED_FIELDS),
+            ).where(table.c.external_code.in_(codes))
+        )
+    }
+
+
+def find_price_drops(
+    db: Session,
+    rows: Iterable[Mapping],
+    min_percent: Optional[float] = None,
+    current: Optional[dict] = None,
+) -> list[PriceDrop]:
+    """
+    Compara os precos do lote (antes do upsert) com os gravados e retorna
+    as quedas de pelo menos min_percent (padrao PRICE_DROP_MIN_PERCENT)
+    """
+    import numpy as np
+
+    if min_percent is None:
+        min_percent = settings.PRICE_DROP_MIN_PERCENT
+    incoming = {row["external_code"]: row for row in rows}
+    if current is None:
+        current = current_values(db, incoming.values())
+    current = [
+        row for code, row in current.items()
+        if row.is_active and code in incoming
+    ]
+    if not current:
+        return []
+
+    # None -> nan: comparacoes com nan sao falsas, entao nao viram queda
+    old = np.array(
+        [[getattr(row, field) for field in PRICE_FIELDS] for row in current],
+        dtype=float,
+    )
+    new = np.array(
+        [
+            [incoming[row.external_code].get(field) for field in PRICE_FIELDS]
+            for row in current
+        ],
+        dtype=float,
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent = (old - new) / old * 100
+    dropped = (new > 0) & (new < old) & (percent >= min_percent)
+
+    return [
+        PriceDrop(
+            property_id=current[i].id,
+            field=PRICE_FIELDS[j],
+            old_price=float(old[i, j]),
+            new_price=float(new[i, j]),
+            percent=float(percent[i, j]),
+        )
+        for i, j in zip(*np.nonzero(dropped))
+    ]
+
+
+def price_drop_details(drops: Iterable[PriceDrop]) -> dict[str, str]:
+    """Texto por imovel: ': venda de R$ 500.000 para R$ 450.000 (-10%).'"""
+    parts: dict[str, list[str]] = {}
+    for drop in drops:
+        parts.setdefault(drop.property_id, []).append(
+            f"{PRICE_LABELS[drop.field]} de {_brl(drop.old_price)} para "
+            f"{_brl(drop.new_price)} (-{drop.percent:.0f}%)"
+        )
+    return {
+        property_id: ": " + ", ".join(texts) + "."
+        for property_id, texts in parts.items()
+    }
+
+
+def notify_price_drops(
+    db: Session,
+    rows: Iterable[Mapping],
+    min_percent: Optional[float] = None,
+    current: Optional[dict] = None,
+) -> int:
+    """
+    Detecta as quedas de preco do lote e notifica quem favoritou os
+    imoveis. Deve ser chamado antes do upsert do lote; sem commit (vai
+    junto com o upsert). Retorna o numero de notificacoes criadas.
+    """
+    details = price_drop_details(
+        find_price_drops(db, rows, min_percent, current)
+    )
+    if not details:
+        return 0
+    campaign = create_campaign(
+        db,
+        type="PRICE_DROP",
+        audience="favorites",
+        title=PRICE_DROP_TITLE,
+        message=PRICE_DROP_MESSAGE,
+        link=PRICE_DROP_LINK,
+        property_ids=list(details),
+        details=details,
+    )
+    campaign.started_at = _utcnow()
+    campaign.recipients = fan_out(db, campaign)
+    campaign.status = "completed"
+    campaign.completed_at = _utcnow()
+    return campaign.recipients
+
+
+# ===== Historico =====
+
+def diff_row(current, row: Mapping) -> dict:
+    """Campos rastreados do lote que mudaram: {"campo": [antigo, novo]}"""
+    return {
+        field: [getattr(current, field), row[field]]
+        for field in TRACKED_FIELDS
+        if field in row and row[field] != getattr(current, field)
+    }
+
+
+def record_changes(
+    db: Session,
+    rows: Iterable[Mapping],
+    import_log_id: Optional[str] = None,
+    current: Optional[dict] = None,
+) -> int:
+    """
+    Grava em lote o historico dos imoveis alterados (antes do upsert; sem
+    commit) e soma em import_logs.changes_count. Retorna quantas linhas.
+    """
+    rows = list(rows)
+    if current is None:
+        current = current_values(db, rows)
+    now = _utcnow()
+    values = []
+    for row in rows:
+        old = current.get(row["external_code"])
+        if old is None:
+            continue
+        changes = diff_row(old, row)
+        if changes:
+            values.append({
+                "id": str(uuid.uuid4()),
+                "property_id": old.id,
+                "import_log_id": import_log_id,
+                "changed_at": now,
+                "changes": json.dumps(changes, separators=(",", ":")),
+            })
+    if not values:
+        return 0
+    db.execute(insert(PropertyChange), values)
+    if import_log_id is not None:
+        db.execute(
+            update(ImportLog)
+            .where(ImportLog.id == import_log_id)
+            .values(changes_count=ImportLog.changes_count + len(values))
+        )
+    return len(values)
+
+
+def process_batch(
+    db: Session, rows: Iterable[Mapping], import_log_id: Optional[str] = None
+) -> dict:
+    """
+    Ganchos de um lote do importador, antes do upsert e na mesma
+    transacao (sem commit): historico e quedas de preco, com uma unica
+    leitura dos valores atuais
+    """
+    rows = list(rows)
+    current = current_values(db, rows)
+    return {
+        "changes": record_changes(db, rows, import_log_id, current),
+        "price_drop_notifications": notify_price_drops(
+            db, rows, current=current
+        ),
+    }
+
+
+def import_change_summary(db: Session, import_log_id: str) -> dict:
+    """Resumo das alteracoes de uma importacao (contagem por campo etc.)"""
+    by_field = Counter()
+    summary = Counter()
+    properties = 0
+    for changes in db.execute(
+        select(PropertyChange.changes)
+        .where(PropertyChange.import_log_id == import_log_id)
+    ).scalars():
+        changes = json.loads(changes)
+        properties += 1
+        by_field.update(changes.keys())
+        for field in PRICE_FIELDS:
+            old, new = changes.get(field, (None, None))
+            if old and new:
+                summary["price_drops" if new < old else "price_increases"] += 1
+        if "is_active" in changes:
+            summary["reactivated" if changes["is_active"][1] else "deactivated"] += 1
+    return {
+        "import_log_id": import_log_id,
+        "properties_changed": properties,
+        "by_field": dict(by_field.most_common()),
+        "price_drops": summary["price_drops"],
+        "price_increases": summary["price_increases"],
+        "deactivated": summary["deactivated"],
+        "reactivated": summary["reactivated"],
+    }
+
+
+def property_history(
+    db: Session,
+    property_id: str,
+    field: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50,
+) -> dict:
+    """Historico de um imovel (mais recente primeiro), opcionalmente de um campo"""
+    if field is not None and field not in TRACKED_FIELDS:
+        raise ValueError(f"Invalid field. Valid values: {list(TRACKED_FIELDS)}")
+    filters = [PropertyChange.property_id == property_id]
+    if field is not None:
+        # changes e JSON compacto: a chave aparece como "campo":
+        filters.append(PropertyChange.changes.contains(f'"{field}":'))
+    total = db.execute(
+        select(func.count()).select_from(PropertyChange).where(*filters)
+    ).scalar_one()
+    rows = db.execute(
+        select(
+            PropertyChange.id, PropertyChange.import_log_id,
+            PropertyChange.changed_at, PropertyChange.changes,
+        )
+        .where(*filters)
+        .order_by(PropertyChange.changed_at.desc(), PropertyChange.id)
+        .offset(skip).limit(limit)
+    ).mappings()
+    return {
+        "property_id": property_id,
+        "total": total,
+        "changes": [
+            {**row, "changes": json.loads(row["changes"])} for row in rows
+        ],
+    }
+
+
+# ===== Analytics dos logs =====
+
+IMPORT_STATUSES = ("success", "error", "running")
+MAX_ANALYTICS_WINDOWS = 6
+MAX_ANALYTICS_DAYS = 365
+
+
+def _duration_seconds(db: Session):
+    """completed_at - started_at em segundos, por dialeto"""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.extract("epoch", ImportLog.completed_at - ImportLog.started_at)
+    return (
+        func.julianday(ImportLog.completed_at) - func.julianday(ImportLog.started_at)
+    ) * 86400.0
+
+
+def _window_columns(db: Session, index: int, cutoff: datetime) -> list:
+    in_window = ImportLog.started_at >= cutoff
+    done = and_(in_window, ImportLog.completed_at.isnot(None))
+    succeeded = and_(done, ImportLog.status == "success")
+    duration = _duration_seconds(db)
+
+    def status_count(status: str):
+        return func.count(case((and_(in_window, ImportLog.status == status), 1)))
+
+    columns = {
+        "runs": func.count(case((in_window, 1))),
+        "succeeded": status_count("success"),
+        "failed": status_count("error"),
+        "running": status_count("running"),
+        "completed": func.count(case((done, 1))),
+        "duration_sum": func.sum(case((done, duration))),
+        "duration_max": func.max(case((done, duration))),
+        "rows": func.sum(case((succeeded, ImportLog.properties_count))),
+        "rows_duration": func.sum(case((succeeded, duration))),
+    }
+    return [column.label(f"w{index}_{name}") for name, column in columns.items()]
+
+
+def _window_stats(row, index: int, days: int) -> dict:
+    def get(name: str):
+        value = getattr(row, f"w{index}_{name}")
+        # extract(epoch) vem como numeric (Decimal) no Postgres
+        return float(value) if name.startswith("duration") and value is not None else value
+
+    finished = get("succeeded") + get("failed")
+    completed = get("completed")
+    rows_duration = float(get("rows_duration") or 0)
+    return {
+        "days": days,
+        "runs": get("runs"),
+        "succeeded": get("succeeded"),
+        "failed": get("failed"),
+        "running": get("running"),
+        "success_rate": round(get("succeeded") / finished, 4) if finished else None,
+        "errors_per_day": round(get("failed") / days, 3),
+        "avg_duration_seconds": (
+            round(get("duration_sum") / completed, 1) if completed else None
+        ),
+        "max_duration_seconds": (
+            round(get("duration_max"), 1) if get("duration_max") is not None else None
+        ),
+        "rows": int(get("rows") or 0),
+        "rows_per_second": (
+            round((get("rows") or 0) / rows_duration, 2) if rows_duration > 0 else None
+        ),
+    }
+
+
+def import_log_analytics(
+    db: Session,
+    windows: Optional[Iterable[int]] = None,
+    source: Optional[str] = None,
+) -> dict:
+    """
+    Duracao, linhas/s, taxa de sucesso e erros por dia de cada source em
+    cada janela (dias), numa unica consulta com GROUP BY source: cada
+    janela e um conjunto de agregados condicionais (CASE) sobre as linhas
+    da maior janela, o que tambem limita as particoes lidas no Postgres.
+    duration_change_percent compara a duracao media da menor janela com a
+    da maior (positivo: importacao ficando mais lenta).
+    """
+    windows = sorted(set(windows or settings.get_import_analytics_windows()))
+    if not windows or len(windows) > MAX_ANALYTICS_WINDOWS:
+        raise ValueError(f"Provide between 1 and {MAX_ANALYTICS_WINDOWS} windows")
+    if windows[0] < 1 or windows[-1] > MAX_ANALYTICS_DAYS:
+        raise ValueError(f"Windows must be between 1 and {MAX_ANALYTICS_DAYS} days")
+
+    now = _utcnow().replace(tzinfo=None)
+    cutoffs = [now - timedelta(days=days) for days in windows]
+    filters = [ImportLog.started_at >= cutoffs[-1]]
+    if source:
+        filters.append(ImportLog.source == source)
+    columns = [
+        column
+        for index, cutoff in enumerate(cutoffs)
+        for column in _window_columns(db, index, cutoff)
+    ]
+    rows = db.execute(
+        select(
+            ImportLog.source,
+            func.max(ImportLog.started_at).label("last_started_at"),
+            *columns,
+        )
+        .where(*filters)
+        .group_by(ImportLog.source)
+        .order_by(ImportLog.source)
+    ).all()
+
+    sources = []
+    for row in rows:
+        stats = [_window_stats(row, index, days) for index, days in enumerate(windows)]
+        recent, baseline = (
+            stats[0]["avg_duration_seconds"], stats[-1]["avg_duration_seconds"]
+        )
+        sources.append({
+            "source": row.source,
+            "last_started_at": row.last_started_at,
+            "windows": stats,
+            "duration_change_percent": (
+                round((recent / baseline - 1) * 100, 1)
+                if len(stats) > 1 and recent is not None and baseline else None
+            ),
+        })
+    return {"generated_at": now, "windows": windows, "sources": sources}
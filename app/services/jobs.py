@@ -0,0 +1,360 @@
+"""
+Fila de jobs em background para as tarefas pesadas do admin.
+
+Os jobs ficam na tabela jobs, no mesmo banco da API (Postgres em
+producao, SQLite no desenvolvimento local), e sao executados pelos
+processos de python -m app.worker, fora da requisicao HTTP. A API so
+enfileira e expoe status e progresso.
+
+- Reserva: o worker busca os proximos jobs queued com run_at <= agora.
+  No Postgres o SELECT usa FOR UPDATE SKIP LOCKED, entao workers
+  concorrentes pegam jobs diferentes sem esperar uns pelos outros; a
+  troca para running e um UPDATE condicional (status = 'queued'), que
+  tambem garante a reserva unica no SQLite.
+- Concorrencia por tipo: cada tipo tem um limite de jobs running ao mesmo
+  tempo (JobType.concurrency, sobrescrito por JOB_CONCURRENCY). No
+  Postgres a contagem e refeita sob pg_advisory_xact_lock do tipo, para
+  que dois workers nao passem do limite ao mesmo tempo; cada tipo e
+  tentado em uma transacao propria, com no maximo um desses locks.
+- Novas tentativas: se o handler falha e ainda ha tentativas, o job volta
+  para queued com run_at = agora + backoff exponencial.
+- Heartbeat: enquanto o handler roda, uma thread atualiza heartbeat_at;
+  requeue_stale devolve para a fila os jobs de workers que morreram.
+
+Handlers recebem (db, payload, context), fazem o proprio commit e
+retornam um dict JSON (gravado em result).
+"""
+import json
+import logging
+import threading
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Optional
+from sqlalchemy import func, select, text, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import STATEMENT_TIMEOUT_KEY, SessionLocal
+from app.models.job import Job
+from app.models.notification import NotificationCampaign
+from app.services.dedup import detect_duplicates
+from app.services.market_index import rebuild_market_index
+from app.services.notifications import dispatch_campaign
+from app.services.valuation import recompute_evaluations
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+# Primeira chave do pg_advisory_xact_lock da reserva (a segunda e o tipo)
+JOBS_LOCK_KEY = 0x10B5
+
+
+def _now() -> datetime:
+    # UTC sem timezone, como as colunas DateTime
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass
+class JobType:
+    name: str
+    handler: Callable[[Session, dict, "JobContext"], Optional[dict]]
+    concurrency: int = 1
+    max_attempts: int = 3
+
+
+JOB_TYPES: dict[str, JobType] = {}
+
+
+def job_type(name: str, concurrency: int = 1, max_attempts: int = 3):
+    """Registra o handler de um tipo de job"""
+    def register(handler):
+        JOB_TYPES[name] = JobType(name, handler, concurrency, max_attempts)
+        return handler
+    return register
+
+
+def concurrency_limit(name: str) -> int:
+    return settings.get_job_concurrency().get(name, JOB_TYPES[name].concurrency)
+
+
+def retry_delay(attempts: int) -> float:
+    """Segundos ate a proxima tentativa depois de attempts falhas"""
+    return min(
+        settings.JOB_RETRY_MAX_SECONDS,
+        settings.JOB_RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1),
+    )
+
+
+def enqueue(
+    db: Session,
+    type: str,
+    payload: Optional[dict] = None,
+    created_by: Optional[str] = None,
+    run_at: Optional[datetime] = None,
+) -> Job:
+    """Valida e enfileira um job (sem commit)"""
+    if type not in JOB_TYPES:
+        raise ValueError(f"Invalid job type. Valid values: {sorted(JOB_TYPES)}")
+    job = Job(
+        type=type,
+        status="queued",
+        payload=json.dumps(payload or {}),
+        max_attempts=JOB_TYPES[type].max_attempts,
+        run_at=run_at or _now(),
+        created_by=created_by,
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+def cancel_job(db: Session, job: Job) -> Job:
+    """Cancela um job que ainda nao comecou (com commit)"""
+    if job.status != "queued":
+        raise ValueError(f"Only queued jobs can be cancelled (status: {job.status})")
+    job.status = "cancelled"
+    job.finished_at = _now()
+    db.commit()
+    return job
+
+
+def retry_job(db: Session, job: Job) -> Job:
+    """Recoloca na fila um job que falhou ou foi cancelado (com commit)"""
+    if job.status not in ("failed", "cancelled"):
+        raise ValueError(f"Only failed or cancelled jobs can be retried (status: {job.status})")
+    job.status = "queued"
+    job.attempts = 0
+    job.run_at = _now()
+    job.finished_at = None
+    db.commit()
+    return job
+
+
+# ===== Worker =====
+
+def claim_next(
+    db: Session, worker_id: str, types: Optional[Iterable[str]] = None
+) -> Optional[Job]:
+    """Reserva o proximo job executavel para o worker (com commit)"""
+    names = [name for name in (types or JOB_TYPES) if name in JOB_TYPES]
+    running = dict(db.execute(
+        select(Job.type, func.count())
+        .where(Job.status == "running", Job.type.in_(names))
+        .group_by(Job.type)
+    ).all())
+    names = [name for name in names if running.get(name, 0) < concurrency_limit(name)]
+    if not names:
+        db.rollback()
+        return None
+
+    # Um tipo por transacao: o pg_advisory_xact_lock de um tipo ocupado e
+    # liberado (rollback) antes de tentar o proximo, entao um worker nunca
+    # segura o lock de um tipo enquanto espera o de outro (sem deadlock
+    # entre workers que veem os tipos em ordens diferentes)
+    now = _now()
+    ready = db.execute(
+        select(Job.type)
+        .where(Job.status == "queued", Job.run_at <= now, Job.type.in_(names))
+        .group_by(Job.type)
+        .order_by(func.min(Job.run_at))
+    ).scalars().all()
+    db.rollback()
+    postgres = db.get_bind().dialect.name == "postgresql"
+    for name in ready:
+        job_id = db.execute(
+            select(Job.id)
+            .where(Job.status == "queued", Job.run_at <= now, Job.type == name)
+            .order_by(Job.run_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).scalar()
+        if job_id is None:
+            db.rollback()
+            continue
+        if postgres:
+            db.execute(
+                text("SELECT pg_advisory_xact_lock(:key, :type_key)"),
+                {"key": JOBS_LOCK_KEY, "type_key": zlib.crc32(name.encode()) & 0x7FFFFFFF},
+            )
+            busy = db.execute(
+                select(func.count()).where(Job.status == "running", Job.type == name)
+            ).scalar_one()
+            if busy >= concurrency_limit(name):
+                db.rollback()
+                continue
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "queued")
+            .values(
+                status="running",
+                locked_by=worker_id,
+                attempts=Job.attempts + 1,
+                started_at=now,
+                heartbeat_at=now,
+                progress=0,
+                progress_message=None,
+            )
+        ).rowcount
+        if claimed:
+            db.commit()
+            return db.get(Job, job_id)
+        db.rollback()
+    return None
+
+
+class JobContext:
+    """Progresso e heartbeat do job, gravados em sessao propria"""
+
+    def __init__(self, job_id: str, session_factory=SessionLocal):
+        self.job_id = job_id
+        self.session_factory = session_factory
+        self._percent = None
+
+    def _write(self, **values) -> None:
+        with self.session_factory() as db:
+            db.execute(
+                update(Job).where(Job.id == self.job_id)
+                .values(heartbeat_at=_now(), **values)
+            )
+            db.commit()
+
+    def progress(self, percent: int, message: Optional[str] = None) -> None:
+        percent = max(0, min(100, int(percent)))
+        # So grava quando o percentual muda (handlers chamam por lote)
+        if percent != self._percent:
+            self._percent = percent
+            self._write(progress=percent, progress_message=message)
+
+    def heartbeat(self) -> None:
+        self._write()
+
+
+def _heartbeat_loop(context: JobContext, stop: threading.Event) -> None:
+    while not stop.wait(settings.JOB_HEARTBEAT_SECONDS):
+        try:
+            context.heartbeat()
+        except Exception:
+            logger.exception("Heartbeat of job %s failed", context.job_id)
+
+
+def _failure_values(attempts: int, max_attempts: int, error: str) -> dict:
+    now = _now()
+    if attempts < max_attempts:
+        return {
+            "status": "queued",
+            "run_at": now + timedelta(seconds=retry_delay(attempts)),
+            "locked_by": None,
+            "error_message": error,
+        }
+    return {
+        "status": "failed",
+        "finished_at": now,
+        "locked_by": None,
+        "error_message": error,
+    }
+
+
+def run_job(job: Job, session_factory=SessionLocal) -> str:
+    """
+    Executa um job reservado por claim_next e grava o desfecho: succeeded,
+    queued (nova tentativa com backoff) ou failed. Retorna o status.
+    """
+    handler = JOB_TYPES.get(job.type)
+    context = JobContext(job.id, session_factory)
+    stop = threading.Event()
+    beat = threading.Thread(target=_heartbeat_loop, args=(context, stop), daemon=True)
+    beat.start()
+    db = session_factory(
+        info={STATEMENT_TIMEOUT_KEY: settings.DB_LONG_STATEMENT_TIMEOUT_MS}
+    )
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown job type: {job.type}")
+        result = handler.handler(db, json.loads(job.payload or "{}"), context)
+        db.commit()
+        values = {
+            "status": "succeeded",
+            "result": json.dumps(result, default=str) if result is not None else None,
+            "progress": 100,
+            "finished_at": _now(),
+            "locked_by": None,
+        }
+    except Exception as e:
+        db.rollback()
+        logger.exception("Job %s (%s) failed", job.id, job.type)
+        values = _failure_values(job.attempts, job.max_attempts, str(e) or repr(e))
+    finally:
+        stop.set()
+        beat.join()
+        db.close()
+
+    with session_factory() as db:
+        # locked_by: se o job foi dado como morto e reservado por outro
+        # worker, o desfecho deste nao sobrescreve o novo
+        db.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.status == "running", Job.locked_by == job.locked_by)
+            .values(**values)
+        )
+        db.commit()
+    return values["status"]
+
+
+def requeue_stale(db: Session) -> int:
+    """
+    Jobs running sem heartbeat ha mais de JOB_STALE_SECONDS (worker
+    morto) voltam para a fila, contando como tentativa (com commit)
+    """
+    cutoff = _now() - timedelta(seconds=settings.JOB_STALE_SECONDS)
+    stale = db.execute(
+        select(Job.id, Job.attempts, Job.max_attempts)
+        .where(Job.status == "running", Job.heartbeat_at < cutoff)
+    ).all()
+    requeued = 0
+    for job_id, attempts, max_attempts in stale:
+        requeued += db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "running", Job.heartbeat_at < cutoff)
+            .values(**_failure_values(attempts, max_attempts, "Worker stopped responding"))
+        ).rowcount or 0
+    db.commit()
+    return requeued
+
+
+# ===== Tipos de job =====
+
+@job_type("notification_campaign", concurrency=2)
+def _notification_campaign(db: Session, payload: dict, context: JobContext) -> dict:
+    campaign = db.get(NotificationCampaign, payload["campaign_id"])
+    if campaign is None:
+        raise ValueError(f"Campaign not found: {payload['campaign_id']}")
+    if not dispatch_campaign(db, campaign):
+        # Ja executada (ou em execucao) por outro job: nada a refazer
+        return {"campaign_id": campaign.id, "skipped": campaign.status}
+    if campaign.status == "failed":
+        raise RuntimeError(campaign.error_message)
+    return {"campaign_id": campaign.id, "recipients": campaign.recipients}
+
+
+@job_type("market_index_rebuild")
+def _market_index_rebuild(db: Session, payload: dict, context: JobContext) -> dict:
+    return rebuild_market_index(db, full=bool(payload.get("full")))
+
+
+@job_type("property_dedup")
+def _property_dedup(db: Session, payload: dict, context: JobContext) -> dict:
+    return detect_duplicates(db, dry_run=bool(payload.get("dry_run")))
+
+
+@job_type("evaluations_recompute")
+def _evaluations_recompute(db: Session, payload: dict, context: JobContext) -> dict:
+    return recompute_evaluations(
+        db,
+        ids=payload.get("ids"),
+        city=payload.get("city"),
+        limit=int(payload.get("limit", 1000)),
+        dry_run=bool(payload.get("dry_run")),
+        progress=lambda done, total: context.progress(
+            done * 100 // total, f"{done}/{total} groups"
+        ),
+    )
@@ -0,0 +1,268 @@
+"""
+Distribuicao de leads (contatos) para corretores.
+
+Para cada contato sem corretor:
+1. busca os corretores ativos mais proximos do imovel do contato
+   (earthdistance + indice GiST no Postgres, GridIndex em memoria nos
+   demais bancos);
+2. sem corretor no raio, usa os corretores ativos da mesma cidade e,
+   por ultimo, todos os corretores ativos;
+3. entre os candidatos aplica o rodizio: quem recebeu lead ha mais tempo
+   (last_lead_assigned_at) ganha, desempate pela distancia.
+
+Os contatos do lote sao travados com SELECT ... FOR UPDATE SKIP LOCKED,
+entao varios workers podem distribuir ao mesmo tempo sem pegar o mesmo
+contato. Os corretores ativos sao lidos com FOR UPDATE (em ordem de id,
+para nao haver deadlock): uma distribuicao concorrente espera o commit
+desta e le o last_lead_assigned_at ja atualizado, em vez de escolher o
+mesmo corretor e sobrescrever o timestamp. Todas as escritas do lote vao
+em um unico commit.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import bindparam, func, select, text, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.broker import Broker
+from app.models.contact import Contact
+from app.models.property import Property
+from app.services.geo import GridIndex
+from app.services.search import normalize_text
+
+
+@dataclass
+class BrokerCandidate:
+    id: str
+    latitude: Optional[float]
+    longitude: Optional[float]
+    city: Optional[str]
+    last_lead_assigned_at: Optional[datetime]
+
+
+@dataclass
+class LeadAssignment:
+    contact_id: str
+    broker_id: str
+    distance_km: Optional[float]
+    strategy: str  # nearest, city, any
+
+
+class GridBrokerLocator:
+    """Vizinhos mais proximos em memoria (SQLite/testes)"""
+
+    def __init__(self, brokers: list[BrokerCandidate]):
+        self.index = GridIndex(cell_deg=0.1)
+        for broker in brokers:
+            if broker.latitude is not None and broker.longitude is not None:
+                self.index.add(broker.id, broker.latitude, broker.longitude)
+
+    def nearest_many(self, points, k: int, max_km: float) -> dict:
+        return {
+            contact_id: self.index.nearest(lat, lon, k=k, max_km=max_km)
+            for contact_id, lat, lon in points
+        }
+
+
+class EarthDistanceBrokerLocator:
+    """
+    Vizinhos mais proximos no Postgres: um unico SELECT com LATERAL,
+    ordenado por ll_to_earth(...) <-> ll_to_earth(...) (KNN no indice GiST
+    ix_brokers_active_earth).
+    """
+
+    QUERY = text(
+        """
+        SELECT p.contact_id, b.id AS broker_id, b.meters
+        FROM unnest(
+            CAST(:contact_ids AS text[]),
+            CAST(:lats AS float8[]),
+            CAST(:lons AS float8[])
+        ) AS p(contact_id, lat, lon)
+        CROSS JOIN LATERAL (
+            SELECT brokers.id,
+                   earth_distance(
+                       ll_to_earth(brokers.latitude, brokers.longitude),
+                       ll_to_earth(p.lat, p.lon)
+                   ) AS meters
+            FROM brokers
+            WHERE brokers.is_active
+              AND brokers.latitude IS NOT NULL
+              AND brokers.longitude IS NOT NULL
+              AND earth_box(ll_to_earth(p.lat, p.lon), :radius_m)
+                  @> ll_to_earth(brokers.latitude, brokers.longitude)
+            ORDER BY ll_to_earth(brokers.latitude, brokers.longitude)
+                     <-> ll_to_earth(p.lat, p.lon)
+            LIMIT :k
+        ) AS b
+        """
+    )
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def nearest_many(self, points, k: int, max_km: float) -> dict:
+        result = {contact_id: [] for contact_id, _, _ in points}
+        if not points:
+            return result
+        rows = self.db.execute(self.QUERY, {
+            "contact_ids": [p[0] for p in points],
+            "lats": [p[1] for p in points],
+            "lons": [p[2] for p in points],
+            "radius_m": max_km * 1000,
+            "k": k,
+        })
+        for contact_id, broker_id, meters in rows:
+            if meters <= max_km * 1000:
+                result[contact_id].append((meters / 1000, broker_id))
+        for candidates in result.values():
+            candidates.sort(key=lambda item: item[0])
+        return result
+
+
+def _locator(db: Session, brokers: list[BrokerCandidate]):
+    if db.get_bind().dialect.name == "postgresql":
+        return EarthDistanceBrokerLocator(db)
+    return GridBrokerLocator(brokers)
+
+
+def _rotation_key(broker: BrokerCandidate, distance: float):
+    # Nunca recebeu lead vem primeiro; depois o mais antigo; depois o mais perto
+    last = broker.last_lead_assigned_at
+    return (last is not None, last or datetime.min, distance)
+
+
+def assign_unassigned_contacts(
+    db: Session,
+    batch_size: int = 100,
+    max_km: Optional[float] = None,
+    candidates: Optional[int] = None,
+) -> list[LeadAssignment]:
+    """Distribui um lote de contatos sem corretor e faz commit"""
+    max_km = settings.LEAD_ROUTING_MAX_DISTANCE_KM if max_km is None else max_km
+    candidates = settings.LEAD_ROUTING_CANDIDATES if candidates is None else candidates
+
+    contacts = db.execute(
+        select(
+            Contact.id, Property.latitude, Property.longitude, Property.city
+        )
+        .join(Property, Contact.property_id == Property.id)
+        .where(Contact.broker_id.is_(None))
+        .order_by(Contact.created_at)
+        .limit(batch_size)
+        .with_for_update(of=Contact, skip_locked=True)
+    ).all()
+    if not contacts:
+        db.commit()
+        return []
+
+    brokers = {
+        row.id: BrokerCandidate(*row)
+        for row in db.execute(
+            select(
+                Broker.id, Broker.latitude, Broker.longitude,
+                Broker.city, Broker.last_lead_assigned_at,
+            )
+            .where(Broker.is_active == True)  # noqa: E712
+            .order_by(Broker.id)
+            .with_for_update(of=Broker)
+        )
+    }
+    if not brokers:
+        db.commit()
+        return []
+
+    by_city: dict[str, list[BrokerCandidate]] = {}
+    for broker in brokers.values():
+        if broker.city:
+            by_city.setdefault(normalize_text(broker.city), []).append(broker)
+
+    points = [
+        (c.id, c.latitude, c.longitude)
+        for c in contacts
+        if c.latitude is not None and c.longitude is not None
+    ]
+    nearest = _locator(db, list(brokers.values())).nearest_many(
+        points, k=candidates, max_km=max_km
+    )
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    assignments: list[LeadAssignment] = []
+    for position, contact in enumerate(contacts):
+        pool = [
+            (distance, brokers[broker_id])
+            for distance, broker_id in nearest.get(contact.id, [])
+            if broker_id in brokers
+        ]
+        strategy = "nearest"
+        if not pool and contact.city:
+            strategy = "city"
+            pool = [
+                (None, broker)
+                for broker in by_city.get(normalize_text(contact.city), [])
+            ]
+        if not pool:
+            strategy = "any"
+            pool = [(None, broker) for broker in brokers.values()]
+
+        distance, broker = min(
+            pool,
+            key=lambda item: _rotation_key(
+                item[1], item[0] if item[0] is not None else 0.0
+            ),
+        )
+        # Timestamps crescentes mantem o rodizio dentro do proprio lote
+        broker.last_lead_assigned_at = now + timedelta(microseconds=position)
+        assignments.append(LeadAssignment(
+            contact_id=contact.id,
+            broker_id=broker.id,
+            distance_km=round(distance, 3) if distance is not None else None,
+            strategy=strategy,
+        ))
+
+    _apply(db, assignments, brokers)
+    db.commit()
+    return assignments
+
+
+def _apply(db: Session, assignments: list[LeadAssignment], brokers: dict):
+    contacts_table = Contact.__table__
+    db.execute(
+        update(contacts_table)
+        .where(contacts_table.c.id == bindparam("contact_id"))
+        .values(broker_id=bindparam("assigned_broker_id")),
+        [
+            {"contact_id": a.contact_id, "assigned_broker_id": a.broker_id}
+            for a in assignments
+        ],
+    )
+
+    per_broker: dict[str, int] = {}
+    for a in assignments:
+        per_broker[a.broker_id] = per_broker.get(a.broker_id, 0) + 1
+
+    brokers_table = Broker.__table__
+    db.execute(
+        update(brokers_table)
+        .where(brokers_table.c.id == bindparam("b_id"))
+        .values(
+            lead_count=brokers_table.c.lead_count + bindparam("n"),
+            last_lead_assigned_at=bindparam("assigned_at"),
+        ),
+        [
+            {
+                "b_id": broker_id,
+                "n": count,
+                "assigned_at": brokers[broker_id].last_lead_assigned_at,
+            }
+            for broker_id, count in per_broker.items()
+        ],
+    )
+
+
+def count_unassigned(db: Session) -> int:
+    return db.execute(
+        select(func.count()).select_from(Contact).where(
+            Contact.broker_id.is_(None)
+        )
+    ).scalar_one()
@@ -0,0 +1,67 @@
+"""
+Leitura rapida para as listagens do admin.
+
+As linhas sao buscadas como mappings via SQLAlchemy Core e serializadas
+direto em JSON com orjson, sem hidratar objetos ORM nem revalidar cada
+linha pelos schemas Pydantic. O formato da resposta continua o mesmo dos
+schemas em app/schemas.py.
+"""
+from functools import lru_cache
+from typing import Any, Iterable, Optional, Type
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+
+
+@lru_cache(maxsize=None)
+def response_columns(model, schema: Type[BaseModel]) -> tuple:
+    """Colunas do model na mesma ordem dos campos do schema de resposta"""
+    table = model.__table__
+    return tuple(table.c[name] for name in schema.model_fields)
+
+
+def page_statement(
+    model,
+    schema: Type[BaseModel],
+    filters: Iterable[Any] = (),
+    order_by: Optional[Any] = None,
+    skip: int = 0,
+    limit: int = 50,
+) -> Select:
+    """Monta o SELECT de uma pagina da listagem"""
+    stmt = select(*response_columns(model, schema)).where(*filters)
+    if order_by is not None:
+        stmt = stmt.order_by(order_by)
+    return stmt.offset(skip).limit(limit)
+
+
+def count_statement(model, filters: Iterable[Any] = ()) -> Select:
+    """Monta o SELECT count(*) com os mesmos filtros da listagem"""
+    return select(func.count()).select_from(model.__table__).where(*filters)
+
+
+def fetch_rows(db: Session, stmt: Select) -> list[dict]:
+    """Executa o SELECT e devolve as linhas como dicts simples"""
+    return [dict(row) for row in db.execute(stmt).mappings()]
+
+
+def list_response(
+    db: Session,
+    model,
+    schema: Type[BaseModel],
+    key: str,
+    filters: Iterable[Any] = (),
+    order_by: Optional[Any] = None,
+    skip: int = 0,
+    limit: int = 50,
+) -> ORJSONResponse:
+    """
+    Resposta paginada no formato {"total": n, key: [...]}.
+    """
+    filters = tuple(filters)
+    total = db.execute(count_statement(model, filters)).scalar_one()
+    rows = fetch_rows(
+        db, page_statement(model, schema, filters, order_by, skip, limit)
+    )
+    return ORJSONResponse({"total": total, key: rows})
@@ -0,0 +1,201 @@
+"""
+Indice de mercado: p25/mediana/p75 do preco/m2 e contagem de anuncios
+ativos por cidade/bairro/tipo/finalidade, pre-calculados na tabela
+market_index para que as estatisticas de mercado sejam uma leitura por
+chave em vez de uma agregacao sobre todos os imoveis.
+
+A reconstrucao e incremental: so as chaves com imoveis alterados desde a
+ultima reconstrucao (Property.updated_at > max(market_index.updated_at))
+sao recalculadas, com delete + insert na mesma transacao. No Postgres os
+percentis saem de percentile_cont no proprio GROUP BY; nos demais bancos
+as linhas vem ordenadas por chave e os percentis sao calculados em Python
+(interpolacao linear, mesmo resultado do percentile_cont).
+
+Imoveis apagados ou que mudaram de cidade/bairro deixam a chave antiga
+desatualizada ate a proxima reconstrucao completa (full=True).
+"""
+import time
+import uuid
+from datetime import datetime, timezone
+from itertools import groupby
+from typing import Optional
+from sqlalchemy import case, delete, func, insert, select, tuple_
+from sqlalchemy.orm import Session
+from app.models.import_log import ImportLog
+from app.models.market_index import MarketIndex
+from app.models.property import Property
+from app.services.search import normalize_text, normalized
+
+KEY_COLUMNS = ("city", "neighborhood", "property_type", "purpose")
+PERCENTILES = (
+    ("p25_price_per_sqm", 0.25),
+    ("median_price_per_sqm", 0.5),
+    ("p75_price_per_sqm", 0.75),
+)
+KEY_CHUNK = 500
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def normalize_key(value: Optional[str]) -> str:
+    """Valor de chave como gravado no indice"""
+    return normalize_text((value or "").strip())
+
+
+def _key_expressions():
+    return (
+        normalized(Property.city),
+        normalized(func.coalesce(Property.neighborhood, "")),
+        normalized(Property.property_type),
+        normalized(Property.purpose),
+    )
+
+
+def _chunks(items: list, size: int = KEY_CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def last_rebuild_at(db: Session) -> Optional[datetime]:
+    return db.execute(select(func.max(MarketIndex.updated_at))).scalar()
+
+
+def changed_keys(db: Session, since: datetime) -> list[tuple]:
+    """Chaves com algum imovel alterado depois de since"""
+    stmt = (
+        select(*_key_expressions())
+        .where(Property.city.isnot(None), Property.updated_at > since)
+        .distinct()
+    )
+    return sorted(tuple(row) for row in db.execute(stmt))
+
+
+def _key_filter(keys: list[tuple]):
+    return [
+        normalized(Property.city).in_({key[0] for key in keys}),
+        tuple_(*_key_expressions()).in_(keys),
+    ]
+
+
+def _aggregate_postgres(db: Session, filters: list) -> list[dict]:
+    price = Property.price_per_sqm
+    priced = case((price > 0, price))
+    keys = _key_expressions()
+    stmt = (
+        select(
+            *(expr.label(name) for expr, name in zip(keys, KEY_COLUMNS)),
+            func.max(Property.city).label("city_name"),
+            func.max(Property.neighborhood).label("neighborhood_name"),
+            func.count().label("listing_count"),
+            func.count(priced).label("priced_count"),
+            *(
+                func.percentile_cont(q).within_group(priced).label(name)
+                for name, q in PERCENTILES
+            ),
+        )
+        .where(*filters)
+        .group_by(*keys)
+    )
+    return [dict(row) for row in db.execute(stmt).mappings()]
+
+
+def _aggregate_python(db: Session, filters: list) -> list[dict]:
+    import numpy as np  # so neste caminho; nao pesa no import da aplicacao
+    keys = _key_expressions()
+    stmt = (
+        select(
+            *keys, Property.city, Property.neighborhood, Property.price_per_sqm
+        )
+        .where(*filters)
+        .order_by(*keys)
+        .execution_options(yield_per=2000)
+    )
+
+    rows = []
+    for key, group in groupby(db.execute(stmt), key=lambda r: tuple(r[:4])):
+        group = list(group)
+        prices = np.array(
+            [r.price_per_sqm for r in group if (r.price_per_sqm or 0) > 0],
+            dtype=np.float64,
+        )
+        values = (
+            np.percentile(prices, [q * 100 for _, q in PERCENTILES])
+            if len(prices) else [None] * len(PERCENTILES)
+        )
+        rows.append({
+            **dict(zip(KEY_COLUMNS, key)),
+            "city_name": max(r.city for r in group),
+            "neighborhood_name": max(
+                (r.neighborhood for r in group if r.neighborhood), default=None
+            ),
+            "listing_count": len(group),
+            "priced_count": len(prices),
+            **{
+                name: None if value is None else float(value)
+                for (name, _), value in zip(PERCENTILES, values)
+            },
+        })
+    return rows
+
+
+def rebuild_market_index(db: Session, full: bool = False) -> dict:
+    """Recalcula o indice (incremental por padrao) e faz commit"""
+    started = time.perf_counter()
+    now = _utcnow()
+    since = None if full else last_rebuild_at(db)
+    full = since is None
+
+    filters = [
+        Property.is_active == True,  # noqa: E712
+        Property.city.isnot(None),
+    ]
+    table = MarketIndex.__table__
+    aggregate = (
+        _aggregate_postgres if db.get_bind().dialect.name == "postgresql"
+        else _aggregate_python
+    )
+
+    if full:
+        rows = aggregate(db, filters)
+        db.execute(delete(table))
+        keys_count = len(rows)
+    else:
+        keys = changed_keys(db, since)
+        rows = []
+        for chunk in _chunks(keys):
+            rows.extend(aggregate(db, [*filters, *_key_filter(chunk)]))
+            db.execute(delete(table).where(
+                tuple_(*(table.c[name] for name in KEY_COLUMNS)).in_(chunk)
+            ))
+        keys_count = len(keys)
+
+    if rows:
+        db.execute(insert(table), [
+            {**row, "id": str(uuid.uuid4()), "updated_at": now} for row in rows
+        ])
+    db.commit()
+
+    return {
+        "full": full,
+        "keys": keys_count,
+        "rows": len(rows),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def refresh_after_import(db: Session) -> Optional[dict]:
+    """
+    Reconstrucao incremental se houve importacao concluida depois da ultima
+    reconstrucao; None quando o indice ja esta em dia.
+    """
+    last = last_rebuild_at(db)
+    latest_import = db.execute(
+        select(func.max(ImportLog.completed_at)).where(
+            ImportLog.status == "success"
+        )
+    ).scalar()
+    if last is not None and (latest_import is None or latest_import <= last):
+        return None
+    return rebuild_market_index(db)
@@ -0,0 +1,350 @@
+"""
+Notificacoes em massa (fan-out) e contador de nao lidas por usuario.
+
+Uma campanha (NotificationCampaign) descreve o publico e o texto:
+- favorites: quem favoritou os imoveis em property_ids (uma notificacao
+  por favorito);
+- users: os usuarios em user_ids;
+- all: todos os usuarios.
+
+As linhas de notifications sao geradas no banco com um unico
+INSERT ... SELECT sobre favorites/users, sem carregar nada em Python.
+Titulo, mensagem e link aceitam placeholders do imovel ({title}, {city},
+{neighborhood}, {property_type}, {property_id}) no publico favorites;
+eles viram concatenacoes SQL com as colunas de properties. Textos que
+variam por imovel (ex.: preco antigo e novo) vao em details e sao
+anexados a mensagem com um CASE sobre property_id no mesmo SELECT.
+
+notification_counters guarda as nao lidas por usuario e e atualizado na
+mesma transacao do fan-out (e em mark_read), entao o badge do app e uma
+leitura por chave em vez de COUNT(*) WHERE is_read = false. Como o portal
+tambem marca notificacoes como lidas, reconcile_unread_counters recalcula
+os contadores a partir de notifications e corrige os divergentes.
+"""
+import json
+from datetime import datetime, timezone
+from functools import reduce
+from string import Formatter
+from typing import Optional
+from sqlalchemy import (
+    String, bindparam, case, cast, false, func, insert, literal, null, select, update,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.models.favorites import Favorite
+from app.models.notification import (
+    Notification, NotificationCampaign, NotificationCounter, NotificationType,
+)
+from app.models.property import Property
+from app.models.user import User
+
+AUDIENCES = ("favorites", "users", "all")
+MAX_CAMPAIGN_IDS = 10_000
+# Status a partir dos quais dispatch_campaign pode (re)executar a campanha
+DISPATCHABLE_STATUSES = ("pending", "failed")
+
+# Placeholders dos textos -> expressao sobre properties
+PLACEHOLDERS = {
+    "title": lambda: func.coalesce(Property.title, Property.property_type, ""),
+    "property_type": lambda: func.coalesce(Property.property_type, ""),
+    "city": lambda: func.coalesce(Property.city, ""),
+    "neighborhood": lambda: func.coalesce(Property.neighborhood, ""),
+    "property_id": lambda: Property.id,
+}
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def render_template(template: Optional[str], with_property: bool):
+    """Texto com placeholders -> expressao SQL (concatenacao)"""
+    if template is None:
+        return null()
+    parts = []
+    for text, field, _, _ in Formatter().parse(template):
+        if text:
+            parts.append(literal(text, String))
+        if field is None:
+            continue
+        if field not in PLACEHOLDERS:
+            raise ValueError(f"Unknown placeholder: {{{field}}}")
+        if not with_property:
+            raise ValueError(
+                f"Placeholder {{{field}}} requires the favorites audience"
+            )
+        parts.append(PLACEHOLDERS[field]())
+    if not parts:
+        return literal("", String)
+    return reduce(lambda left, right: left.concat(right), parts)
+
+
+def create_campaign(
+    db: Session,
+    type: str,
+    audience: str,
+    title: str,
+    message: str,
+    link: Optional[str] = None,
+    property_ids: Optional[list[str]] = None,
+    user_ids: Optional[list[str]] = None,
+    created_by: Optional[str] = None,
+    details: Optional[dict[str, str]] = None,
+) -> NotificationCampaign:
+    """
+    Valida e registra a campanha (sem commit). details (so no publico
+    favorites) mapeia property_id -> texto anexado a mensagem.
+    """
+    try:
+        notification_type = NotificationType(type.upper())
+    except ValueError:
+        raise ValueError(
+            f"Invalid type. Valid values: {[t.value for t in NotificationType]}"
+        )
+    if audience not in AUDIENCES:
+        raise ValueError(f"Invalid audience. Valid values: {list(AUDIENCES)}")
+
+    params = {}
+    if audience == "favorites":
+        if not property_ids:
+            raise ValueError("The favorites audience requires property_ids")
+        params["property_ids"] = sorted(set(property_ids))
+    elif audience == "users":
+        if not user_ids:
+            raise ValueError("The users audience requires user_ids")
+        params["user_ids"] = sorted(set(user_ids))
+    if any(len(ids) > MAX_CAMPAIGN_IDS for ids in params.values()):
+        raise ValueError(f"At most {MAX_CAMPAIGN_IDS} ids per campaign")
+    if details:
+        if audience != "favorites":
+            raise ValueError("details requires the favorites audience")
+        if not set(details) <= set(params["property_ids"]):
+            raise ValueError("details keys must be in property_ids")
+        params["details"] = details
+
+    # Falha cedo com placeholder invalido, antes de gravar a campanha
+    for template in (title, message, link):
+        render_template(template, with_property=audience == "favorites")
+
+    campaign = NotificationCampaign(
+        type=notification_type.value,
+        audience=audience,
+        params=json.dumps(params),
+        title=title,
+        message=message,
+        link=link,
+        created_by=created_by,
+    )
+    db.add(campaign)
+    db.flush()
+    return campaign
+
+
+def _id_expression(db: Session):
+    if _is_postgres(db):
+        return cast(func.gen_random_uuid(), String)
+    return func.lower(func.hex(func.randomblob(16)))
+
+
+def _audience_select(db: Session, campaign: NotificationCampaign, now: datetime):
+    params = json.loads(campaign.params or "{}")
+    with_property = campaign.audience == "favorites"
+    message = render_template(campaign.message, with_property)
+    if params.get("details"):
+        message = message.concat(case(
+            params["details"], value=Favorite.property_id, else_=literal("", String)
+        ))
+    columns = [
+        _id_expression(db),
+        Favorite.user_id if with_property else User.id,
+        render_template(campaign.title, with_property),
+        message,
+        literal(
+            NotificationType(campaign.type), Notification.__table__.c.type.type
+        ),
+        render_template(campaign.link, with_property),
+        false(),
+        literal(now, Notification.__table__.c.created_at.type),
+        Property.id if with_property else null(),
+        literal(campaign.id, String),
+    ]
+    if with_property:
+        return (
+            select(*columns)
+            .select_from(Favorite)
+            .join(Property, Property.id == Favorite.property_id)
+            .where(Favorite.property_id.in_(params["property_ids"]))
+        )
+    stmt = select(*columns).select_from(User)
+    if campaign.audience == "users":
+        stmt = stmt.where(User.id.in_(params["user_ids"]))
+    return stmt
+
+
+def _upsert(db: Session):
+    return postgresql_insert if _is_postgres(db) else sqlite_insert
+
+
+def _add_unread(db: Session, campaign_id: str, since: datetime) -> None:
+    n = Notification.__table__
+    counters = NotificationCounter.__table__
+    source = (
+        select(n.c.user_id, func.count(), literal(_utcnow(), counters.c.updated_at.type))
+        # created_at limita a leitura as particoes recentes no Postgres
+        .where(n.c.campaign_id == campaign_id, n.c.created_at >= since)
+        .group_by(n.c.user_id)
+    )
+    stmt = _upsert(db)(counters).from_select(
+        ["user_id", "unread", "updated_at"], source
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[counters.c.user_id],
+        set_={
+            "unread": counters.c.unread + stmt.excluded.unread,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    db.execute(stmt)
+
+
+def fan_out(db: Session, campaign: NotificationCampaign) -> int:
+    """
+    Gera as notificacoes da campanha com um INSERT ... SELECT e soma as
+    nao lidas nos contadores. Sem commit; retorna o numero de linhas.
+    """
+    now = _utcnow().replace(tzinfo=None)
+    table = Notification.__table__
+    result = db.execute(
+        insert(table).from_select(
+            [
+                "id", "user_id", "title", "message", "type", "link",
+                "is_read", "created_at", "property_id", "campaign_id",
+            ],
+            _audience_select(db, campaign, now),
+        )
+    )
+    recipients = max(result.rowcount or 0, 0)
+    if recipients:
+        _add_unread(db, campaign.id, now)
+    return recipients
+
+
+def dispatch_campaign(db: Session, campaign: NotificationCampaign) -> bool:
+    """
+    Executa a campanha registrando status e tempos (com commit). A reserva
+    e um UPDATE condicional (pending/failed -> running): uma campanha ja
+    em execucao ou concluida (job repetido ou reenfileirado depois do
+    commit) nao gera as notificacoes de novo; nesse caso retorna False.
+    """
+    claimed = db.execute(
+        update(NotificationCampaign)
+        .where(
+            NotificationCampaign.id == campaign.id,
+            NotificationCampaign.status.in_(DISPATCHABLE_STATUSES),
+        )
+        .values(status="running", started_at=_utcnow(), error_message=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    db.refresh(campaign)
+    if not claimed:
+        return False
+    try:
+        campaign.recipients = fan_out(db, campaign)
+        campaign.status = "completed"
+    except Exception as e:
+        db.rollback()
+        campaign.status = "failed"
+        campaign.error_message = str(e)
+    campaign.completed_at = _utcnow()
+    db.commit()
+    return True
+
+
+def read_count(db: Session, campaign: NotificationCampaign) -> int:
+    """Notificacoes da campanha ja lidas"""
+    n = Notification.__table__
+    filters = [n.c.campaign_id == campaign.id, n.c.is_read == True]  # noqa: E712
+    if campaign.started_at is not None:
+        filters.append(n.c.created_at >= campaign.started_at.replace(tzinfo=None))
+    return db.execute(
+        select(func.count()).select_from(n).where(*filters)
+    ).scalar_one()
+
+
+# ===== Nao lidas =====
+
+def unread_count(db: Session, user_id: str) -> int:
+    return db.execute(
+        select(NotificationCounter.unread).where(
+            NotificationCounter.user_id == user_id
+        )
+    ).scalar() or 0
+
+
+def mark_read(
+    db: Session, user_id: str, notification_ids: Optional[list[str]] = None
+) -> int:
+    """Marca como lidas (todas ou as informadas) e desconta do contador"""
+    n = Notification.__table__
+    stmt = update(n).where(
+        n.c.user_id == user_id, n.c.is_read == False  # noqa: E712
+    ).values(is_read=True)
+    if notification_ids is not None:
+        stmt = stmt.where(n.c.id.in_(notification_ids))
+    changed = db.execute(stmt).rowcount or 0
+    if changed:
+        c = NotificationCounter.__table__
+        db.execute(
+            update(c)
+            .where(c.c.user_id == user_id)
+            .values(
+                unread=case((c.c.unread > changed, c.c.unread - changed), else_=0),
+                updated_at=_utcnow(),
+            )
+        )
+    db.commit()
+    return changed
+
+
+def reconcile_unread_counters(db: Session) -> dict:
+    """
+    Recalcula as nao lidas a partir de notifications e corrige so os
+    contadores divergentes (com commit)
+    """
+    n = Notification.__table__
+    actual = dict(db.execute(
+        select(n.c.user_id, func.count())
+        .where(n.c.is_read == False)  # noqa: E712
+        .group_by(n.c.user_id)
+    ).all())
+    c = NotificationCounter.__table__
+    stored = dict(db.execute(select(c.c.user_id, c.c.unread)).all())
+
+    now = _utcnow()
+    changed = [
+        {"counter_user_id": user_id, "unread": actual.get(user_id, 0), "now": now}
+        for user_id in stored
+        if stored[user_id] != actual.get(user_id, 0)
+    ]
+    missing = [
+        {"user_id": user_id, "unread": count, "updated_at": now}
+        for user_id, count in actual.items()
+        if user_id not in stored
+    ]
+    if changed:
+        db.execute(
+            update(c)
+            .where(c.c.user_id == bindparam("counter_user_id"))
+            .values(unread=bindparam("unread"), updated_at=bindparam("now")),
+            changed,
+        )
+    if missing:
+        db.execute(insert(c), missing)
+    db.commit()
+    return {"fixed": len(changed), "created": len(missing)}
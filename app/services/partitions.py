@@ -0,0 +1,170 @@
+"""
+Manutencao das particoes mensais (Postgres) de evaluations, notifications
+e import_logs, criadas pela migracao e4a6c8e0b2d3.
+
+- ensure_future_partitions: cria as particoes do mes atual ate
+  PARTITION_MONTHS_AHEAD meses a frente. Se a particao DEFAULT ja tiver
+  linhas do mes, elas sao movidas para a nova particao antes do ATTACH.
+- apply_retention: desanexa (e, com PARTITION_RETENTION_DROP, apaga) as
+  particoes inteiramente anteriores a janela de retencao da tabela.
+
+Particoes seguem o nome <tabela>_pAAAA_MM. Em outros bancos as funcoes
+nao fazem nada.
+"""
+import re
+from datetime import date, datetime, timezone
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+# tabela -> coluna de particao
+PARTITIONED_TABLES = {
+    "evaluations": "created_at",
+    "notifications": "created_at",
+    "import_logs": "started_at",
+}
+
+_PARTITION_NAME = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})_(?P<month>\d{2})$")
+
+
+def _retention_months(table: str) -> int:
+    return {
+        "evaluations": settings.EVALUATIONS_RETENTION_MONTHS,
+        "notifications": settings.NOTIFICATIONS_RETENTION_MONTHS,
+        "import_logs": settings.IMPORT_LOGS_RETENTION_MONTHS,
+    }[table]
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def _current_month() -> date:
+    today = datetime.now(timezone.utc).date()
+    return today.replace(day=1)
+
+
+def is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def partitioned_tables(db: Session) -> list[str]:
+    """Tabelas de PARTITIONED_TABLES que ja estao particionadas"""
+    rows = db.execute(text(
+        """
+        SELECT c.relname
+        FROM pg_partitioned_table p
+        JOIN pg_class c ON c.oid = p.partrelid
+        WHERE c.relnamespace = current_schema()::regnamespace
+        """
+    )).scalars()
+    return [name for name in rows if name in PARTITIONED_TABLES]
+
+
+def list_partitions(db: Session, table: str) -> list[tuple[str, date]]:
+    """(nome, mes) das particoes mensais anexadas, em ordem"""
+    rows = db.execute(text(
+        """
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:table AS regclass)
+        """
+    ), {"table": table}).scalars()
+
+    partitions = []
+    for name in rows:
+        match = _PARTITION_NAME.match(name)
+        if match and match["table"] == table:
+            month = date(int(match["year"]), int(match["month"]), 1)
+            partitions.append((name, month))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+def _create_partition(db: Session, table: str, month: date) -> None:
+    column = PARTITIONED_TABLES[table]
+    name = partition_name(table, month)
+    bounds = {"start": month, "end": add_months(month, 1)}
+    bound_sql = (
+        f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    )
+
+    in_default = db.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {table}_default "
+        f"WHERE {column} >= :start AND {column} < :end)"
+    ), bounds).scalar()
+    if not in_default:
+        db.execute(text(f"CREATE TABLE {name} PARTITION OF {table} {bound_sql}"))
+        return
+
+    # Linhas do mes caidas na DEFAULT: move antes de anexar a particao
+    db.execute(text(
+        f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    ))
+    db.execute(text(
+        f"WITH moved AS (DELETE FROM {table}_default "
+        f"WHERE {column} >= :start AND {column} < :end RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), bounds)
+    db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} {bound_sql}"))
+
+
+def ensure_future_partitions(
+    db: Session, months_ahead: Optional[int] = None
+) -> list[str]:
+    """Cria as particoes que faltam ate months_ahead; retorna os nomes"""
+    if not is_postgres(db):
+        return []
+    months_ahead = (
+        settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    )
+    current = _current_month()
+
+    created = []
+    for table in partitioned_tables(db):
+        existing = {month for _, month in list_partitions(db, table)}
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if month not in existing:
+                _create_partition(db, table, month)
+                created.append(partition_name(table, month))
+    db.commit()
+    return created
+
+
+def apply_retention(db: Session, drop: Optional[bool] = None) -> dict:
+    """Desanexa/apaga particoes mais antigas que a retencao de cada tabela"""
+    result = {"detached": [], "dropped": []}
+    if not is_postgres(db):
+        return result
+    drop = settings.PARTITION_RETENTION_DROP if drop is None else drop
+    current = _current_month()
+
+    for table in partitioned_tables(db):
+        months = _retention_months(table)
+        if months <= 0:
+            continue
+        cutoff = add_months(current, -months)
+        for name, month in list_partitions(db, table):
+            if add_months(month, 1) > cutoff:
+                break
+            db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            result["detached"].append(name)
+            if drop:
+                db.execute(text(f"DROP TABLE {name}"))
+                result["dropped"].append(name)
+    db.commit()
+    return result
+
+
+def maintain_partitions(db: Session) -> dict:
+    if not is_postgres(db):
+        return {"status": "skipped", "created": [], "detached": [], "dropped": []}
+    created = ensure_future_partitions(db)
+    return {"status": "ok", "created": created, **apply_retention(db)}
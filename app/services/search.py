@@ -0,0 +1,237 @@
+"""
+Busca textual do admin (cidades, bairros, titulos, enderecos).
+
+As comparacoes usam salu_normalize(coluna), que tira acentos e passa para
+minusculas ("São Paulo" -> "sao paulo"). No Postgres a funcao e criada pela
+migracao junto com indices GIN pg_trgm sobre a mesma expressao, entao
+LIKE '%termo%' usa indice em vez de seq scan. No SQLite a funcao e
+registrada em Python em cada conexao.
+
+search_properties faz a busca full-text ranqueada nas descricoes
+(tsvector em portugues no Postgres, fallback por termos no SQLite).
+"""
+import html
+import sqlite3
+import unicodedata
+from typing import Iterable, Optional
+from sqlalchemy import event, func, literal_column, or_, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.models.property import Property
+
+NORMALIZE_FUNCTION = "salu_normalize"
+
+
+def normalize_text(value: Optional[str]) -> Optional[str]:
+    """Remove acentos e converte para minusculas"""
+    if value is None:
+        return None
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(
+        c for c in decomposed if not unicodedata.combining(c)
+    ).lower()
+
+
+@event.listens_for(Engine, "connect")
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function(
+            NORMALIZE_FUNCTION, 1, normalize_text, deterministic=True
+        )
+
+
+def normalized(column):
+    """Expressao SQL salu_normalize(coluna)"""
+    return getattr(func, NORMALIZE_FUNCTION)(column)
+
+
+def _like_pattern(term: str) -> str:
+    escaped = (
+        term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    )
+    return f"%{escaped}%"
+
+
+def contains(column, term: str):
+    """Filtro: coluna contem o termo, sem diferenciar acentos/maiusculas"""
+    return normalized(column).like(
+        _like_pattern(normalize_text(term.strip())), escape="\\"
+    )
+
+
+def contains_any(columns: Iterable, term: str):
+    """Filtro: alguma das colunas contem o termo"""
+    return or_(*(contains(column, term) for column in columns))
+
+
+# ===== Busca full-text nas descricoes =====
+
+# Configuracao criada na migracao: portuguese + unaccent
+TS_CONFIG = "salu_portuguese"
+HEADLINE_OPTIONS = (
+    "StartSel=<mark>, StopSel=</mark>, "
+    "MaxWords=35, MinWords=15, MaxFragments=2, FragmentDelimiter= ... "
+)
+SNIPPET_RADIUS = 80
+
+SEARCH_HIT_COLUMNS = (
+    "id", "external_code", "title", "city", "neighborhood",
+    "property_type", "purpose", "sale_price", "rental_price", "is_active",
+)
+
+
+def search_properties(
+    db: Session,
+    q: str,
+    skip: int = 0,
+    limit: int = 20,
+    is_active: Optional[bool] = None,
+) -> dict:
+    """
+    Busca ranqueada em titulo + descricao dos imoveis.
+    Postgres: tsvector gerado (search_vector) + indice GIN.
+    SQLite: fallback por termos com LIKE normalizado.
+    """
+    filters = []
+    if is_active is not None:
+        filters.append(Property.is_active == is_active)
+
+    if db.get_bind().dialect.name == "postgresql":
+        return _search_postgres(db, q, skip, limit, filters)
+    return _search_fallback(db, q, skip, limit, filters)
+
+
+def _hit_columns():
+    return [Property.__table__.c[name] for name in SEARCH_HIT_COLUMNS]
+
+
+def _html_escape_sql(expr):
+    """html.escape(quote=False) em SQL: a descricao vem do feed (terceiros)"""
+    for char, entity in (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;")):
+        expr = func.replace(expr, char, entity)
+    return expr
+
+
+def _search_postgres(db, q, skip, limit, filters) -> dict:
+    ts_query = func.websearch_to_tsquery(
+        literal_column(f"'{TS_CONFIG}'::regconfig"), q
+    )
+    vector = literal_column("properties.search_vector")
+    filters = [vector.op("@@")(ts_query), *filters]
+
+    total = db.execute(
+        select(func.count()).select_from(Property).where(*filters)
+    ).scalar_one()
+
+    # ts_headline e caro: calcula so para as linhas da pagina
+    page = (
+        select(
+            *_hit_columns(),
+            Property.description,
+            func.ts_rank_cd(vector, ts_query).label("rank"),
+        )
+        .where(*filters)
+        .order_by(literal_column("rank").desc(), Property.id)
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+    stmt = select(
+        *(page.c[name] for name in SEARCH_HIT_COLUMNS),
+        page.c.rank,
+        func.ts_headline(
+            literal_column(f"'{TS_CONFIG}'::regconfig"),
+            _html_escape_sql(func.coalesce(page.c.description, "")),
+            ts_query,
+            HEADLINE_OPTIONS,
+        ).label("snippet"),
+    ).order_by(page.c.rank.desc(), page.c.id)
+
+    return {
+        "total": total,
+        "results": [dict(row) for row in db.execute(stmt).mappings()],
+    }
+
+
+def _search_fallback(db, q, skip, limit, filters) -> dict:
+    terms = [t for t in normalize_text(q).split() if t]
+    if not terms:
+        return {"total": 0, "results": []}
+
+    document = normalized(
+        func.coalesce(Property.title, "") + " "
+        + func.coalesce(Property.description, "")
+    )
+    filters = [
+        *filters,
+        *(document.like(_like_pattern(term), escape="\\") for term in terms),
+    ]
+    # rank = numero de ocorrencias dos termos no documento
+    rank = sum(
+        (func.length(document) - func.length(func.replace(document, term, "")))
+        / len(term)
+        for term in terms
+    )
+
+    total = db.execute(
+        select(func.count()).select_from(Property).where(*filters)
+    ).scalar_one()
+    stmt = (
+        select(*_hit_columns(), Property.description, rank.label("rank"))
+        .where(*filters)
+        .order_by(literal_column("rank").desc(), Property.id)
+        .offset(skip)
+        .limit(limit)
+    )
+
+    results = []
+    for row in db.execute(stmt).mappings():
+        hit = {name: row[name] for name in SEARCH_HIT_COLUMNS}
+        hit["rank"] = float(row["rank"] or 0)
+        hit["snippet"] = _highlight(row["description"], terms)
+        results.append(hit)
+    return {"total": total, "results": results}
+
+
+def _highlight(text: Optional[str], terms: list[str]) -> Optional[str]:
+    """
+    Trecho da descricao em volta do primeiro termo, com <mark>. O texto
+    vem do feed (terceiros) e e escapado; so as marcas sao HTML.
+    """
+    if not text:
+        return None
+    folded = normalize_text(text)
+    if len(folded) != len(text):
+        # Normalizacao mudou o tamanho; sem como alinhar os indices
+        return html.escape(text[:2 * SNIPPET_RADIUS], quote=False)
+
+    positions = [folded.find(term) for term in terms]
+    positions = [p for p in positions if p >= 0]
+    first = min(positions) if positions else 0
+    start = max(0, first - SNIPPET_RADIUS)
+    end = min(len(text), first + SNIPPET_RADIUS)
+
+    marks = []
+    for term in terms:
+        pos = folded.find(term, start, end)
+        while pos >= 0 and pos + len(term) <= end:
+            marks.append((pos, pos + len(term)))
+            pos = folded.find(term, pos + len(term), end)
+    marks.sort()
+
+    parts = []
+    cursor = start
+    for mark_start, mark_end in marks:
+        if mark_start < cursor:
+            continue
+        parts.append(html.escape(text[cursor:mark_start], quote=False))
+        parts.append(f"<mark>{html.escape(text[mark_start:mark_end], quote=False)}</mark>")
+        cursor = mark_end
+    parts.append(html.escape(text[cursor:end], quote=False))
+
+    snippet = "".join(parts)
+    if start > 0:
+        snippet = "... " + snippet
+    if end < len(text):
+        snippet = snippet + " ..."
+    return snippet
@@ -0,0 +1,322 @@
+"""
+Motor de avaliacao por comparaveis (Evaluation).
+
+Os imoveis ativos da mesma cidade/tipo/finalidade sao carregados uma vez
+por grupo em arrays NumPy; a similaridade e as estatisticas de todas as
+avaliacoes do grupo sao calculadas de uma vez (matriz avaliacoes x
+comparaveis), sem loop em Python por comparavel.
+
+Para cada avaliacao:
+1. comparaveis similares: area +-30%, quartos e vagas +-1 e no maximo um
+   diferencial divergente; com menos de MIN_COMPARABLES, relaxa para so
+   area +-50%;
+2. preco/m2 dos similares sem outliers (cercas de Tukey, 1.5 * IQR);
+3. estimated_price = media aparada (10% de cada lado) * area,
+   min_price/max_price = Q1/Q3 * area.
+
+O NumPy e importado dentro das funcoes para nao pesar no import da
+aplicacao (startup dos workers).
+"""
+from __future__ import annotations
+
+import math
+import time
+import warnings
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Optional
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+from app.models.evaluation import Evaluation
+from app.models.property import Property
+from app.services.search import normalize_text, normalized
+
+if TYPE_CHECKING:
+    import numpy as np
+
+AMENITY_FIELDS = ("has_pool", "has_gym", "has_elevator", "has_security")
+RENTAL_PURPOSES = {"aluguel", "locacao", "rent", "rental", "temporada"}
+
+AREA_TOLERANCE = 0.3
+RELAXED_AREA_TOLERANCE = 0.5
+MAX_AMENITY_MISMATCHES = 1
+MIN_COMPARABLES = 3
+TRIM_FRACTION = 0.1
+# Limite de celulas da matriz avaliacoes x comparaveis por bloco
+MAX_MATRIX_CELLS = 2_000_000
+
+
+@lru_cache(maxsize=1)
+def _popcount() -> np.ndarray:
+    """Numero de bits 1 para mascaras de ate 4 diferenciais"""
+    import numpy as np
+    return np.array([bin(i).count("1") for i in range(16)], dtype=np.int8)
+
+
+@dataclass
+class Comparables:
+    area: np.ndarray
+    bedrooms: np.ndarray
+    parking: np.ndarray
+    amenities: np.ndarray  # mascara de bits de AMENITY_FIELDS
+    price_per_sqm: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.area)
+
+
+@dataclass
+class Estimates:
+    estimated_price: np.ndarray
+    price_per_sqm: np.ndarray
+    min_price: np.ndarray
+    max_price: np.ndarray
+    similar_count: np.ndarray
+    confidence: np.ndarray  # dtype object: "high" | "medium" | "low" | None
+
+
+def is_rental(purpose: Optional[str]) -> bool:
+    return normalize_text(purpose or "").strip() in RENTAL_PURPOSES
+
+
+def amenity_mask(rows: np.ndarray) -> np.ndarray:
+    """Matriz (n, 4) de 0/1 -> mascara inteira de bits"""
+    import numpy as np
+    weights = 1 << np.arange(len(AMENITY_FIELDS))
+    return (rows.astype(np.int64) * weights).sum(axis=1)
+
+
+def load_comparables(
+    db: Session, city: str, property_type: str, purpose: str
+) -> Comparables:
+    """Carrega os imoveis ativos do grupo em arrays, com um unico SELECT"""
+    import numpy as np
+    price = Property.rental_price if is_rental(purpose) else Property.sale_price
+    area = func.coalesce(Property.usable_area, Property.total_area)
+    stmt = select(
+        area,
+        Property.bedrooms,
+        Property.parking_spaces,
+        *(getattr(Property, name) for name in AMENITY_FIELDS),
+        price,
+    ).where(
+        Property.is_active == True,  # noqa: E712
+        normalized(Property.city) == normalize_text(city),
+        normalized(Property.property_type) == normalize_text(property_type),
+        normalized(Property.purpose) == normalize_text(purpose),
+        area > 0,
+        price > 0,
+    )
+    data = np.array(db.execute(stmt).all(), dtype=np.float64)
+    if data.size == 0:
+        data = np.empty((0, 4 + len(AMENITY_FIELDS)))
+
+    return Comparables(
+        area=data[:, 0],
+        bedrooms=data[:, 1],
+        parking=data[:, 2],
+        amenities=amenity_mask(data[:, 3:3 + len(AMENITY_FIELDS)]),
+        price_per_sqm=data[:, -1] / data[:, 0],
+    )
+
+
+def estimate(
+    comps: Comparables,
+    area: np.ndarray,
+    bedrooms: np.ndarray,
+    parking: np.ndarray,
+    amenities: np.ndarray,
+) -> Estimates:
+    """Estimativas para um lote de imoveis (arrays de mesmo tamanho)"""
+    import numpy as np
+    n = len(area)
+    result = Estimates(
+        estimated_price=np.full(n, np.nan),
+        price_per_sqm=np.full(n, np.nan),
+        min_price=np.full(n, np.nan),
+        max_price=np.full(n, np.nan),
+        similar_count=np.zeros(n, dtype=np.int64),
+        confidence=np.full(n, None, dtype=object),
+    )
+    if n == 0 or len(comps) == 0:
+        return result
+
+    step = max(1, MAX_MATRIX_CELLS // len(comps))
+    for start in range(0, n, step):
+        block = slice(start, start + step)
+        _estimate_block(
+            comps, area[block], bedrooms[block], parking[block],
+            amenities[block], result, block,
+        )
+    return result
+
+
+def _estimate_block(comps, area, bedrooms, parking, amenities, out, block):
+    import numpy as np
+    area_ratio = np.abs(comps.area[None, :] - area[:, None]) / area[:, None]
+    mismatches = _popcount()[amenities[:, None] ^ comps.amenities[None, :]]
+    strict = (
+        (area_ratio <= AREA_TOLERANCE)
+        & (np.abs(comps.bedrooms[None, :] - bedrooms[:, None]) <= 1)
+        & (np.abs(comps.parking[None, :] - parking[:, None]) <= 1)
+        & (mismatches <= MAX_AMENITY_MISMATCHES)
+    )
+    relaxed = area_ratio <= RELAXED_AREA_TOLERANCE
+    use_strict = strict.sum(axis=1) >= MIN_COMPARABLES
+    mask = np.where(use_strict[:, None], strict, relaxed)
+
+    values = np.where(mask, comps.price_per_sqm[None, :], np.nan)
+    with warnings.catch_warnings():
+        # Linhas sem nenhum comparavel geram "All-NaN slice"
+        warnings.simplefilter("ignore", RuntimeWarning)
+        q1, q3 = np.nanpercentile(values, [25, 75], axis=1)
+        iqr = q3 - q1
+        inside = (
+            (values >= (q1 - 1.5 * iqr)[:, None])
+            & (values <= (q3 + 1.5 * iqr)[:, None])
+        )
+        values = np.where(inside, values, np.nan)
+
+        low, high, q1, q3 = np.nanpercentile(
+            values,
+            [TRIM_FRACTION * 100, (1 - TRIM_FRACTION) * 100, 25, 75],
+            axis=1,
+        )
+        trimmed = np.where(
+            (values >= low[:, None]) & (values <= high[:, None]),
+            values, np.nan,
+        )
+        center = np.nanmean(trimmed, axis=1)
+
+    count = np.count_nonzero(~np.isnan(values), axis=1)
+    valid = count >= MIN_COMPARABLES
+
+    out.similar_count[block] = count
+    out.price_per_sqm[block] = np.where(valid, center, np.nan)
+    out.estimated_price[block] = np.where(valid, center * area, np.nan)
+    out.min_price[block] = np.where(valid, q1 * area, np.nan)
+    out.max_price[block] = np.where(valid, q3 * area, np.nan)
+
+    confidence = np.full(len(area), None, dtype=object)
+    confidence[valid] = "low"
+    confidence[valid & (count >= 5)] = "medium"
+    confidence[valid & (count >= 10) & use_strict] = "high"
+    out.confidence[block] = confidence
+
+
+# ===== Reavaliacao em lote =====
+
+EVALUATION_FIELDS = (
+    "id", "city", "property_type", "purpose", "usable_area",
+    "bedrooms", "parking_spaces", *AMENITY_FIELDS,
+    "estimated_price", "confidence", "similar_count",
+)
+
+
+def _money(value) -> Optional[float]:
+    return None if math.isnan(value) else round(float(value), 2)
+
+
+def recompute_evaluations(
+    db: Session,
+    ids: Optional[list[str]] = None,
+    city: Optional[str] = None,
+    limit: int = 1000,
+    dry_run: bool = False,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """
+    Recalcula avaliacoes existentes. As avaliacoes sao agrupadas por
+    cidade/tipo/finalidade e cada grupo carrega os comparaveis uma vez.
+    Com dry_run nada e gravado e o resultado traz antes/depois de cada uma.
+    progress(grupos_feitos, total_grupos) e chamado a cada grupo.
+    """
+    import numpy as np
+    started = time.perf_counter()
+    table = Evaluation.__table__
+    stmt = select(*(table.c[name] for name in EVALUATION_FIELDS))
+    if ids:
+        stmt = stmt.where(table.c.id.in_(ids))
+    if city:
+        stmt = stmt.where(normalized(table.c.city) == normalize_text(city))
+    stmt = stmt.order_by(table.c.created_at.desc()).limit(limit)
+    rows = db.execute(stmt).all()
+
+    groups: dict[tuple, list] = {}
+    for row in rows:
+        key = (
+            normalize_text(row.city),
+            normalize_text(row.property_type),
+            normalize_text(row.purpose),
+        )
+        groups.setdefault(key, []).append(row)
+
+    updates = []
+    results = []
+    for done, group in enumerate(groups.values()):
+        if progress is not None:
+            progress(done, len(groups))
+        sample = group[0]
+        comps = load_comparables(
+            db, sample.city, sample.property_type, sample.purpose
+        )
+        subjects = np.array(
+            [
+                [
+                    r.usable_area or 0, r.bedrooms or 0, r.parking_spaces or 0,
+                    *(bool(getattr(r, name)) for name in AMENITY_FIELDS),
+                ]
+                for r in group
+            ],
+            dtype=np.float64,
+        )
+        estimates = estimate(
+            comps,
+            area=np.where(subjects[:, 0] > 0, subjects[:, 0], np.nan),
+            bedrooms=subjects[:, 1],
+            parking=subjects[:, 2],
+            amenities=amenity_mask(subjects[:, 3:]),
+        )
+
+        for i, row in enumerate(group):
+            values = {
+                "estimated_price": _money(estimates.estimated_price[i]),
+                "price_per_sqm": _money(estimates.price_per_sqm[i]),
+                "min_price": _money(estimates.min_price[i]),
+                "max_price": _money(estimates.max_price[i]),
+                "confidence": estimates.confidence[i],
+                "similar_count": int(estimates.similar_count[i]),
+            }
+            updates.append({"evaluation_id": row.id, **values})
+            if dry_run:
+                results.append({
+                    "id": row.id,
+                    "previous_estimated_price": row.estimated_price,
+                    "previous_confidence": row.confidence,
+                    "previous_similar_count": row.similar_count,
+                    **values,
+                })
+
+    if updates and not dry_run:
+        db.execute(
+            update(table)
+            .where(table.c.id == bindparam("evaluation_id"))
+            .values({
+                name: bindparam(name)
+                for name in (
+                    "estimated_price", "price_per_sqm", "min_price",
+                    "max_price", "confidence", "similar_count",
+                )
+            }),
+            updates,
+        )
+        db.commit()
+
+    return {
+        "evaluated": len(updates),
+        "estimated": sum(1 for u in updates if u["estimated_price"] is not None),
+        "groups": len(groups),
+        "dry_run": dry_run,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "results": results,
+    }
@@ -0,0 +1,152 @@
+"""
+Worker da fila de jobs (app/services/jobs.py), processo separado da API.
+
+Uso:
+    python -m app.worker [--processes N] [--types tipo1,tipo2] [--once]
+
+Cada processo faz polling da tabela jobs a cada JOB_POLL_SECONDS: devolve
+para a fila os jobs de workers que morreram, reserva o proximo job
+executavel e o executa. Erros do banco no loop sao logados e o processo
+tenta de novo com backoff; com --processes, o processo pai recria os
+filhos que terminarem com erro. SIGTERM/SIGINT terminam o job atual e
+encerram. Com --once o processo sai quando nao ha mais jobs prontos.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import uuid
+from typing import Optional
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.services.jobs import JOB_TYPES, claim_next, requeue_stale, run_job
+
+logger = logging.getLogger("app.worker")
+
+
+def worker_loop(
+    types: Optional[list[str]],
+    once: bool,
+    stop: threading.Event,
+    session_factory=SessionLocal,
+) -> int:
+    """Executa jobs ate stop (ou a fila esvaziar, com once); retorna quantos"""
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    processed = 0
+    failures = 0
+    while not stop.is_set():
+        try:
+            with session_factory() as db:
+                try:
+                    requeue_stale(db)
+                    job = claim_next(db, worker_id, types)
+                except Exception:
+                    db.rollback()
+                    raise
+            if job is not None:
+                logger.info(
+                    "Running job %s (%s), attempt %s", job.id, job.type, job.attempts
+                )
+                status = run_job(job, session_factory)
+                logger.info("Job %s finished: %s", job.id, status)
+                processed += 1
+        except Exception:
+            # Erro transitorio do banco: o processo continua, com backoff
+            failures += 1
+            logger.exception("Worker iteration failed (%d in a row)", failures)
+            stop.wait(min(
+                settings.JOB_RETRY_MAX_SECONDS,
+                settings.JOB_POLL_SECONDS * 2 ** min(failures, 10),
+            ))
+            continue
+        failures = 0
+        if job is None:
+            if once:
+                break
+            stop.wait(settings.JOB_POLL_SECONDS)
+    return processed
+
+
+def _run_process(types: Optional[list[str]], once: bool) -> None:
+    # Conexoes herdadas do processo pai nao podem ser usadas no filho
+    engine.dispose(close=False)
+    stop = threading.Event()
+
+    def _stop(signum, frame):
+        stop.set()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    worker_loop(types, once, stop)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Salu admin job worker")
+    parser.add_argument(
+        "--processes", type=int, default=settings.WORKER_PROCESSES,
+        help="worker processes (default: WORKER_PROCESSES)",
+    )
+    parser.add_argument(
+        "--types", default="",
+        help=f"comma-separated job types (default: all of {sorted(JOB_TYPES)})",
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="exit when no job is ready",
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(processName)s %(levelname)s %(message)s",
+    )
+
+    types = [name.strip() for name in args.types.split(",") if name.strip()]
+    unknown = sorted(set(types) - set(JOB_TYPES))
+    if unknown:
+        parser.error(f"unknown job types: {unknown}")
+
+    if args.processes <= 1:
+        _run_process(types or None, args.once)
+        return
+    processes = [
+        multiprocessing.Process(
+            target=_run_process, args=(types or None, args.once),
+            name=f"worker-{i}",
+        )
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    stopping = threading.Event()
+
+    def _forward(signum, frame):
+        stopping.set()
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, _forward)
+    signal.signal(signal.SIGINT, _forward)
+    # Processos que morreram com erro sao substituidos ate o shutdown
+    while any(process.is_alive() for process in processes):
+        stopping.wait(settings.JOB_POLL_SECONDS)
+        for i, process in enumerate(processes):
+            if stopping.is_set() or process.is_alive() or process.exitcode == 0:
+                continue
+            logger.warning(
+                "%s exited with code %s, restarting", process.name, process.exitcode
+            )
+            processes[i] = multiprocessing.Process(
+                target=_run_process, args=(types or None, args.once),
+                name=process.name,
+            )
+            processes[i].start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Micro-benchmark: custo por linha das listagens do admin.
+
+Compara o caminho antigo (ORM + validacao Pydantic from_attributes + JSON)
+com o caminho rapido (SQLAlchemy Core mappings + orjson).
+
+Uso:
+    python benchmarks/bench_listing.py [linhas] [repeticoes]
+"""
+import os
+import sys
+import time
+import uuid
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson  # noqa: E402
+from sqlalchemy import Column, String, Table, create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.core.database import Base  # noqa: E402
+from app.models import Property  # noqa: E402
+from app.schemas import PropertyListResponse, PropertyResponse  # noqa: E402
+from app.services.listing import fetch_rows, page_statement  # noqa: E402
+
+
+def setup(rows: int):
+    # "buildings" pertence ao schema do portal; so precisamos da FK
+    if "buildings" not in Base.metadata.tables:
+        Table("buildings", Base.metadata, Column("id", String, primary_key=True))
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add_all([
+            Property(
+                id=str(uuid.uuid4()),
+                external_code=f"BENCH-{i}",
+                property_type="Apartamento",
+                purpose="Venda",
+                city="Sao Paulo",
+                neighborhood="Centro",
+                title=f"Apartamento {i}",
+                description="Apartamento amplo com varanda " * 10,
+                sale_price=500000.0 + i,
+                usable_area=80.0,
+            )
+            for i in range(rows)
+        ])
+        db.commit()
+    return Session
+
+
+def orm_path(db, limit):
+    properties = db.query(Property).order_by(
+        Property.created_at.desc()
+    ).limit(limit).all()
+    return PropertyListResponse(
+        total=len(properties), properties=properties
+    ).model_dump_json().encode()
+
+
+def core_path(db, limit):
+    stmt = page_statement(
+        Property, PropertyResponse,
+        order_by=Property.created_at.desc(), limit=limit,
+    )
+    rows = fetch_rows(db, stmt)
+    return orjson.dumps({"total": len(rows), "properties": rows})
+
+
+def bench(fn, Session, limit, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        with Session() as db:
+            start = time.perf_counter()
+            fn(db, limit)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    Session = setup(rows)
+
+    with Session() as db:
+        assert orjson.loads(orm_path(db, rows)) == orjson.loads(core_path(db, rows))
+
+    orm = bench(orm_path, Session, rows, repeat)
+    core = bench(core_path, Session, rows, repeat)
+    print(f"linhas: {rows}, repeticoes: {repeat}")
+    print(f"ORM + Pydantic : {orm * 1e6 / rows:8.1f} us/linha")
+    print(f"Core + orjson  : {core * 1e6 / rows:8.1f} us/linha")
+    print(f"speedup        : {orm / core:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
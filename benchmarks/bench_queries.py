@@ -0,0 +1,139 @@
+"""
+Micro-benchmark: CPU por requisicao das consultas quentes do admin.
+
+Compara o caminho antigo (db.query montado a cada chamada, seis count()
+separados no dashboard) com as consultas pre-montadas (USER_BY_ID e as
+constantes do dashboard), com o cache de compilacao do SQLAlchemy ligado
+e desligado (query_cache_size=0).
+
+Uso:
+    python benchmarks/bench_queries.py [repeticoes]
+"""
+import os
+import sys
+import time
+import uuid
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("SECRET_KEY", "bench")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import Column, String, Table, create_engine, func  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.api.admin import (  # noqa: E402
+    CONTACTS_BY_STATUS,
+    DASHBOARD_TOTALS,
+    PROPERTIES_BY_PURPOSE,
+    PROPERTIES_BY_TYPE,
+    RECENT_CONTACTS,
+    TOP_PROPERTIES,
+)
+from app.core.database import Base  # noqa: E402
+from app.core.security import USER_BY_ID  # noqa: E402
+from app.models import Broker, Contact, Evaluation, Property, User  # noqa: E402
+from app.models.user import UserRole  # noqa: E402
+
+
+def setup(query_cache_size: int):
+    # "buildings" pertence ao schema do portal; so precisamos da FK
+    if "buildings" not in Base.metadata.tables:
+        Table("buildings", Base.metadata, Column("id", String, primary_key=True))
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        query_cache_size=query_cache_size,
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    user_id = str(uuid.uuid4())
+    with Session() as db:
+        db.add(User(
+            id=user_id, email="admin@bench.com", name="Admin",
+            password="x", role=UserRole.ADMIN,
+        ))
+        db.add_all([
+            Property(
+                id=str(uuid.uuid4()),
+                external_code=f"BENCH-{i}",
+                property_type=("Apartamento", "Casa")[i % 2],
+                purpose="Venda",
+                city="Sao Paulo",
+                sale_price=500000.0 + i,
+            )
+            for i in range(100)
+        ])
+        db.commit()
+    return Session, user_id
+
+
+def user_legacy(db, user_id):
+    db.query(User).filter(User.id == user_id).first()
+
+
+def user_cached(db, user_id):
+    db.execute(USER_BY_ID, {"user_id": user_id}).scalar_one_or_none()
+
+
+def dashboard_legacy(db, user_id):
+    db.query(Property).count()
+    db.query(Property).filter(Property.is_active == True).count()  # noqa: E712
+    db.query(Contact).count()
+    db.query(User).count()
+    db.query(Broker).count()
+    db.query(Evaluation).count()
+    db.query(
+        Property.property_type, func.count(Property.id)
+    ).group_by(Property.property_type).all()
+    db.query(
+        Property.purpose, func.count(Property.id)
+    ).group_by(Property.purpose).all()
+    db.query(
+        Contact.status, func.count(Contact.id)
+    ).group_by(Contact.status).all()
+    db.query(Contact).order_by(Contact.created_at.desc()).limit(10).all()
+    db.query(Property).filter(
+        Property.is_active == True  # noqa: E712
+    ).order_by(Property.view_count.desc()).limit(5).all()
+
+
+def dashboard_cached(db, user_id):
+    db.execute(DASHBOARD_TOTALS).one()
+    db.execute(PROPERTIES_BY_TYPE).all()
+    db.execute(PROPERTIES_BY_PURPOSE).all()
+    db.execute(CONTACTS_BY_STATUS).all()
+    db.scalars(RECENT_CONTACTS).all()
+    db.scalars(TOP_PROPERTIES).all()
+
+
+def bench(fn, Session, user_id, repeat):
+    with Session() as db:
+        fn(db, user_id)  # aquece o cache de compilacao
+        start = time.process_time()
+        for _ in range(repeat):
+            fn(db, user_id)
+        return (time.process_time() - start) / repeat
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print(f"repeticoes: {repeat} (CPU por requisicao)")
+    for cache_size in (0, 1200):
+        Session, user_id = setup(cache_size)
+        print(f"query_cache_size={cache_size}")
+        for name, legacy, cached in (
+            ("usuario por id", user_legacy, user_cached),
+            ("dashboard", dashboard_legacy, dashboard_cached),
+        ):
+            old = bench(legacy, Session, user_id, repeat)
+            new = bench(cached, Session, user_id, repeat)
+            print(
+                f"  {name:<15} antigo {old * 1e6:8.1f} us | "
+                f"pre-montado {new * 1e6:8.1f} us | {old / new:5.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark de startup: tempo de import da aplicacao, startup (lifespan) e
+latencia da primeira requisicao, cada medicao em um interpretador novo.
+
+Compara os modos de DB_STARTUP_MODE (create_all no boot x verificacao da
+revisao do Alembic).
+
+Uso:
+    python benchmarks/bench_startup.py [repeticoes] [database_url]
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+import app.main
+print(time.perf_counter() - start)
+"""
+
+STARTUP_SCRIPT = """
+import json
+import time
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, String, Table
+from app.core.database import Base
+from app.main import app
+if "buildings" not in Base.metadata.tables:
+    Table("buildings", Base.metadata, Column("id", String, primary_key=True))
+imported = time.perf_counter()
+with TestClient(app) as client:
+    started = time.perf_counter()
+    client.get("/health")
+    first = time.perf_counter()
+    client.get("/health")
+    second = time.perf_counter()
+print(json.dumps({
+    "startup": started - imported,
+    "first_request": first - started,
+    "second_request": second - first,
+}))
+"""
+
+SETUP_SCRIPT = """
+from sqlalchemy import Column, String, Table
+from app.core.database import Base, engine, init_db
+# "buildings" pertence ao schema do portal; so precisamos da FK
+if "buildings" not in Base.metadata.tables:
+    Table("buildings", Base.metadata, Column("id", String, primary_key=True))
+init_db()
+"""
+
+
+def run(script: str, env: dict) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return result.stdout.strip()
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    database_url = sys.argv[2] if len(sys.argv) > 2 else "sqlite:///./bench.db"
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "bench"),
+        "PYTHONPATH": ROOT,
+    }
+    run(SETUP_SCRIPT, env)
+
+    imports = [float(run(IMPORT_SCRIPT, env)) for _ in range(repeat)]
+    print(f"repeticoes: {repeat}, banco: {database_url}")
+    print(f"import app.main      : {min(imports) * 1000:8.1f} ms")
+
+    for mode in ("create_all", "check", "off"):
+        samples = [
+            json.loads(run(STARTUP_SCRIPT, {**env, "DB_STARTUP_MODE": mode}))
+            for _ in range(repeat)
+        ]
+        best = {
+            key: min(s[key] for s in samples) * 1000 for key in samples[0]
+        }
+        print(
+            f"{mode:<10} startup {best['startup']:7.1f} ms | "
+            f"1a req {best['first_request']:6.1f} ms | "
+            f"2a req {best['second_request']:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 
-from app.core.database import Base, get_db
+from app.core.database import Base, get_db, get_long_db
+from app.core.replicas import get_long_read_db, get_read_db
 from app.core.security import get_password_hash, create_access_token
 from app.models.user import User, UserRole
 from app.models.property import Property
@@ -43,14 +44,17 @@ def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
+app.dependency_overrides[get_long_db] = override_get_db
+app.dependency_overrides[get_long_read_db] = override_get_db
 
 
 @pytest.fixture(autouse=True)
 def setup_database():
     """Create tables before each test, drop after."""
     # Reset rate limiter between tests
-    from app.api.auth import _login_attempts
-    _login_attempts.clear()
+    from app.api.auth import rate_limit_backend
+    rate_limit_backend.reset()
 
     Base.metadata.create_all(bind=engine)
     yield
@@ -130,6 +130,19 @@ class TestProperties:
         data = r.json()
         assert data["total"] >= 1
 
+    def test_list_properties_response_shape(
+        self, client, auth_headers, sample_property
+    ):
+        from app.schemas import PropertyResponse
+        r = client.get(
+            "/api/admin/properties", headers=auth_headers
+        )
+        assert r.status_code == 200
+        prop = r.json()["properties"][0]
+        assert set(prop) == set(PropertyResponse.model_fields)
+        assert prop["external_code"] == "TEST-001"
+        assert prop["view_count"] == 100
+
     def test_list_properties_filter_active(
         self, client, auth_headers, sample_property
     ):
@@ -185,6 +198,8 @@ class TestContacts:
         )
         assert r.status_code == 200
         assert r.json()["total"] >= 1
+        assert r.json()["contacts"][0]["status"] == "NEW"
+        assert r.json()["contacts"][0]["type"] == "INFO"
 
     def test_update_contact_status_valid(
         self, client, auth_headers, sample_contact
@@ -0,0 +1,72 @@
+"""Tests for evaluation analytics."""
+import uuid
+from datetime import datetime, timedelta
+from app.models.evaluation import Evaluation
+
+
+def _evaluation(db, created_at, price=None, city="Campinas",
+                property_type="Apartamento", confidence=None):
+    evaluation = Evaluation(
+        id=str(uuid.uuid4()),
+        city=city,
+        property_type=property_type,
+        purpose="Venda",
+        usable_area=80,
+        estimated_price=price,
+        confidence=confidence,
+        created_at=created_at,
+    )
+    db.add(evaluation)
+    db.commit()
+    return evaluation
+
+
+class TestEvaluationAnalytics:
+    def test_volume_prices_and_confidence(self, client, auth_headers, db):
+        today = datetime.utcnow().replace(hour=12)
+        yesterday = today - timedelta(days=1)
+        for price in (100_000, 200_000, 300_000):
+            _evaluation(db, today, price, confidence="high")
+        _evaluation(db, yesterday, 400_000, city="Santos", confidence="low")
+        _evaluation(db, yesterday)
+        _evaluation(db, today - timedelta(days=200), 1_000_000)
+
+        response = client.get(
+            "/api/admin/evaluations/analytics", headers=auth_headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 5
+
+        assert data["volume"] == [
+            {"period": yesterday.date().isoformat(), "count": 2, "median": 400_000},
+            {"period": today.date().isoformat(), "count": 3, "median": 200_000},
+        ]
+
+        campinas = data["prices"][0]
+        assert campinas["city"] == "Campinas"
+        assert campinas["count"] == 4
+        assert campinas["p25"] == 150_000
+        assert campinas["median"] == 200_000
+        assert campinas["p75"] == 250_000
+
+        confidence = {c["confidence"]: c["count"] for c in data["confidence"]}
+        assert confidence == {"high": 3, "low": 1, None: 1}
+
+    def test_weekly_buckets_start_on_monday(self, client, auth_headers, db):
+        today = datetime.utcnow()
+        _evaluation(db, today)
+        monday = (today - timedelta(days=today.weekday())).date()
+
+        response = client.get(
+            "/api/admin/evaluations/analytics?interval=week",
+            headers=auth_headers,
+        )
+        assert response.json()["volume"][0]["period"] == monday.isoformat()
+
+    def test_invalid_interval(self, client, auth_headers):
+        response = client.get(
+            "/api/admin/evaluations/analytics?interval=year",
+            headers=auth_headers,
+        )
+        assert response.status_code == 422
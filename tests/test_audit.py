@@ -0,0 +1,138 @@
+"""Tests for the admin audit trail."""
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from app.core.background import PeriodicTask
+from app.models.audit_event import AuditEvent
+from app.services.audit import (
+    AuditBuffer, audit_buffer, flush_audit, list_audit_events, record_event,
+)
+
+
+@pytest.fixture
+def buffer():
+    # Eventos enfileirados por outros testes nao chegam a ser gravados
+    audit_buffer.take(len(audit_buffer))
+    yield audit_buffer
+    audit_buffer.take(len(audit_buffer))
+
+
+class TestBuffer:
+    def test_bounded(self, admin_user):
+        buffer = AuditBuffer(maxsize=2)
+        results = [record_event(admin_user, "x.y", buffer=buffer) for _ in range(3)]
+        assert results == [True, True, False]
+        assert (len(buffer), buffer.dropped) == (2, 1)
+
+    def test_flush_in_batches(self, db, admin_user, monkeypatch):
+        monkeypatch.setattr("app.services.audit.settings.AUDIT_FLUSH_BATCH", 2)
+        buffer = AuditBuffer()
+        for i in range(5):
+            record_event(admin_user, "user.delete", "user", str(i), {"n": i}, buffer=buffer)
+        assert flush_audit(db, buffer) == 5
+        assert len(buffer) == 0
+
+        event = db.query(AuditEvent).filter(AuditEvent.entity_id == "3").one()
+        assert (event.actor_id, event.actor_email) == (admin_user.id, "admin@test.com")
+        assert event.details == '{"n":3}'
+
+    def test_failed_flush_requeues(self, db, admin_user, monkeypatch):
+        buffer = AuditBuffer(maxsize=3)
+        for action in ("a", "b"):
+            record_event(admin_user, action, buffer=buffer)
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("db down")
+
+        monkeypatch.setattr(db, "execute", fail)
+        with pytest.raises(RuntimeError):
+            flush_audit(db, buffer)
+        assert [e["action"] for e in buffer.take(10)] == ["a", "b"]
+
+    def test_periodic_task_flushes_on_stop(self, db, admin_user):
+        buffer = AuditBuffer()
+        record_event(admin_user, "user.delete", buffer=buffer)
+        task = PeriodicTask("audit", 3600, lambda: flush_audit(db, buffer))
+
+        async def run():
+            task.start()
+            await asyncio.sleep(0)
+            await task.stop()
+
+        asyncio.run(run())
+        assert db.query(AuditEvent).count() == 1
+
+
+class TestListing:
+    def test_cursor_pages_and_filters(self, db, admin_user):
+        buffer = AuditBuffer()
+        for i in range(5):
+            record_event(
+                admin_user, "property.toggle_active" if i % 2 else "broker.toggle_active",
+                "property" if i % 2 else "broker", str(i), buffer=buffer,
+            )
+        flush_audit(db, buffer)
+
+        page = list_audit_events(db, limit=2)
+        seen = [e["entity_id"] for e in page["events"]]
+        while page["next_cursor"]:
+            page = list_audit_events(db, cursor=page["next_cursor"], limit=2)
+            seen += [e["entity_id"] for e in page["events"]]
+        assert seen == ["4", "3", "2", "1", "0"]
+
+        page = list_audit_events(db, entity_type="property")
+        assert [e["entity_id"] for e in page["events"]] == ["3", "1"]
+        assert page["next_cursor"] is None
+        future = datetime.utcnow() + timedelta(hours=1)
+        assert list_audit_events(db, since=future)["events"] == []
+
+        with pytest.raises(ValueError):
+            list_audit_events(db, cursor="not-a-cursor")
+
+
+class TestAuditEndpoints:
+    def test_mutations_are_audited(self, client, auth_headers, db, buffer,
+                                   admin_user, regular_user, sample_property,
+                                   sample_contact):
+        client.patch(
+            f"/api/admin/properties/{sample_property.id}/toggle-active",
+            headers=auth_headers,
+        )
+        client.patch(
+            f"/api/admin/contacts/{sample_contact.id}/status",
+            headers=auth_headers, json={"status": "contacted"},
+        )
+        client.delete(f"/api/admin/users/{regular_user.id}", headers=auth_headers)
+        client.patch(
+            "/api/admin/properties/bulk", headers=auth_headers,
+            json={"ids": [sample_property.id], "is_featured": True},
+        )
+        # Nada e gravado antes do flush
+        assert db.query(AuditEvent).count() == 0
+        assert flush_audit(db, buffer) == 4
+
+        r = client.get("/api/admin/audit", headers=auth_headers)
+        assert r.status_code == 200
+        events = r.json()["events"]
+        assert [e["action"] for e in events] == [
+            "property.bulk_update", "user.delete",
+            "contact.update_status", "property.toggle_active",
+        ]
+        assert all(e["actor_id"] == admin_user.id for e in events)
+        assert events[0]["details"]["updated"] == 1
+        assert events[1]["details"] == {"email": "user@test.com", "role": "USER"}
+        assert events[2]["details"] == {"from": "NEW", "to": "CONTACTED"}
+        assert events[3]["details"] == {"is_active": False}
+
+        r = client.get(
+            f"/api/admin/audit?entity_id={sample_property.id}&limit=1",
+            headers=auth_headers,
+        )
+        assert [e["action"] for e in r.json()["events"]] == ["property.toggle_active"]
+        assert r.json()["next_cursor"] is None
+
+        r = client.get("/api/admin/audit?cursor=%%%", headers=auth_headers)
+        assert r.status_code == 400
+
+    def test_requires_admin(self, client):
+        assert client.get("/api/admin/audit").status_code in (401, 403)
@@ -0,0 +1,111 @@
+"""Tests for bulk admin actions."""
+import uuid
+from app.models.broker import Broker
+from app.models.contact import Contact, ContactStatus
+from app.models.property import Property
+from app.services import bulk
+
+
+def _property(db, city="Campinas", **kwargs):
+    prop = Property(
+        id=str(uuid.uuid4()),
+        external_code=str(uuid.uuid4()),
+        property_type="Apartamento",
+        purpose="Venda",
+        city=city,
+        **kwargs,
+    )
+    db.add(prop)
+    db.commit()
+    return prop
+
+
+class TestBulkProperties:
+    def test_update_by_ids_reports_per_id(self, client, auth_headers, db):
+        a = _property(db)
+        b = _property(db)
+        response = client.patch(
+            "/api/admin/properties/bulk",
+            json={"ids": [a.id, "missing", b.id, a.id], "is_active": False},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["requested"], data["updated"], data["not_found"]) == (3, 2, 1)
+        assert [r["status"] for r in data["results"]] == [
+            "updated", "not_found", "updated",
+        ]
+        assert data["results"][0]["values"]["is_active"] is False
+
+        db.expire_all()
+        assert not db.get(Property, a.id).is_active
+        assert not db.get(Property, b.id).is_active
+
+    def test_update_by_filter_in_chunks(self, client, auth_headers, db,
+                                        monkeypatch):
+        monkeypatch.setattr(bulk, "BULK_CHUNK", 2)
+        for _ in range(5):
+            _property(db, city="Santos")
+        other = _property(db, city="Campinas")
+
+        response = client.patch(
+            "/api/admin/properties/bulk",
+            json={"filter": {"city": "santos"}, "is_featured": True},
+            headers=auth_headers,
+        )
+        assert response.json()["updated"] == 5
+
+        db.expire_all()
+        assert db.query(Property).filter(Property.is_featured == True).count() == 5  # noqa: E712
+        assert not db.get(Property, other.id).is_featured
+
+    def test_requires_ids_or_filter(self, client, auth_headers):
+        response = client.patch(
+            "/api/admin/properties/bulk",
+            json={"is_active": True},
+            headers=auth_headers,
+        )
+        assert response.status_code == 400
+
+    def test_empty_filter_rejected(self, client, auth_headers, db, sample_broker):
+        for body in ({"filter": {}}, {"filter": {"city": ""}}):
+            response = client.patch(
+                "/api/admin/brokers/bulk",
+                json={**body, "is_active": False},
+                headers=auth_headers,
+            )
+            assert response.status_code == 400
+        db.expire_all()
+        assert db.get(Broker, sample_broker.id).is_active
+
+
+class TestBulkBrokersAndContacts:
+    def test_brokers(self, client, auth_headers, db, sample_broker):
+        response = client.patch(
+            "/api/admin/brokers/bulk",
+            json={"ids": [sample_broker.id], "is_active": False},
+            headers=auth_headers,
+        )
+        assert response.json()["updated"] == 1
+        db.expire_all()
+        assert not db.get(Broker, sample_broker.id).is_active
+
+    def test_contacts_status(self, client, auth_headers, db, sample_contact):
+        response = client.patch(
+            "/api/admin/contacts/bulk",
+            json={"filter": {"status": "new"}, "status": "contacted"},
+            headers=auth_headers,
+        )
+        data = response.json()
+        assert data["updated"] == 1
+        assert data["results"][0]["values"] == {"status": "CONTACTED"}
+        db.expire_all()
+        assert db.get(Contact, sample_contact.id).status == ContactStatus.CONTACTED
+
+    def test_contacts_invalid_status(self, client, auth_headers, sample_contact):
+        response = client.patch(
+            "/api/admin/contacts/bulk",
+            json={"ids": [sample_contact.id], "status": "bogus"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 400
@@ -0,0 +1,138 @@
+"""Tests for cross-feed duplicate listing detection."""
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from app.models.property import Photo, Property
+from app.models.property_duplicate import PropertyDuplicate
+from app.services.dedup import (
+    address_similarity, build_clusters, candidate_pairs, detect_duplicates,
+    photo_keys,
+)
+from app.services.geo import geohash
+
+BASE_TIME = datetime(2026, 1, 1)
+
+
+def _property(db, code, source, order=0, photos=(), **fields):
+    values = dict(
+        id=str(uuid.uuid4()),
+        external_code=code,
+        xml_source=source,
+        property_type="Apartamento",
+        purpose="Venda",
+        city="Sao Paulo",
+        neighborhood="Pinheiros",
+        address="Rua dos Pinheiros, 100",
+        usable_area=72.0,
+        bedrooms=2,
+        sale_price=800000.0,
+        is_active=True,
+        created_at=BASE_TIME + timedelta(days=order),
+    )
+    values.update(fields)
+    prop = Property(**values)
+    db.add(prop)
+    for i, url in enumerate(photos):
+        db.add(Photo(
+            id=str(uuid.uuid4()), property_id=prop.id,
+            file_name=url.rsplit("/", 1)[-1], url=url, order=i,
+        ))
+    db.commit()
+    return prop
+
+
+@pytest.fixture
+def listings(db):
+    original = _property(
+        db, "VG-1", "ValueGaia", 0,
+        photos=["https://cdn.valuegaia.com/a/foto1.jpg", "https://cdn.valuegaia.com/a/foto2.jpg"],
+    )
+    copy = _property(
+        db, "CNM-9", "ChavesNaMao", 1,
+        address="R. dos Pinheiros 100", usable_area=73.0, sale_price=790000.0,
+        photos=["https://img.chavesnamao.com.br/x/FOTO1.jpg?w=800"],
+    )
+    same_feed = _property(db, "VG-2", "ValueGaia", 2)
+    other_unit = _property(
+        db, "CNM-10", "ChavesNaMao", 3, sale_price=400000.0,
+    )
+    return original, copy, same_feed, other_unit
+
+
+class TestBlocking:
+    def test_pairs_only_across_feeds_and_area_buckets(self, db, listings):
+        original, copy, same_feed, other_unit = listings
+        rows = db.query(Property).order_by(Property.created_at).all()
+        pairs, skipped = candidate_pairs(rows)
+        # 72 m2 e 73 m2 em faixas vizinhas continuam candidatos; pares do
+        # mesmo feed (VG-1 x VG-2) nao
+        assert pairs == {(0, 1), (0, 3), (1, 2), (2, 3)}
+        assert skipped == 0
+
+    def test_geohash_block(self, db):
+        a = _property(db, "A", "ValueGaia", neighborhood=None, latitude=-23.5617, longitude=-46.6910)
+        b = _property(db, "B", "ChavesNaMao", neighborhood=None, latitude=-23.5618, longitude=-46.6911)
+        rows = [a, b]
+        assert geohash(a.latitude, a.longitude) == geohash(b.latitude, b.longitude)
+        assert candidate_pairs(rows)[0] == {(0, 1)}
+
+
+class TestScoring:
+    def test_helpers(self):
+        assert address_similarity("Rua dos Pinheiros, 100", "rua dos pinheiros 100") == 1.0
+        assert address_similarity(None, "x") is None
+        assert photo_keys(["https://a.com/x/Foto1.JPG?w=1", None]) == {"foto1.jpg"}
+        assert build_clusters(5, [(0, 1, 0.9), (1, 3, 0.9)]) == {0: 0, 1: 0, 3: 0}
+
+
+class TestDetect:
+    def test_detect_and_store(self, db, listings):
+        original, copy, same_feed, other_unit = listings
+        result = detect_duplicates(db)
+        assert result["properties"] == 4
+        assert result["candidate_pairs"] == 4
+        # VG-2 tambem e a mesma unidade de CNM-9 (mesmo endereco e preco)
+        assert (result["clusters"], result["duplicates"]) == (1, 2)
+
+        rows = {d.property_id: d for d in db.query(PropertyDuplicate).all()}
+        assert set(rows) == {original.id, copy.id, same_feed.id}
+        assert {d.cluster_id for d in rows.values()} == {original.id}
+        assert all(d.score >= 0.8 for d in rows.values())
+
+    def test_price_alone_is_not_enough(self, db):
+        # Duas unidades parecidas, sem endereco nem fotos: nao sao duplicadas
+        _property(db, "VG-7", "ValueGaia", 0, address=None)
+        _property(db, "CNM-7", "ChavesNaMao", 1, address=None, sale_price=790000.0)
+        result = detect_duplicates(db)
+        assert result["candidate_pairs"] == 1
+        assert (result["matched_pairs"], result["clusters"]) == (0, 0)
+        assert db.query(PropertyDuplicate).count() == 0
+
+    def test_dry_run(self, db, listings):
+        assert detect_duplicates(db, dry_run=True)["clusters"] == 1
+        assert db.query(PropertyDuplicate).count() == 0
+
+
+class TestDuplicateEndpoints:
+    def test_detect_list_and_collapse(self, client, auth_headers, listings):
+        original, copy, same_feed, other_unit = listings
+        r = client.post("/api/admin/properties/duplicates/detect", headers=auth_headers)
+        assert r.status_code == 200
+        assert r.json()["duplicates"] == 2
+
+        r = client.get("/api/admin/properties/duplicates", headers=auth_headers)
+        assert r.status_code == 200
+        data = r.json()
+        assert data["total"] == 1
+        members = data["clusters"][0]["properties"]
+        assert [m["external_code"] for m in members] == ["VG-1", "CNM-9", "VG-2"]
+
+        r = client.get(
+            "/api/admin/properties?collapse_duplicates=true", headers=auth_headers
+        )
+        assert {p["id"] for p in r.json()["properties"]} == {original.id, other_unit.id}
+        r = client.get("/api/admin/properties", headers=auth_headers)
+        assert r.json()["total"] == 4
+
+        r = client.get("/api/admin/dashboard", headers=auth_headers)
+        assert r.json()["overview"]["duplicate_properties"] == 2
@@ -0,0 +1,90 @@
+"""Tests for the admin map (bbox/radius clustering)."""
+import uuid
+from app.models.property import Property
+
+
+def _located_property(db, lat, lon, price=None, is_active=True):
+    prop = Property(
+        id=str(uuid.uuid4()),
+        external_code=str(uuid.uuid4()),
+        property_type="Apartamento",
+        purpose="Venda",
+        latitude=lat, longitude=lon,
+        sale_price=price, is_active=is_active,
+    )
+    db.add(prop)
+    db.commit()
+    return prop
+
+
+class TestPropertiesGeo:
+    def _seed(self, db):
+        # Dois grupos em Sao Paulo, um imovel no Rio
+        for i in range(10):
+            _located_property(db, -23.550 + i * 0.0001, -46.630, 500000 + i)
+        for i in range(5):
+            _located_property(db, -23.600 + i * 0.0001, -46.700)
+        rio = _located_property(db, -22.906, -43.172, 900000)
+        _located_property(db, -23.55, -46.63, is_active=False)
+        return rio
+
+    def test_bbox_clusters(self, client, auth_headers, db):
+        self._seed(db)
+        r = client.get(
+            "/api/admin/properties/geo?min_lat=-24&min_lon=-47"
+            "&max_lat=-23&max_lon=-46&zoom=12",
+            headers=auth_headers,
+        )
+        assert r.status_code == 200
+        data = r.json()
+        assert data["total"] == 15
+        assert sorted(c["count"] for c in data["clusters"]) == [5, 10]
+        big = max(data["clusters"], key=lambda c: c["count"])
+        assert big["min_price"] == 500000
+        assert big["property_id"] is None
+
+    def test_low_zoom_merges_clusters(self, client, auth_headers, db):
+        self._seed(db)
+        r = client.get(
+            "/api/admin/properties/geo?min_lat=-30&min_lon=-50"
+            "&max_lat=-20&max_lon=-40&zoom=3",
+            headers=auth_headers,
+        )
+        data = r.json()
+        assert data["total"] == 16
+        assert len(data["clusters"]) < 3
+
+    def test_radius_single_marker(self, client, auth_headers, db):
+        rio = self._seed(db)
+        r = client.get(
+            "/api/admin/properties/geo?lat=-22.9&lon=-43.17"
+            "&radius_km=5&zoom=15",
+            headers=auth_headers,
+        )
+        data = r.json()
+        assert data["total"] == 1
+        assert data["clusters"][0]["property_id"] == rio.id
+
+    def test_truncated_counts_whole_area(
+        self, client, auth_headers, db, monkeypatch
+    ):
+        self._seed(db)
+        url = (
+            "/api/admin/properties/geo?min_lat=-24&min_lon=-47"
+            "&max_lat=-23&max_lon=-46&zoom=12"
+        )
+        # Exatamente MAX_CLUSTERS clusters: nada foi cortado
+        monkeypatch.setattr("app.services.geo.MAX_CLUSTERS", 2)
+        data = client.get(url, headers=auth_headers).json()
+        assert (data["truncated"], data["total"]) == (False, 15)
+
+        monkeypatch.setattr("app.services.geo.MAX_CLUSTERS", 1)
+        data = client.get(url, headers=auth_headers).json()
+        assert [c["count"] for c in data["clusters"]] == [10]
+        assert (data["truncated"], data["total"]) == (True, 15)
+
+    def test_missing_area(self, client, auth_headers):
+        r = client.get(
+            "/api/admin/properties/geo?min_lat=-24", headers=auth_headers
+        )
+        assert r.status_code == 400
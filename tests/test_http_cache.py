@@ -0,0 +1,163 @@
+"""Tests for ETag/304 and response compression."""
+import uuid
+from sqlalchemy import text
+from app.models.data_version import DataVersion
+from app.models.property import Property
+from app.models.property_event import PropertyEvent
+from app.services.counters import flush_counters
+
+
+class TestETag:
+    def test_properties_etag_304(
+        self, client, auth_headers, sample_property
+    ):
+        r = client.get("/api/admin/properties", headers=auth_headers)
+        assert r.status_code == 200
+        etag = r.headers["etag"]
+
+        r = client.get(
+            "/api/admin/properties",
+            headers={**auth_headers, "If-None-Match": etag},
+        )
+        assert r.status_code == 304
+        assert r.headers["etag"] == etag
+        assert r.content == b""
+
+    def test_etag_changes_after_update(
+        self, client, auth_headers, sample_property
+    ):
+        r = client.get("/api/admin/properties", headers=auth_headers)
+        etag = r.headers["etag"]
+
+        client.patch(
+            f"/api/admin/properties/{sample_property.id}/toggle-featured",
+            headers=auth_headers,
+        )
+        r = client.get(
+            "/api/admin/properties",
+            headers={**auth_headers, "If-None-Match": etag},
+        )
+        assert r.status_code == 200
+        assert r.headers["etag"] != etag
+
+    def test_etag_changes_after_counter_flush(
+        self, client, auth_headers, db, sample_property
+    ):
+        # A listagem mostra view_count: o flush dos contadores muda o ETag
+        r = client.get("/api/admin/properties", headers=auth_headers)
+        etag, views = r.headers["etag"], r.json()["properties"][0]["view_count"]
+        db.add(PropertyEvent(property_id=sample_property.id, kind="view"))
+        db.commit()
+        flush_counters(db)
+        r = client.get(
+            "/api/admin/properties",
+            headers={**auth_headers, "If-None-Match": etag},
+        )
+        assert r.status_code == 200
+        assert r.json()["properties"][0]["view_count"] == views + 1
+
+    def test_etag_depends_on_query(
+        self, client, auth_headers, sample_property
+    ):
+        r1 = client.get("/api/admin/properties", headers=auth_headers)
+        r2 = client.get(
+            "/api/admin/properties?is_active=true", headers=auth_headers
+        )
+        assert r1.headers["etag"] != r2.headers["etag"]
+
+    def test_dashboard_etag_304(self, client, auth_headers):
+        r = client.get("/api/admin/dashboard", headers=auth_headers)
+        assert r.status_code == 200
+        r = client.get(
+            "/api/admin/dashboard",
+            headers={**auth_headers, "If-None-Match": r.headers["etag"]},
+        )
+        assert r.status_code == 304
+
+    def test_etag_changes_after_delete(
+        self, client, auth_headers, regular_user
+    ):
+        r = client.get("/api/admin/users", headers=auth_headers)
+        etag = r.headers["etag"]
+        client.delete(f"/api/admin/users/{regular_user.id}", headers=auth_headers)
+        r = client.get(
+            "/api/admin/users",
+            headers={**auth_headers, "If-None-Match": etag},
+        )
+        assert r.status_code == 200
+
+    def test_external_write_changes_etag(
+        self, client, auth_headers, db, admin_user
+    ):
+        # Cadastro feito pelo portal: SQL direto, sem a Session da app
+        r = client.get("/api/admin/users", headers=auth_headers)
+        etag = r.headers["etag"]
+        db.execute(text(
+            "INSERT INTO users (id, email, role, is_active, created_at, updated_at) "
+            "VALUES ('portal-1', 'portal@test.com', 'USER', 1, "
+            "CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+        ))
+        db.commit()
+        r = client.get(
+            "/api/admin/users",
+            headers={**auth_headers, "If-None-Match": etag},
+        )
+        assert r.status_code == 200
+        assert r.json()["total"] == 2
+
+    def test_versions_follow_the_transaction(self, db, sample_property):
+        def version():
+            db.expire_all()
+            return db.get(DataVersion, "properties").version
+
+        before = version()
+        db.execute(text("UPDATE properties SET is_featured = 1"))
+        db.rollback()
+        assert version() == before
+
+        db.execute(text("UPDATE properties SET is_featured = 1"))
+        db.commit()
+        assert version() > before
+
+    def test_content_etag_middleware(self, client):
+        r = client.get("/")
+        etag = r.headers["etag"]
+        r = client.get("/", headers={"If-None-Match": f"W/{etag}"})
+        assert r.status_code == 304
+
+
+class TestCompression:
+    def _many_properties(self, db, n=30):
+        db.add_all([
+            Property(
+                id=str(uuid.uuid4()),
+                external_code=f"BULK-{i}",
+                property_type="Apartamento",
+                purpose="Venda",
+                description="Apartamento com varanda gourmet " * 5,
+            )
+            for i in range(n)
+        ])
+        db.commit()
+
+    def test_gzip_large_response(self, client, auth_headers, db):
+        self._many_properties(db)
+        r = client.get(
+            "/api/admin/properties",
+            headers={**auth_headers, "Accept-Encoding": "gzip"},
+        )
+        assert r.status_code == 200
+        assert r.headers["content-encoding"] == "gzip"
+        assert r.json()["total"] == 30
+
+    def test_brotli_preferred(self, client, auth_headers, db):
+        self._many_properties(db)
+        r = client.get(
+            "/api/admin/properties",
+            headers={**auth_headers, "Accept-Encoding": "gzip, br"},
+        )
+        assert r.headers["content-encoding"] == "br"
+
+    def test_small_response_not_compressed(self, client):
+        r = client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in r.headers
@@ -0,0 +1,259 @@
+"""Tests for the feed import hooks (change history, price drops) and import log analytics."""
+import json
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from app.models.favorites import Favorite
+from app.models.import_log import ImportLog
+from app.models.notification import (
+    Notification, NotificationCampaign, NotificationType,
+)
+from app.models.property import Property
+from app.models.property_change import PropertyChange
+from app.services.imports import (
+    find_price_drops, import_change_summary, import_log_analytics,
+    notify_price_drops, process_batch,
+)
+from app.services.notifications import create_campaign, unread_count
+
+
+@pytest.fixture
+def priced(db, regular_user, sample_property):
+    sample_property.sale_price = 500000.0
+    sample_property.rental_price = 3000.0
+    db.add(Favorite(
+        id=str(uuid.uuid4()), user_id=regular_user.id,
+        property_id=sample_property.id,
+    ))
+    db.commit()
+    return sample_property
+
+
+class TestFindPriceDrops:
+    def test_threshold_and_missing_prices(self, db, priced):
+        drops = find_price_drops(db, [
+            {"external_code": "TEST-001", "sale_price": 450000.0, "rental_price": 2950.0},
+            {"external_code": "UNKNOWN", "sale_price": 1.0},
+        ], min_percent=5)
+        assert [(d.field, d.old_price, d.new_price) for d in drops] == [
+            ("sale_price", 500000.0, 450000.0)
+        ]
+        assert drops[0].percent == pytest.approx(10.0)
+
+        # Preco sob consulta (None/0) ou aumento nao sao queda
+        for row in (
+            {"sale_price": None, "rental_price": 0},
+            {"sale_price": 600000.0},
+        ):
+            assert find_price_drops(db, [{"external_code": "TEST-001", **row}]) == []
+
+    def test_inactive_properties_ignored(self, db, priced):
+        priced.is_active = False
+        db.commit()
+        assert find_price_drops(db, [
+            {"external_code": "TEST-001", "sale_price": 1000.0}
+        ]) == []
+
+
+class TestNotifyPriceDrops:
+    def test_notifies_favorites(self, db, priced, regular_user, admin_user):
+        created = notify_price_drops(db, [
+            {"external_code": "TEST-001", "sale_price": 400000.0, "rental_price": 2500.0},
+        ])
+        db.commit()
+        assert created == 1
+
+        notification = db.query(Notification).one()
+        assert notification.user_id == regular_user.id
+        assert notification.type == NotificationType.PRICE_DROP
+        assert notification.property_id == priced.id
+        assert notification.link == f"/imovel/{priced.id}"
+        assert notification.message == (
+            "O imovel 'Apartamento' em Centro, Sao Paulo que voce favoritou "
+            "baixou de preco: venda de R$ 500.000 para R$ 400.000 (-20%), "
+            "aluguel de R$ 3.000 para R$ 2.500 (-17%)."
+        )
+        assert unread_count(db, regular_user.id) == 1
+        assert unread_count(db, admin_user.id) == 0
+
+        campaign = db.query(NotificationCampaign).one()
+        assert (campaign.status, campaign.recipients) == ("completed", 1)
+
+    def test_no_drops(self, db, priced):
+        assert notify_price_drops(db, [
+            {"external_code": "TEST-001", "sale_price": 500000.0},
+        ]) == 0
+        assert db.query(NotificationCampaign).count() == 0
+
+    def test_details_validation(self, db, priced):
+        with pytest.raises(ValueError):
+            create_campaign(
+                db, type="PRICE_DROP", audience="all", title="t", message="m",
+                details={priced.id: "x"},
+            )
+        with pytest.raises(ValueError):
+            create_campaign(
+                db, type="PRICE_DROP", audience="favorites", title="t",
+                message="m", property_ids=[priced.id], details={"other": "x"},
+            )
+
+
+def _import(db, import_log, row):
+    """Lote de uma linha: ganchos e depois o upsert, como o importador"""
+    process_batch(db, [row], import_log.id)
+    db.query(Property).filter(
+        Property.external_code == row["external_code"]
+    ).update({k: v for k, v in row.items() if k != "external_code"})
+    db.commit()
+
+
+@pytest.fixture
+def import_log(db):
+    log = ImportLog(id=str(uuid.uuid4()), status="running", source="ValueGaia")
+    db.add(log)
+    db.commit()
+    return log
+
+
+class TestHistory:
+    def test_process_batch(self, db, priced, import_log, regular_user):
+        result = process_batch(db, [
+            # Sem mudanca nos campos enviados: sem historico
+            {"external_code": "TEST-001", "sale_price": 500000.0, "bedrooms": 0},
+            {"external_code": "NEW-1", "sale_price": 1.0},
+        ], import_log.id)
+        assert result == {"changes": 0, "price_drop_notifications": 0}
+
+        result = process_batch(db, [
+            {"external_code": "TEST-001", "sale_price": 450000.0, "title": "Novo"},
+        ], import_log.id)
+        db.commit()
+        assert result == {"changes": 1, "price_drop_notifications": 1}
+
+        change = db.query(PropertyChange).one()
+        assert change.property_id == priced.id
+        assert json.loads(change.changes) == {
+            "sale_price": [500000.0, 450000.0], "title": [None, "Novo"],
+        }
+        db.refresh(import_log)
+        assert import_log.changes_count == 1
+
+    def test_summary(self, db, priced, import_log):
+        process_batch(db, [
+            {"external_code": "TEST-001", "rental_price": 3500.0, "is_active": False},
+        ], import_log.id)
+        db.commit()
+        summary = import_change_summary(db, import_log.id)
+        assert summary["properties_changed"] == 1
+        assert summary["by_field"] == {"rental_price": 1, "is_active": 1}
+        assert (summary["price_increases"], summary["deactivated"]) == (1, 1)
+
+
+class TestHistoryEndpoints:
+    def test_history_and_import_summary(self, client, auth_headers, db, priced, import_log):
+        for price in (480000.0, 460000.0):
+            _import(db, import_log, {"external_code": "TEST-001", "sale_price": price})
+        _import(db, import_log, {"external_code": "TEST-001", "title": "T"})
+
+        r = client.get(f"/api/admin/properties/{priced.id}/history", headers=auth_headers)
+        assert r.status_code == 200
+        assert r.json()["total"] == 3
+
+        r = client.get(
+            f"/api/admin/properties/{priced.id}/history?field=sale_price",
+            headers=auth_headers,
+        )
+        assert [c["changes"]["sale_price"] for c in r.json()["changes"]] == [
+            [480000.0, 460000.0], [500000.0, 480000.0],
+        ]
+        r = client.get(
+            f"/api/admin/properties/{priced.id}/history?field=nope", headers=auth_headers
+        )
+        assert r.status_code == 400
+
+        r = client.get(f"/api/admin/import-logs/{import_log.id}/changes", headers=auth_headers)
+        assert r.status_code == 200
+        data = r.json()
+        assert data["import_log"]["changes_count"] == 3
+        assert data["by_field"] == {"sale_price": 2, "title": 1}
+        assert data["price_drops"] == 2
+
+        r = client.get("/api/admin/import-logs/nope/changes", headers=auth_headers)
+        assert r.status_code == 404
+
+
+@pytest.fixture
+def import_logs(db):
+    now = datetime.utcnow()
+    logs = [
+        # (source, dias atras, status, segundos, imoveis)
+        ("ValueGaia", 0.1, "success", 200, 2000),
+        ("ValueGaia", 3, "success", 100, 2000),
+        ("ValueGaia", 5, "error", 50, 0),
+        ("ValueGaia", 20, "success", 100, 1000),
+        ("ChavesNaMao", 0.2, "running", None, 0),
+        ("ChavesNaMao", 40, "success", 10, 10),
+    ]
+    for source, days_ago, status, seconds, count in logs:
+        started = now - timedelta(days=days_ago)
+        db.add(ImportLog(
+            id=str(uuid.uuid4()), source=source, status=status,
+            started_at=started, properties_count=count,
+            completed_at=started + timedelta(seconds=seconds) if seconds else None,
+        ))
+    db.commit()
+
+
+class TestImportLogAnalytics:
+    def test_windows_per_source(self, db, import_logs):
+        result = import_log_analytics(db, windows=[30, 1, 7])
+        assert result["windows"] == [1, 7, 30]
+        by_source = {s["source"]: s for s in result["sources"]}
+
+        day, week, month = by_source["ValueGaia"]["windows"]
+        assert (day["runs"], week["runs"], month["runs"]) == (1, 3, 4)
+        assert week["success_rate"] == pytest.approx(2 / 3, abs=1e-3)
+        assert week["errors_per_day"] == pytest.approx(1 / 7, abs=1e-3)
+        assert day["avg_duration_seconds"] == pytest.approx(200, abs=0.5)
+        assert month["avg_duration_seconds"] == pytest.approx(112.5, abs=0.5)
+        assert month["max_duration_seconds"] == pytest.approx(200, abs=0.5)
+        # 5000 imoveis em 400 s de importacoes com sucesso
+        assert month["rows"] == 5000
+        assert month["rows_per_second"] == pytest.approx(12.5, abs=0.05)
+        assert by_source["ValueGaia"]["duration_change_percent"] == pytest.approx(77.8, abs=0.2)
+
+        # Importacao de 40 dias atras fica fora; a em andamento nao tem duracao
+        day, week, month = by_source["ChavesNaMao"]["windows"]
+        assert (month["runs"], month["running"]) == (1, 1)
+        assert month["success_rate"] is None
+        assert month["avg_duration_seconds"] is None
+
+    def test_source_filter_and_validation(self, db, import_logs):
+        result = import_log_analytics(db, windows=[7], source="ChavesNaMao")
+        assert [s["source"] for s in result["sources"]] == ["ChavesNaMao"]
+        for windows in ([0], [400], list(range(1, 10))):
+            with pytest.raises(ValueError):
+                import_log_analytics(db, windows=windows)
+
+    def test_endpoints(self, client, auth_headers, import_logs):
+        r = client.get("/api/admin/import-logs/analytics", headers=auth_headers)
+        assert r.status_code == 200
+        assert r.json()["windows"] == [1, 7, 30]
+        assert len(r.json()["sources"]) == 2
+        r = client.get(
+            "/api/admin/import-logs/analytics?windows=7,x", headers=auth_headers
+        )
+        assert r.status_code == 400
+
+        r = client.get(
+            "/api/admin/import-logs?source=ValueGaia&limit=2", headers=auth_headers
+        )
+        data = r.json()
+        assert data["total"] == 4
+        assert [log["status"] for log in data["logs"]] == ["success", "success"]
+        r = client.get(
+            "/api/admin/import-logs?status=error", headers=auth_headers
+        )
+        assert [log["source"] for log in r.json()["logs"]] == ["ValueGaia"]
+        r = client.get("/api/admin/import-logs?status=nope", headers=auth_headers)
+        assert r.status_code == 400
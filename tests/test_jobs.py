@@ -0,0 +1,210 @@
+"""Tests for the background job queue and worker loop."""
+import json
+import threading
+from datetime import timedelta
+import pytest
+from app.core.config import settings
+from app.models.job import Job
+from app.models.notification import Notification, NotificationCampaign
+from app.services import jobs
+from app.services.jobs import (
+    JOB_TYPES, claim_next, enqueue, job_type, requeue_stale, run_job,
+)
+from app.worker import worker_loop
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def test_types():
+    calls = []
+
+    @job_type("test_ok", concurrency=1)
+    def _ok(db, payload, context):
+        context.progress(50, "half")
+        calls.append(payload)
+        return {"echo": payload}
+
+    @job_type("test_fail", max_attempts=2)
+    def _fail(db, payload, context):
+        raise RuntimeError("boom")
+
+    yield calls
+    JOB_TYPES.pop("test_ok")
+    JOB_TYPES.pop("test_fail")
+
+
+def _claim(db, types=None):
+    return claim_next(db, "worker-1", types)
+
+
+class TestQueue:
+    def test_enqueue_claim_run(self, db, test_types):
+        job = enqueue(db, "test_ok", {"n": 1})
+        db.commit()
+
+        claimed = _claim(db, ["test_ok"])
+        assert claimed.id == job.id
+        assert (claimed.status, claimed.attempts, claimed.locked_by) == (
+            "running", 1, "worker-1"
+        )
+        assert run_job(claimed, TestingSessionLocal) == "succeeded"
+
+        db.expire_all()
+        job = db.get(Job, job.id)
+        assert (job.status, job.progress, job.locked_by) == ("succeeded", 100, None)
+        assert job.result == '{"echo": {"n": 1}}'
+        assert test_types == [{"n": 1}]
+        assert _claim(db) is None
+
+    def test_unknown_type(self, db):
+        with pytest.raises(ValueError):
+            enqueue(db, "nope")
+
+    def test_retry_with_backoff_then_fail(self, db, test_types, monkeypatch):
+        monkeypatch.setattr(settings, "JOB_RETRY_BASE_SECONDS", 60)
+        job = enqueue(db, "test_fail")
+        db.commit()
+
+        assert run_job(_claim(db), TestingSessionLocal) == "queued"
+        db.expire_all()
+        job = db.get(Job, job.id)
+        assert job.error_message == "boom"
+        assert job.run_at - job.started_at >= timedelta(seconds=59)
+        # Ainda no backoff
+        assert _claim(db) is None
+
+        job.run_at = job.started_at
+        db.commit()
+        assert run_job(_claim(db), TestingSessionLocal) == "failed"
+        db.expire_all()
+        assert db.get(Job, job.id).attempts == 2
+
+    def test_concurrency_per_type(self, db, test_types, monkeypatch):
+        first = enqueue(db, "test_ok")
+        enqueue(db, "test_ok")
+        other = enqueue(db, "test_fail")
+        db.commit()
+
+        assert _claim(db).id == first.id
+        # test_ok ja tem um running (limite 1): so o outro tipo sai
+        assert _claim(db).id == other.id
+        assert _claim(db) is None
+
+        monkeypatch.setattr(settings, "JOB_CONCURRENCY", "test_ok=2")
+        assert _claim(db).type == "test_ok"
+
+    def test_requeue_stale(self, db, test_types, monkeypatch):
+        enqueue(db, "test_ok")
+        db.commit()
+        job = _claim(db)
+        assert requeue_stale(db) == 0
+
+        monkeypatch.setattr(settings, "JOB_STALE_SECONDS", -1)
+        assert requeue_stale(db) == 1
+        db.expire_all()
+        job = db.get(Job, job.id)
+        assert (job.status, job.locked_by) == ("queued", None)
+        assert job.error_message == "Worker stopped responding"
+
+    def test_retry_delay(self, monkeypatch):
+        monkeypatch.setattr(settings, "JOB_RETRY_BASE_SECONDS", 10)
+        monkeypatch.setattr(settings, "JOB_RETRY_MAX_SECONDS", 50)
+        assert [jobs.retry_delay(n) for n in (1, 2, 3, 4)] == [10, 20, 40, 50]
+
+
+class TestWorker:
+    def test_campaign_in_background(self, client, auth_headers, db, regular_user):
+        r = client.post(
+            "/api/admin/notifications/campaigns?background=true",
+            headers=auth_headers,
+            json={"type": "SYSTEM", "audience": "all", "title": "t", "message": "m"},
+        )
+        assert r.status_code == 200
+        assert r.json()["status"] == "pending"
+
+        assert worker_loop(
+            None, once=True, stop=threading.Event(),
+            session_factory=TestingSessionLocal,
+        ) == 1
+        db.expire_all()
+        campaign = db.get(NotificationCampaign, r.json()["id"])
+        assert (campaign.status, campaign.recipients) == ("completed", 2)
+        assert db.query(Job).one().status == "succeeded"
+
+    def test_loop_survives_db_errors(self, db, test_types, monkeypatch):
+        enqueue(db, "test_ok", {"n": 1})
+        db.commit()
+        monkeypatch.setattr(settings, "JOB_POLL_SECONDS", 0)
+        errors = []
+
+        def flaky(db, *args):
+            if not errors:
+                errors.append(1)
+                raise RuntimeError("connection reset")
+            return claim_next(db, *args)
+
+        monkeypatch.setattr("app.worker.claim_next", flaky)
+        assert worker_loop(
+            None, once=True, stop=threading.Event(),
+            session_factory=TestingSessionLocal,
+        ) == 1
+        assert errors == [1]
+        assert test_types == [{"n": 1}]
+
+    def test_completed_campaign_is_not_dispatched_again(
+        self, client, auth_headers, db, regular_user
+    ):
+        r = client.post(
+            "/api/admin/notifications/campaigns", headers=auth_headers,
+            json={"type": "SYSTEM", "audience": "all", "title": "t", "message": "m"},
+        )
+        assert r.json()["status"] == "completed"
+        r = client.post(
+            "/api/admin/jobs", headers=auth_headers,
+            json={"type": "notification_campaign", "payload": {"campaign_id": r.json()["id"]}},
+        )
+        assert r.status_code == 200
+
+        assert worker_loop(
+            None, once=True, stop=threading.Event(),
+            session_factory=TestingSessionLocal,
+        ) == 1
+        db.expire_all()
+        assert db.query(Notification).count() == 2
+        job = db.query(Job).one()
+        assert job.status == "succeeded"
+        assert json.loads(job.result)["skipped"] == "completed"
+
+
+class TestJobEndpoints:
+    def test_create_list_cancel_retry(self, client, auth_headers):
+        r = client.post("/api/admin/jobs", headers=auth_headers, json={
+            "type": "market_index_rebuild", "payload": {"full": True},
+        })
+        assert r.status_code == 200
+        job = r.json()
+        assert (job["status"], job["payload"]) == ("queued", {"full": True})
+
+        r = client.get("/api/admin/jobs?status=queued", headers=auth_headers)
+        assert r.json()["total"] == 1
+        assert r.json()["jobs"][0]["type"] == "market_index_rebuild"
+
+        r = client.post(f"/api/admin/jobs/{job['id']}/retry", headers=auth_headers)
+        assert r.status_code == 400
+        r = client.post(f"/api/admin/jobs/{job['id']}/cancel", headers=auth_headers)
+        assert r.json()["status"] == "cancelled"
+        r = client.post(f"/api/admin/jobs/{job['id']}/retry", headers=auth_headers)
+        assert r.json()["status"] == "queued"
+
+        r = client.get(f"/api/admin/jobs/{job['id']}", headers=auth_headers)
+        assert r.status_code == 200
+
+    def test_invalid(self, client, auth_headers):
+        r = client.post(
+            "/api/admin/jobs", headers=auth_headers, json={"type": "nope"}
+        )
+        assert r.status_code == 400
+        r = client.get("/api/admin/jobs?status=nope", headers=auth_headers)
+        assert r.status_code == 400
+        r = client.get("/api/admin/jobs/nope", headers=auth_headers)
+        assert r.status_code == 404
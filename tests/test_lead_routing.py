@@ -0,0 +1,139 @@
+"""Tests for the geo index and lead routing."""
+import random
+import uuid
+from datetime import datetime
+from app.models.broker import Broker
+from app.models.contact import Contact, ContactType, ContactStatus
+from app.models.property import Property
+from app.services.geo import GridIndex, haversine_km
+from app.services.lead_routing import assign_unassigned_contacts
+
+
+def _broker(db, name, lat=None, lon=None, city=None, **kwargs):
+    broker = Broker(
+        id=str(uuid.uuid4()), name=name,
+        latitude=lat, longitude=lon, city=city, **kwargs,
+    )
+    db.add(broker)
+    db.commit()
+    return broker
+
+
+def _contact(db, lat=None, lon=None, city=None):
+    prop = Property(
+        id=str(uuid.uuid4()),
+        external_code=str(uuid.uuid4()),
+        property_type="Apartamento",
+        purpose="Venda",
+        latitude=lat, longitude=lon, city=city,
+    )
+    contact = Contact(
+        id=str(uuid.uuid4()),
+        property_id=prop.id,
+        name="Lead",
+        email="lead@test.com",
+        message="Ola",
+        type=ContactType.INFO,
+        status=ContactStatus.NEW,
+    )
+    db.add_all([prop, contact])
+    db.commit()
+    return contact
+
+
+class TestGridIndex:
+    def test_haversine(self):
+        # Sao Paulo -> Rio de Janeiro ~ 357 km
+        d = haversine_km(-23.5505, -46.6333, -22.9068, -43.1729)
+        assert 350 < d < 365
+
+    def test_matches_brute_force(self):
+        rng = random.Random(42)
+        points = [
+            (i, rng.uniform(-24, -22), rng.uniform(-47, -45))
+            for i in range(500)
+        ]
+        index = GridIndex(cell_deg=0.05)
+        for key, lat, lon in points:
+            index.add(key, lat, lon)
+
+        for _ in range(20):
+            lat, lon = rng.uniform(-24, -22), rng.uniform(-47, -45)
+            expected = sorted(
+                (haversine_km(lat, lon, plat, plon), key)
+                for key, plat, plon in points
+            )[:5]
+            assert index.nearest(lat, lon, k=5) == expected
+
+    def test_max_km(self):
+        index = GridIndex()
+        index.add("near", -23.55, -46.63)
+        index.add("far", -22.90, -43.17)
+        result = index.nearest(-23.56, -46.64, k=2, max_km=50)
+        assert [key for _, key in result] == ["near"]
+
+
+class TestLeadRouting:
+    def test_assigns_nearest_broker(self, db):
+        near = _broker(db, "Perto", -23.55, -46.63)
+        _broker(db, "Longe", -22.90, -43.17)
+        contact = _contact(db, -23.56, -46.64)
+
+        assignments = assign_unassigned_contacts(db, max_km=50)
+        assert len(assignments) == 1
+        assert assignments[0].broker_id == near.id
+        assert assignments[0].strategy == "nearest"
+
+        db.expire_all()
+        assert db.get(Contact, contact.id).broker_id == near.id
+        broker = db.get(Broker, near.id)
+        assert broker.lead_count == 1
+        assert broker.last_lead_assigned_at is not None
+
+    def test_round_robin_between_nearby_brokers(self, db):
+        a = _broker(db, "A", -23.55, -46.63)
+        b = _broker(db, "B", -23.551, -46.631)
+        for _ in range(4):
+            _contact(db, -23.55, -46.63)
+
+        assignments = assign_unassigned_contacts(db, max_km=50)
+        counts = {a.id: 0, b.id: 0}
+        for assignment in assignments:
+            counts[assignment.broker_id] += 1
+        assert counts == {a.id: 2, b.id: 2}
+
+    def test_least_recently_assigned_wins(self, db):
+        _broker(
+            db, "Recente", -23.55, -46.63,
+            last_lead_assigned_at=datetime(2026, 1, 2),
+        )
+        old = _broker(
+            db, "Antigo", -23.56, -46.64,
+            last_lead_assigned_at=datetime(2026, 1, 1),
+        )
+        _contact(db, -23.55, -46.63)
+        assert assign_unassigned_contacts(db)[0].broker_id == old.id
+
+    def test_city_fallback_and_inactive_skipped(self, db):
+        _broker(db, "Inativo", -23.55, -46.63, is_active=False)
+        city_broker = _broker(db, "Campinas", city="Campinas")
+        _contact(db, city="campinas")
+        assignment = assign_unassigned_contacts(db)[0]
+        assert assignment.broker_id == city_broker.id
+        assert assignment.strategy == "city"
+
+    def test_endpoint(self, client, auth_headers, db):
+        _broker(db, "Perto", -23.55, -46.63)
+        _contact(db, -23.56, -46.64)
+        _contact(db, -23.57, -46.65)
+        r = client.post(
+            "/api/admin/leads/assign?batch_size=1", headers=auth_headers
+        )
+        assert r.status_code == 200
+        data = r.json()
+        assert data["assigned"] == 1
+        assert data["remaining"] == 1
+
+    def test_endpoint_requires_admin(self, client):
+        r = client.post("/api/admin/leads/assign")
+        assert r.status_code == 403
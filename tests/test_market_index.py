@@ -0,0 +1,116 @@
+"""Tests for the precomputed market index."""
+import uuid
+from datetime import datetime, timedelta
+from app.models.import_log import ImportLog
+from app.models.market_index import MarketIndex
+from app.models.property import Property
+from app.services.market_index import rebuild_market_index
+
+
+def _property(db, price_per_sqm, city="São Paulo", neighborhood="Centro",
+              **kwargs):
+    prop = Property(
+        id=str(uuid.uuid4()),
+        external_code=str(uuid.uuid4()),
+        property_type="Apartamento",
+        purpose="Venda",
+        city=city,
+        neighborhood=neighborhood,
+        price_per_sqm=price_per_sqm,
+        **kwargs,
+    )
+    db.add(prop)
+    db.commit()
+    return prop
+
+
+class TestRebuild:
+    def test_full_rebuild_percentiles(self, db):
+        for value in (1000, 2000, 3000, 4000, None):
+            _property(db, value)
+        _property(db, 9000, is_active=False)
+
+        result = rebuild_market_index(db)
+        assert result["full"] is True
+        assert result["rows"] == 1
+
+        row = db.query(MarketIndex).one()
+        assert (row.city, row.neighborhood) == ("sao paulo", "centro")
+        assert row.city_name == "São Paulo"
+        assert row.listing_count == 5
+        assert row.priced_count == 4
+        assert row.p25_price_per_sqm == 1750
+        assert row.median_price_per_sqm == 2500
+        assert row.p75_price_per_sqm == 3250
+
+    def test_incremental_rebuild_only_changed_keys(self, db):
+        _property(db, 1000, neighborhood="Centro")
+        moema = _property(db, 5000, neighborhood="Moema")
+        rebuild_market_index(db)
+
+        # Imoveis existentes e watermark no passado
+        db.query(Property).update({Property.updated_at: datetime(2019, 1, 1)})
+        db.query(MarketIndex).update(
+            {MarketIndex.updated_at: datetime(2020, 1, 1)}
+        )
+        db.commit()
+        _property(db, 7000, neighborhood="Moema")
+
+        result = rebuild_market_index(db)
+        assert result["full"] is False
+        assert result["keys"] == 1
+
+        rows = {r.neighborhood: r for r in db.query(MarketIndex).all()}
+        assert rows["moema"].listing_count == 2
+        assert rows["moema"].median_price_per_sqm == 6000
+        assert rows["centro"].updated_at == datetime(2020, 1, 1)
+
+        moema.is_active = False
+        db.commit()
+        rebuild_market_index(db)
+        db.expire_all()
+        assert db.query(MarketIndex).filter_by(neighborhood="moema").one().listing_count == 1
+
+
+class TestMarketIndexEndpoints:
+    def test_list_filters_by_normalized_key(self, client, auth_headers, db):
+        _property(db, 1000, city="São Paulo")
+        _property(db, 2000, city="Campinas")
+        rebuild_market_index(db)
+
+        response = client.get(
+            "/api/admin/market-index?city=SAO PAULO", headers=auth_headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        assert data["market_index"][0]["city_name"] == "São Paulo"
+
+    def test_rebuild_endpoint(self, client, auth_headers, db):
+        _property(db, 1000)
+        response = client.post(
+            "/api/admin/market-index/rebuild?full=true", headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.json()["rows"] == 1
+
+    def test_cron_rebuilds_after_import(self, client, db):
+        headers = {"X-Cron-Secret": "test-cron-secret"}
+        _property(db, 1000)
+        rebuild_market_index(db)
+
+        response = client.post("/api/admin/cron/market-index", headers=headers)
+        assert response.json()["status"] == "up_to_date"
+
+        db.add(ImportLog(
+            id=str(uuid.uuid4()),
+            status="success",
+            completed_at=datetime.utcnow() + timedelta(minutes=1),
+        ))
+        db.commit()
+        response = client.post("/api/admin/cron/market-index", headers=headers)
+        assert response.json()["status"] == "rebuilt"
+
+    def test_cron_requires_secret(self, client):
+        response = client.post("/api/admin/cron/market-index")
+        assert response.status_code == 401
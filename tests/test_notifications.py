@@ -0,0 +1,143 @@
+"""Tests for notification fan-out campaigns and unread counters."""
+import uuid
+import pytest
+from app.api.admin import notify_users_of_removed_properties
+from app.models.favorites import Favorite
+from app.models.notification import (
+    Notification, NotificationCounter, NotificationType,
+)
+from app.services.notifications import (
+    create_campaign, fan_out, mark_read, reconcile_unread_counters,
+    unread_count,
+)
+
+
+@pytest.fixture
+def favorited(db, admin_user, regular_user, sample_property):
+    for user in (admin_user, regular_user):
+        db.add(Favorite(
+            id=str(uuid.uuid4()), user_id=user.id, property_id=sample_property.id
+        ))
+    db.commit()
+    return sample_property
+
+
+class TestFanOut:
+    def test_removed_properties_use_favorites(self, db, favorited, regular_user):
+        created = notify_users_of_removed_properties(db, [favorited.id])
+        db.commit()
+        assert created == 2
+
+        notification = db.query(Notification).filter(
+            Notification.user_id == regular_user.id
+        ).one()
+        assert notification.type == NotificationType.PROPERTY_REMOVED
+        assert notification.property_id == favorited.id
+        assert notification.is_read is False
+        assert notification.message == (
+            "O imovel 'Apartamento' em Centro, Sao Paulo que voce "
+            "favoritou nao esta mais disponivel."
+        )
+        assert notification.link == "/buscar?city=Sao Paulo&type=Apartamento"
+        assert unread_count(db, regular_user.id) == 1
+
+    def test_counters_accumulate(self, db, admin_user, regular_user):
+        for _ in range(2):
+            campaign = create_campaign(
+                db, type="system", audience="all",
+                title="Aviso", message="Manutencao programada",
+            )
+            assert fan_out(db, campaign) == 2
+        db.commit()
+        assert unread_count(db, admin_user.id) == 2
+        assert unread_count(db, regular_user.id) == 2
+
+    def test_validation(self, db, regular_user):
+        with pytest.raises(ValueError):
+            create_campaign(db, type="nope", audience="all", title="t", message="m")
+        with pytest.raises(ValueError):
+            create_campaign(db, type="SYSTEM", audience="favorites", title="t", message="m")
+        with pytest.raises(ValueError):
+            # Placeholder de imovel fora do publico favorites
+            create_campaign(
+                db, type="SYSTEM", audience="users", user_ids=[regular_user.id],
+                title="t", message="{city}",
+            )
+
+
+class TestUnread:
+    def test_mark_read_and_reconcile(self, db, admin_user, regular_user):
+        campaign = create_campaign(
+            db, type="PROMOTION", audience="users",
+            user_ids=[regular_user.id], title="Oferta", message="Confira",
+        )
+        fan_out(db, campaign)
+        fan_out(db, campaign)
+        db.commit()
+        assert unread_count(db, regular_user.id) == 2
+
+        assert mark_read(db, regular_user.id) == 2
+        assert unread_count(db, regular_user.id) == 0
+        assert mark_read(db, regular_user.id) == 0
+
+        # Portal marcou como nao lida direto na tabela: contador diverge
+        db.query(Notification).filter(
+            Notification.user_id == regular_user.id
+        ).update({"is_read": False})
+        db.add(Notification(
+            user_id=admin_user.id, title="t", message="m",
+            type=NotificationType.SYSTEM,
+        ))
+        db.commit()
+        assert reconcile_unread_counters(db) == {"fixed": 1, "created": 1}
+        assert unread_count(db, regular_user.id) == 2
+        assert unread_count(db, admin_user.id) == 1
+        assert reconcile_unread_counters(db) == {"fixed": 0, "created": 0}
+
+
+class TestCampaignEndpoints:
+    def test_create_and_monitor(self, client, auth_headers, favorited):
+        r = client.post("/api/admin/notifications/campaigns", headers=auth_headers, json={
+            "type": "PRICE_DROP",
+            "audience": "favorites",
+            "property_ids": [favorited.id],
+            "title": "Baixou o preco",
+            "message": "{title} em {city} ficou mais barato",
+            "link": "/imovel/{property_id}",
+        })
+        assert r.status_code == 200
+        data = r.json()
+        assert data["status"] == "completed"
+        assert data["recipients"] == 2
+        assert data["read_count"] == 0
+
+        r = client.get(
+            f"/api/admin/notifications/campaigns/{data['id']}", headers=auth_headers
+        )
+        assert r.status_code == 200
+        assert r.json()["recipients"] == 2
+
+        r = client.get("/api/admin/notifications/campaigns", headers=auth_headers)
+        assert r.status_code == 200
+        assert r.json()["total"] == 1
+        assert r.json()["campaigns"][0]["type"] == "PRICE_DROP"
+
+    def test_invalid_campaign(self, client, auth_headers):
+        r = client.post("/api/admin/notifications/campaigns", headers=auth_headers, json={
+            "type": "SYSTEM", "audience": "users", "title": "t", "message": "m",
+        })
+        assert r.status_code == 400
+
+    def test_not_found(self, client, auth_headers):
+        r = client.get("/api/admin/notifications/campaigns/nope", headers=auth_headers)
+        assert r.status_code == 404
+
+    def test_cron_reconcile(self, client, db, regular_user):
+        db.add(NotificationCounter(user_id=regular_user.id, unread=5))
+        db.commit()
+        r = client.post(
+            "/api/admin/cron/notifications/reconcile-unread",
+            headers={"X-Cron-Secret": "test-cron-secret"},
+        )
+        assert r.status_code == 200
+        assert r.json() == {"fixed": 1, "created": 0}
@@ -0,0 +1,106 @@
+"""
+Tests for monthly partition maintenance.
+
+The migration test runs only against Postgres:
+    TEST_POSTGRES_URL=postgresql://... pytest tests/test_partitions.py
+"""
+import importlib.util
+import os
+import uuid
+from datetime import date
+import pytest
+from alembic.runtime.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, text
+from app.services.partitions import add_months, partition_name
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+MIGRATION = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    "alembic", "versions", "e4a6c8e0b2d3_monthly_partitions.py",
+)
+
+
+class TestPartitionHelpers:
+    def test_add_months(self):
+        assert add_months(date(2026, 11, 1), 1) == date(2026, 12, 1)
+        assert add_months(date(2026, 12, 1), 1) == date(2027, 1, 1)
+        assert add_months(date(2026, 1, 1), -13) == date(2024, 12, 1)
+
+    def test_partition_name(self):
+        assert partition_name("evaluations", date(2026, 3, 1)) == "evaluations_p2026_03"
+
+
+class TestCronPartitions:
+    def test_skipped_outside_postgres(self, client):
+        response = client.post(
+            "/api/admin/cron/partitions",
+            headers={"X-Cron-Secret": "test-cron-secret"},
+        )
+        assert response.status_code == 200
+        assert response.json()["status"] == "skipped"
+
+    def test_requires_secret(self, client):
+        response = client.post("/api/admin/cron/partitions")
+        assert response.status_code == 401
+
+
+@pytest.fixture
+def pg_schema():
+    # Schema descartavel: a migracao usa current_schema()
+    engine = create_engine(POSTGRES_URL)
+    schema = f"test_partitions_{uuid.uuid4().hex[:8]}"
+    with engine.connect() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+        conn.execute(text(f"SET search_path TO {schema}"))
+        conn.commit()
+        yield conn
+        conn.rollback()
+        conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        conn.commit()
+    engine.dispose()
+
+
+def _run_migration(conn, step: str) -> None:
+    spec = importlib.util.spec_from_file_location("monthly_partitions", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    with Operations.context(MigrationContext.configure(conn)):
+        spec.loader.exec_module(module)
+        getattr(module, step)()
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL not set")
+class TestPartitionMigration:
+    def test_serial_tables_round_trip(self, pg_schema):
+        conn = pg_schema
+        # Como tabelas criadas por create_all com id SERIAL
+        for table, column in (
+            ("evaluations", "created_at"),
+            ("notifications", "created_at"),
+            ("import_logs", "started_at"),
+        ):
+            conn.execute(text(
+                f"CREATE TABLE {table} (id SERIAL PRIMARY KEY, "
+                f"{column} timestamp NOT NULL DEFAULT now(), note text)"
+            ))
+            conn.execute(text(f"CREATE INDEX ix_{table}_note ON {table} (note)"))
+            conn.execute(text(f"INSERT INTO {table} (note) VALUES ('old')"))
+
+        _run_migration(conn, "upgrade")
+        partitioned = conn.execute(text(
+            "SELECT count(*) FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relnamespace = current_schema()::regnamespace"
+        )).scalar()
+        assert partitioned == 3
+        # A sequence continua de onde estava e agora pertence a nova tabela
+        new_id = conn.execute(text(
+            "INSERT INTO evaluations (note) VALUES ('new') RETURNING id"
+        )).scalar()
+        assert new_id == 2
+
+        _run_migration(conn, "downgrade")
+        assert conn.execute(text(
+            "INSERT INTO evaluations (note) VALUES ('again') RETURNING id"
+        )).scalar() == 3
+        assert conn.execute(text("SELECT count(*) FROM evaluations")).scalar() == 3
@@ -0,0 +1,111 @@
+"""
+EXPLAIN checks for the admin query indexes.
+
+Runs only against a migrated Postgres database:
+    TEST_POSTGRES_URL=postgresql://... pytest tests/test_query_plans.py
+"""
+import os
+import pytest
+from sqlalchemy import create_engine, text
+from app.models.contact import Contact, ContactStatus
+from app.models.evaluation import Evaluation
+from app.models.property import Property
+from app.schemas import ContactResponse, EvaluationResponse, PropertyResponse
+from app.services.listing import page_statement
+from app.services.search import contains, contains_any
+from app.api.admin import PROPERTY_SEARCH_COLUMNS
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+pytestmark = pytest.mark.skipif(
+    not POSTGRES_URL, reason="TEST_POSTGRES_URL not set"
+)
+
+
+@pytest.fixture(scope="module")
+def pg_conn():
+    engine = create_engine(POSTGRES_URL)
+    with engine.connect() as conn:
+        # Tabelas pequenas de teste sempre dariam seq scan
+        conn.execute(text("SET enable_seqscan = off"))
+        yield conn
+    engine.dispose()
+
+
+def _plan(conn, stmt) -> str:
+    sql = stmt.compile(
+        dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+    )
+    rows = conn.execute(text(f"EXPLAIN {sql}")).scalars().all()
+    return "\n".join(rows)
+
+
+QUERIES = {
+    "list_properties_active": (
+        page_statement(
+            Property, PropertyResponse,
+            filters=[Property.is_active == True],  # noqa: E712
+            order_by=Property.created_at.desc(),
+        ),
+        "ix_properties_active_created_at",
+    ),
+    "list_properties": (
+        page_statement(
+            Property, PropertyResponse,
+            order_by=Property.created_at.desc(),
+        ),
+        "ix_properties_created_at",
+    ),
+    "dashboard_top_properties": (
+        page_statement(
+            Property, PropertyResponse,
+            filters=[Property.is_active == True],  # noqa: E712
+            order_by=Property.view_count.desc(), limit=5,
+        ),
+        "ix_properties_active_view_count",
+    ),
+    "list_contacts_status": (
+        page_statement(
+            Contact, ContactResponse,
+            filters=[Contact.status == ContactStatus.NEW],
+            order_by=Contact.created_at.desc(),
+        ),
+        "ix_contacts_status_created_at",
+    ),
+    "list_contacts": (
+        page_statement(
+            Contact, ContactResponse,
+            order_by=Contact.created_at.desc(),
+        ),
+        "ix_contacts_created_at",
+    ),
+    "list_evaluations": (
+        page_statement(
+            Evaluation, EvaluationResponse,
+            order_by=Evaluation.created_at.desc(),
+        ),
+        "ix_evaluations_created_at",
+    ),
+    "list_evaluations_city": (
+        page_statement(
+            Evaluation, EvaluationResponse,
+            filters=[contains(Evaluation.city, "sao paulo")],
+        ),
+        "ix_evaluations_city_trgm",
+    ),
+    "list_properties_q": (
+        page_statement(
+            Property, PropertyResponse,
+            filters=[contains_any(PROPERTY_SEARCH_COLUMNS, "jardim")],
+        ),
+        "ix_properties_neighborhood_trgm",
+    ),
+}
+
+
+@pytest.mark.parametrize("name", sorted(QUERIES))
+def test_endpoint_query_uses_index(pg_conn, name):
+    stmt, index_name = QUERIES[name]
+    plan = _plan(pg_conn, stmt)
+    assert "Seq Scan" not in plan, plan
+    assert index_name in plan, plan
@@ -0,0 +1,89 @@
+"""Tests for the sliding-window rate limiter."""
+from app.api.auth import login_ip_limiter
+from app.core.rate_limit import DatabaseBackend, MemoryBackend, RateLimiter
+from tests.conftest import TestingSessionLocal
+
+
+def _hits(limiter, key, count, now):
+    return [limiter.hit(key, now=now).allowed for _ in range(count)]
+
+
+class TestRateLimiter:
+    def test_limit_within_window(self):
+        limiter = RateLimiter(MemoryBackend(), limit=3, window_seconds=60, prefix="t")
+        assert _hits(limiter, "a", 4, now=600) == [True, True, True, False]
+        # Outra chave tem contador proprio
+        assert limiter.hit("b", now=600).allowed
+
+    def test_previous_window_is_weighted(self):
+        limiter = RateLimiter(MemoryBackend(), limit=3, window_seconds=60, prefix="t")
+        _hits(limiter, "a", 3, now=600)
+        # Meio da janela seguinte: 3 * 0.5 + 1 = 2.5
+        result = limiter.hit("a", now=690)
+        assert result.allowed
+        assert result.estimated == 2.5
+        assert not limiter.hit("a", now=690).allowed
+        # Duas janelas depois o contador zera
+        assert limiter.hit("a", now=800).estimated == 1
+
+    def test_memory_backend_evicts_least_recently_used(self):
+        backend = MemoryBackend(max_keys=2)
+        limiter = RateLimiter(backend, limit=1, window_seconds=60, prefix="t")
+        limiter.hit("a", now=0)
+        limiter.hit("b", now=0)
+        limiter.hit("a", now=0)
+        limiter.hit("c", now=0)
+        assert len(backend) == 2
+        # "b" foi descartada, "a" continua bloqueada
+        assert not limiter.hit("a", now=0).allowed
+        assert limiter.hit("b", now=0).allowed
+
+    def test_database_backend_shared_between_limiters(self):
+        backend = DatabaseBackend(TestingSessionLocal)
+        first = RateLimiter(backend, limit=2, window_seconds=60, prefix="t")
+        second = RateLimiter(backend, limit=2, window_seconds=60, prefix="t")
+        assert first.hit("a", now=600).allowed
+        assert second.hit("a", now=610).allowed
+        assert not first.hit("a", now=620).allowed
+
+        result = second.hit("a", now=690)
+        assert result.estimated == 3 * 0.5 + 1
+        backend.reset()
+        assert first.hit("a", now=690).estimated == 1
+
+
+class TestLoginRateLimit:
+    def test_limit_is_per_email(self, client, admin_user, monkeypatch):
+        # IP com limite folgado (LOGIN_MAX_ATTEMPTS_PER_IP): so o email conta
+        monkeypatch.setattr(login_ip_limiter, "limit", 20)
+        for _ in range(5):
+            client.post(
+                "/api/auth/login",
+                json={"email": "other@test.com", "password": "wrong"},
+            )
+        r = client.post(
+            "/api/auth/login",
+            json={"email": "admin@test.com", "password": "admin123"},
+        )
+        assert r.status_code == 200
+
+    def test_ip_limit_across_emails(self, client, admin_user):
+        for i in range(5):
+            client.post(
+                "/api/auth/login",
+                json={"email": f"user{i}@test.com", "password": "wrong"},
+            )
+        r = client.post(
+            "/api/auth/login",
+            json={"email": "admin@test.com", "password": "admin123"},
+        )
+        assert r.status_code == 429
+
+    def test_retry_after_header(self, client, admin_user):
+        for _ in range(6):
+            r = client.post(
+                "/api/auth/login",
+                json={"email": "admin@test.com", "password": "wrong"},
+            )
+        assert r.status_code == 429
+        assert int(r.headers["Retry-After"]) > 0
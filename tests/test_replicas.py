@@ -0,0 +1,182 @@
+"""Tests for read-replica routing."""
+import time
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from app.core import replicas
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.replicas import (
+    PRIMARY_COOKIE,
+    PRIMARY_HEADER,
+    ReadAfterWriteMiddleware,
+    ReplicaRouter,
+    get_read_db,
+)
+
+
+@pytest.fixture
+def replica_urls(tmp_path):
+    return [
+        f"sqlite:///{tmp_path / 'replica1.db'}",
+        f"sqlite:///{tmp_path / 'replica2.db'}",
+    ]
+
+
+@pytest.fixture
+def configured(monkeypatch, replica_urls):
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", ",".join(replica_urls))
+    monkeypatch.setattr(replicas, "_router", None)
+    replicas.check_replicas()
+    yield
+    if replicas._router is not None:
+        for replica in replicas._router.replicas:
+            replica.engine.dispose()
+
+
+def _request(cookies: str = "", primary_until: str = "") -> Request:
+    headers = [(b"cookie", cookies.encode())] if cookies else []
+    if primary_until:
+        headers.append((PRIMARY_HEADER.lower().encode(), primary_until.encode()))
+    return Request({"type": "http", "headers": headers})
+
+
+def _db_url(db) -> str:
+    return str(db.get_bind().url)
+
+
+class TestReplicaRouter:
+    def test_round_robin(self, replica_urls):
+        router = ReplicaRouter(replica_urls, max_lag_seconds=10, check_seconds=5)
+        router.check_all(now=0)
+        picked = [router.pick(now=0).engine.url for _ in range(4)]
+        assert picked[0] == picked[2]
+        assert picked[1] == picked[3]
+        assert picked[0] != picked[1]
+
+    def test_unavailable_replica_skipped(self, replica_urls):
+        urls = ["sqlite:////nonexistent/dir/replica.db", replica_urls[0]]
+        router = ReplicaRouter(urls, max_lag_seconds=10, check_seconds=5)
+        router.check_all(now=0)
+        for _ in range(3):
+            assert str(router.pick(now=0).engine.url) == replica_urls[0]
+        assert router.replicas[0].healthy is False
+
+    def test_all_unavailable_uses_primary(self):
+        router = ReplicaRouter(
+            ["sqlite:////nonexistent/dir/replica.db"],
+            max_lag_seconds=10, check_seconds=5,
+        )
+        router.check_all(now=0)
+        assert router.pick(now=0) is None
+
+    def test_lagging_replica_rechecked(self, monkeypatch, replica_urls):
+        lag = {"value": 30.0}
+        monkeypatch.setattr(
+            replicas, "replication_lag_seconds", lambda conn: lag["value"]
+        )
+        router = ReplicaRouter(replica_urls[:1], max_lag_seconds=10, check_seconds=5)
+        router.check_all(now=0)
+        assert router.pick(now=0) is None
+        assert router.status()[0]["lag_seconds"] == 30.0
+
+        lag["value"] = 1.0
+        assert router.pick(now=6) is None  # pick nao verifica de novo
+        router.check_all(now=6)
+        assert router.pick(now=6) is not None
+
+    def test_pick_never_connects(self, monkeypatch, replica_urls):
+        router = ReplicaRouter(replica_urls[:1], max_lag_seconds=10, check_seconds=5)
+
+        def connect(*args, **kwargs):
+            raise AssertionError("pick must not connect")
+
+        monkeypatch.setattr(router.replicas[0].engine, "connect", connect)
+        # Nunca verificada: primario, sem tentar conectar
+        assert router.pick(now=0) is None
+
+    def test_stale_health_uses_primary(self, replica_urls):
+        router = ReplicaRouter(replica_urls[:1], max_lag_seconds=10, check_seconds=5)
+        router.check_all(now=0)
+        assert router.pick(now=14) is not None
+        # Tarefa de verificacao parada ha mais de STALE_CHECKS intervalos
+        assert router.pick(now=15) is None
+
+    def test_replica_connect_timeout(self):
+        options = replicas.replica_engine_options("postgresql://u:p@replica/db")
+        assert options["connect_args"]["connect_timeout"] == settings.REPLICA_CONNECT_TIMEOUT_SECONDS
+        assert "connect_args" not in replicas.replica_engine_options("sqlite:///r.db")
+
+
+class TestReadSession:
+    def test_no_replicas_uses_primary(self, monkeypatch):
+        monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", "")
+        gen = get_read_db(_request())
+        db = next(gen)
+        assert _db_url(db) == str(SessionLocal.kw["bind"].url)
+        gen.close()
+
+    def test_reads_from_replica(self, configured, replica_urls):
+        urls = set()
+        for _ in range(2):
+            gen = get_read_db(_request())
+            urls.add(_db_url(next(gen)))
+            gen.close()
+        assert urls == set(replica_urls)
+
+    def test_read_after_write_uses_primary(self, configured):
+        cookie = f"{PRIMARY_COOKIE}={time.time() + 10:.0f}"
+        gen = get_read_db(_request(cookie))
+        assert _db_url(next(gen)) == str(SessionLocal.kw["bind"].url)
+        gen.close()
+
+    def test_read_after_write_header_uses_primary(self, configured, replica_urls):
+        # Cliente cross-origin: reenvia o header em vez do cookie
+        gen = get_read_db(_request(primary_until=f"{time.time() + 10:.0f}"))
+        assert _db_url(next(gen)) == str(SessionLocal.kw["bind"].url)
+        gen.close()
+        gen = get_read_db(_request(primary_until="nope"))
+        assert _db_url(next(gen)) in replica_urls
+        gen.close()
+
+    def test_expired_cookie_uses_replica(self, configured, replica_urls):
+        cookie = f"{PRIMARY_COOKIE}={time.time() - 10:.0f}"
+        gen = get_read_db(_request(cookie))
+        assert _db_url(next(gen)) in replica_urls
+        gen.close()
+
+
+class TestReadAfterWriteMiddleware:
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.add_middleware(ReadAfterWriteMiddleware)
+
+        @app.get("/items")
+        def read():
+            return {}
+
+        @app.post("/items")
+        def write():
+            return {}
+
+        return TestClient(app)
+
+    def test_write_sets_cookie(self, configured, client):
+        assert PRIMARY_COOKIE not in client.get("/items").cookies
+        response = client.post("/items")
+        assert PRIMARY_COOKIE in response.cookies
+        assert float(response.headers[PRIMARY_HEADER]) > time.time()
+        assert PRIMARY_HEADER not in client.get("/items").headers
+
+    def test_without_replicas_no_cookie(self, monkeypatch, client):
+        monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", "")
+        assert PRIMARY_COOKIE not in client.post("/items").cookies
+
+
+def test_sqlite_lag_is_zero(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'r.db'}")
+    with engine.connect() as conn:
+        assert replicas.replication_lag_seconds(conn) == 0.0
+    engine.dispose()
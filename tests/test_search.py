@@ -0,0 +1,156 @@
+"""Tests for admin text search."""
+import uuid
+from app.models.evaluation import Evaluation
+from app.models.property import Property
+from app.services.search import normalize_text
+
+
+def _evaluation(db, city, property_type="Apartamento"):
+    evaluation = Evaluation(
+        id=str(uuid.uuid4()),
+        city=city,
+        property_type=property_type,
+        purpose="Venda",
+        usable_area=80.0,
+    )
+    db.add(evaluation)
+    db.commit()
+    return evaluation
+
+
+def _property(db, **kwargs):
+    prop = Property(
+        id=str(uuid.uuid4()),
+        external_code=kwargs.pop("external_code", str(uuid.uuid4())),
+        property_type="Apartamento",
+        purpose="Venda",
+        **kwargs,
+    )
+    db.add(prop)
+    db.commit()
+    return prop
+
+
+class TestNormalize:
+    def test_normalize_text(self):
+        assert normalize_text("São Paulo") == "sao paulo"
+        assert normalize_text("CONCEIÇÃO") == "conceicao"
+        assert normalize_text(None) is None
+
+
+class TestEvaluationSearch:
+    def test_city_accent_insensitive(self, client, auth_headers, db):
+        _evaluation(db, "São Paulo")
+        _evaluation(db, "Campinas")
+        r = client.get(
+            "/api/admin/evaluations?city=sao paulo", headers=auth_headers
+        )
+        assert r.status_code == 200
+        data = r.json()
+        assert data["total"] == 1
+        assert data["evaluations"][0]["city"] == "São Paulo"
+
+    def test_property_type_partial(self, client, auth_headers, db):
+        _evaluation(db, "Campinas", "Apartamento")
+        _evaluation(db, "Campinas", "Casa")
+        r = client.get(
+            "/api/admin/evaluations?property_type=APART",
+            headers=auth_headers,
+        )
+        assert r.json()["total"] == 1
+
+    def test_wildcards_are_literal(self, client, auth_headers, db):
+        _evaluation(db, "Campinas")
+        r = client.get(
+            "/api/admin/evaluations?city=%25", headers=auth_headers
+        )
+        assert r.json()["total"] == 0
+
+
+class TestPropertySearch:
+    def test_q_matches_any_column(self, client, auth_headers, db):
+        _property(db, title="Cobertura duplex")
+        _property(db, neighborhood="Jardim Botânico")
+        _property(db, condominium_name="Residencial Ipê")
+        _property(db, address="Rua das Flores, 100")
+
+        for term, expected in [
+            ("duplex", 1),
+            ("botanico", 1),
+            ("ipe", 1),
+            ("FLORES", 1),
+            ("inexistente", 0),
+        ]:
+            r = client.get(
+                f"/api/admin/properties?q={term}", headers=auth_headers
+            )
+            assert r.status_code == 200
+            assert r.json()["total"] == expected, term
+
+    def test_q_combined_with_is_active(self, client, auth_headers, db):
+        _property(db, title="Casa térrea", is_active=True)
+        _property(db, title="Casa sobrado", is_active=False)
+        r = client.get(
+            "/api/admin/properties?q=casa&is_active=false",
+            headers=auth_headers,
+        )
+        assert r.json()["total"] == 1
+
+
+class TestFullTextSearch:
+    def test_ranked_results_with_snippet(self, client, auth_headers, db):
+        _property(
+            db, title="Apartamento",
+            description="Piscina aquecida e piscina infantil, varanda.",
+        )
+        _property(
+            db, title="Casa",
+            description="Casa com piscina e churrasqueira.",
+        )
+        _property(db, title="Sala", description="Sala comercial.")
+
+        r = client.get(
+            "/api/admin/properties/search?q=piscina", headers=auth_headers
+        )
+        assert r.status_code == 200
+        data = r.json()
+        assert data["total"] == 2
+        first = data["results"][0]
+        assert first["title"] == "Apartamento"
+        assert first["rank"] > data["results"][1]["rank"]
+        assert "<mark>Piscina</mark>" in first["snippet"]
+
+    def test_all_terms_required(self, client, auth_headers, db):
+        _property(db, description="Piscina e varanda gourmet")
+        _property(db, description="Piscina coberta")
+        r = client.get(
+            "/api/admin/properties/search?q=piscina varanda",
+            headers=auth_headers,
+        )
+        assert r.json()["total"] == 1
+
+    def test_accent_insensitive(self, client, auth_headers, db):
+        _property(db, description="Ótima localização, próximo ao metrô")
+        r = client.get(
+            "/api/admin/properties/search?q=localizacao metro",
+            headers=auth_headers,
+        )
+        data = r.json()
+        assert data["total"] == 1
+        assert "<mark>localização</mark>" in data["results"][0]["snippet"]
+
+    def test_snippet_escapes_feed_markup(self, client, auth_headers, db):
+        _property(db, description='Piscina <img src=x onerror="alert(1)"> & sauna')
+        r = client.get(
+            "/api/admin/properties/search?q=piscina", headers=auth_headers
+        )
+        snippet = r.json()["results"][0]["snippet"]
+        assert snippet.startswith("<mark>Piscina</mark> &lt;img")
+        assert "<img" not in snippet
+        assert "&amp; sauna" in snippet
+
+    def test_query_too_short(self, client, auth_headers):
+        r = client.get(
+            "/api/admin/properties/search?q=a", headers=auth_headers
+        )
+        assert r.status_code == 422
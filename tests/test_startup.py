@@ -0,0 +1,101 @@
+"""Tests for the startup schema check, pool sizing and warm-up."""
+import pytest
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import (
+    check_schema_revision,
+    engine_options,
+    pool_options,
+    schema_revision_status,
+    warm_pool,
+)
+from app.core.replicas import replica_engine_options
+from tests.conftest import engine
+
+
+def _stamp(revision):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS alembic_version "
+            "(version_num VARCHAR(32) NOT NULL PRIMARY KEY)"
+        ))
+        conn.execute(text("DELETE FROM alembic_version"))
+        conn.execute(
+            text("INSERT INTO alembic_version VALUES (:v)"), {"v": revision}
+        )
+
+
+class TestSchemaRevision:
+    def test_unversioned_database(self):
+        status = schema_revision_status(engine)
+        assert status["current"] == []
+        assert status["expected"]
+        assert status["up_to_date"] is False
+
+    def test_head(self):
+        head = schema_revision_status(engine)["expected"][0]
+        _stamp(head)
+        try:
+            assert schema_revision_status(engine)["up_to_date"] is True
+        finally:
+            with engine.begin() as conn:
+                conn.execute(text("DROP TABLE alembic_version"))
+
+    def test_strict_raises(self, monkeypatch):
+        monkeypatch.setattr(
+            "app.core.database.schema_revision_status",
+            lambda: {"current": [], "expected": ["x"], "up_to_date": False},
+        )
+        assert check_schema_revision() is False
+        with pytest.raises(RuntimeError):
+            check_schema_revision(strict=True)
+
+
+class TestWarmPool:
+    def test_opens_connections(self):
+        assert warm_pool(engine, size=3) == 3
+        assert warm_pool(engine, size=0) == 0
+
+
+class TestPoolOptions:
+    def test_split_between_workers(self, monkeypatch):
+        monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 30)
+        monkeypatch.setattr(settings, "WEB_CONCURRENCY", 1)
+        monkeypatch.setattr(settings, "WORKER_PROCESSES", 0)
+        options = pool_options()
+        assert (options["pool_size"], options["max_overflow"]) == (10, 20)
+
+        monkeypatch.setattr(settings, "WEB_CONCURRENCY", 3)
+        options = pool_options()
+        assert options["pool_size"] + options["max_overflow"] == 10
+
+    def test_job_workers_share_the_budget(self, monkeypatch):
+        monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 30)
+        monkeypatch.setattr(settings, "WEB_CONCURRENCY", 2)
+        monkeypatch.setattr(settings, "WORKER_PROCESSES", 3)
+        options = pool_options()
+        assert options["pool_size"] + options["max_overflow"] == 6
+        # Replicas: so os processos web se conectam
+        options = replica_engine_options("sqlite:///./x.db")
+        assert options["pool_size"] + options["max_overflow"] == 15
+
+    def test_explicit_sizes(self, monkeypatch):
+        monkeypatch.setattr(settings, "DB_POOL_SIZE", 4)
+        monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+        options = pool_options()
+        assert (options["pool_size"], options["max_overflow"]) == (4, 0)
+
+    def test_postgres_statement_timeout(self, monkeypatch):
+        monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+        options = engine_options("postgresql://u:p@localhost/db")
+        assert options["connect_args"]["options"] == "-c statement_timeout=5000"
+        assert "connect_args" not in engine_options("sqlite:///./x.db")
+
+    def test_psycopg3_prepared_statements(self, monkeypatch):
+        monkeypatch.setattr(settings, "DB_PREPARE_THRESHOLD", 3)
+        options = engine_options("postgresql+psycopg://u:p@localhost/db")
+        assert options["connect_args"]["prepare_threshold"] == 3
+        assert "prepare_threshold" not in engine_options(
+            "postgresql://u:p@localhost/db"
+        )["connect_args"]
+        assert options["query_cache_size"] == settings.DB_QUERY_CACHE_SIZE
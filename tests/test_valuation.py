@@ -0,0 +1,139 @@
+"""Tests for the comparable-property valuation engine."""
+import uuid
+import numpy as np
+from app.models.evaluation import Evaluation
+from app.models.property import Property
+from app.services.valuation import Comparables, estimate
+
+
+def _comparable(db, area, price, city="Campinas", purpose="Venda", **kwargs):
+    prop = Property(
+        id=str(uuid.uuid4()),
+        external_code=str(uuid.uuid4()),
+        property_type="Apartamento",
+        purpose=purpose,
+        city=city,
+        usable_area=area,
+        bedrooms=kwargs.pop("bedrooms", 2),
+        parking_spaces=kwargs.pop("parking_spaces", 1),
+        sale_price=price,
+        **kwargs,
+    )
+    db.add(prop)
+    db.commit()
+    return prop
+
+
+def _evaluation(db, area=100, city="Campinas", **kwargs):
+    evaluation = Evaluation(
+        id=str(uuid.uuid4()),
+        city=city,
+        property_type="Apartamento",
+        purpose="Venda",
+        usable_area=area,
+        bedrooms=2,
+        parking_spaces=1,
+        **kwargs,
+    )
+    db.add(evaluation)
+    db.commit()
+    return evaluation
+
+
+def _comps(areas, prices, bedrooms=None):
+    n = len(areas)
+    areas = np.array(areas, dtype=float)
+    return Comparables(
+        area=areas,
+        bedrooms=np.array(bedrooms or [2] * n, dtype=float),
+        parking=np.ones(n),
+        amenities=np.zeros(n, dtype=np.int64),
+        price_per_sqm=np.array(prices, dtype=float) / areas,
+    )
+
+
+def _subject(area, bedrooms=2):
+    return dict(
+        area=np.array([area], dtype=float),
+        bedrooms=np.array([bedrooms], dtype=float),
+        parking=np.ones(1),
+        amenities=np.zeros(1, dtype=np.int64),
+    )
+
+
+class TestEstimate:
+    def test_outlier_is_discarded(self):
+        comps = _comps([100] * 6, [500_000] * 5 + [5_000_000])
+        result = estimate(comps, **_subject(100))
+        assert result.similar_count[0] == 5
+        assert result.estimated_price[0] == 500_000
+        assert result.confidence[0] == "medium"
+
+    def test_filters_by_bedrooms(self):
+        comps = _comps(
+            [100] * 6, [400_000] * 3 + [900_000] * 3,
+            bedrooms=[2, 2, 2, 5, 5, 5],
+        )
+        result = estimate(comps, **_subject(100))
+        assert result.similar_count[0] == 3
+        assert result.price_per_sqm[0] == 4_000
+
+    def test_not_enough_comparables(self):
+        comps = _comps([100, 100], [500_000, 510_000])
+        result = estimate(comps, **_subject(100))
+        assert np.isnan(result.estimated_price[0])
+        assert result.confidence[0] is None
+
+    def test_relaxes_area_tolerance(self):
+        # Nenhum comparavel dentro de +-30%, tres dentro de +-50%
+        comps = _comps([140, 140, 145], [700_000, 700_000, 725_000])
+        result = estimate(comps, **_subject(100))
+        assert result.similar_count[0] == 3
+        assert result.estimated_price[0] == 500_000
+
+
+class TestRecomputeEndpoint:
+    def test_recompute_updates_evaluations(self, client, auth_headers, db):
+        for i in range(6):
+            _comparable(db, 100, 500_000 + i * 10_000)
+        _comparable(db, 100, 100_000, city="Sao Paulo")
+        evaluation = _evaluation(db, area=80, city="campinas")
+
+        response = client.post(
+            "/api/admin/evaluations/recompute",
+            json={"ids": [evaluation.id]},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["evaluated"] == 1
+        assert data["estimated"] == 1
+
+        db.refresh(evaluation)
+        assert evaluation.similar_count == 6
+        assert evaluation.price_per_sqm == 5_250
+        assert evaluation.estimated_price == 420_000
+        assert evaluation.min_price < evaluation.estimated_price < evaluation.max_price
+
+    def test_dry_run_does_not_write(self, client, auth_headers, db):
+        for i in range(3):
+            _comparable(db, 100, 500_000)
+        evaluation = _evaluation(db, estimated_price=1.0)
+
+        response = client.post(
+            "/api/admin/evaluations/recompute",
+            json={"dry_run": True},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        result = response.json()["results"][0]
+        assert result["previous_estimated_price"] == 1.0
+        assert result["estimated_price"] == 500_000
+        assert result["confidence"] == "low"
+
+        db.refresh(evaluation)
+        assert evaluation.estimated_price == 1.0
+
+    def test_requires_admin(self, client):
+        response = client.post("/api/admin/evaluations/recompute", json={})
+        assert response.status_code in (401, 403)